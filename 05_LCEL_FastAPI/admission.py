@@ -0,0 +1,127 @@
+# Admission control and backpressure for the LangServe server
+import asyncio
+import heapq
+import itertools
+import math
+import time
+
+from starlette.responses import JSONResponse
+
+# Lower number is served first
+PRIORITY_LANES = {"high": 0, "normal": 1, "low": 2}
+
+
+class QueueFull(Exception):
+    pass
+
+
+class QueueTimeout(Exception):
+    pass
+
+
+class AdmissionController:
+    """Caps the number of requests in flight. Requests over the cap wait in a
+    bounded priority queue; when the queue is full they are rejected at once,
+    and when they wait longer than `queue_timeout` they give up."""
+
+    def __init__(self, max_in_flight=16, max_queue=64, queue_timeout=10.0):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self._avg_service_time = 1.0
+        self.counters = {"admitted": 0, "rejected": 0, "timed_out": 0}
+
+    @property
+    def queued(self):
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    def retry_after(self):
+        # Rough time for the current queue to drain, in whole seconds
+        backlog = self.queued / max(1, self.max_in_flight) + 1
+        return max(1, math.ceil(backlog * self._avg_service_time))
+
+    async def acquire(self, priority=PRIORITY_LANES["normal"]):
+        if self.in_flight < self.max_in_flight and not self.queued:
+            self.in_flight += 1
+            self.counters["admitted"] += 1
+            return
+        if self.queued >= self.max_queue:
+            self.counters["rejected"] += 1
+            raise QueueFull()
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            future.cancel()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.counters["timed_out"] += 1
+            raise QueueTimeout()
+        self.counters["admitted"] += 1
+
+    def release(self, service_time=None):
+        if service_time is not None:
+            self._avg_service_time = 0.9 * self._avg_service_time + 0.1 * service_time
+        # Hand the slot straight to the next live waiter, highest priority first
+        while self._waiters:
+            *_, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self):
+        return {**self.counters, "in_flight": self.in_flight, "queued": self.queued}
+
+
+class AdmissionMiddleware:
+    """ASGI middleware that runs POST requests under `path_prefixes` through an
+    AdmissionController. The slot is held until the response body is fully sent,
+    so streaming responses count as in flight. The lane is picked from the
+    `X-Priority` header (high/normal/low)."""
+
+    def __init__(self, app, controller: AdmissionController, path_prefixes=("/chain",)):
+        self.app = app
+        self.controller = controller
+        self.path_prefixes = path_prefixes
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] != "POST"
+                or not scope["path"].startswith(self.path_prefixes)):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        lane = headers.get(b"x-priority", b"normal").decode("latin-1").lower()
+        priority = PRIORITY_LANES.get(lane, PRIORITY_LANES["normal"])
+
+        try:
+            await self.controller.acquire(priority)
+        except QueueFull:
+            response = JSONResponse(
+                {"detail": "Server is overloaded, please retry later."}, status_code=429,
+                headers={"Retry-After": str(self.controller.retry_after())},
+            )
+            await response(scope, receive, send)
+            return
+        except QueueTimeout:
+            response = JSONResponse(
+                {"detail": "Timed out waiting for capacity, please retry later."}, status_code=503,
+                headers={"Retry-After": str(self.controller.retry_after())},
+            )
+            await response(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(time.perf_counter() - start)
@@ -1,25 +1,56 @@
 # Streamlit Translation Interface
+import json
+import time
+
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
+
+SERVER_URL = "http://127.0.0.1:8000"
+
+# One pooled keep-alive session per process, reused across reruns and sessions
+@st.cache_resource
+def get_http_session():
+   session = requests.Session()
+   session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+   return session
 
-def get_groq_response(input_text):
+def stream_groq_response(input_text, timings):
    json_body = {
        "input": {
            "language": "French",
            "text": input_text
        }
    }
-   response = requests.post("http://127.0.0.1:8000/chain/invoke", json=json_body)
-   return response.json()
+   start = time.perf_counter()
+   with get_http_session().post(f"{SERVER_URL}/chain/stream", json=json_body, stream=True, timeout=(5, 120)) as response:
+       response.raise_for_status()
+       # LangServe sends SSE frames: "event: <type>" followed by "data: <json>"
+       event = None
+       for line in response.iter_lines(decode_unicode=True):
+           if line.startswith("event:"):
+               event = line[len("event:"):].strip()
+           elif line.startswith("data:") and event == "data":
+               if "ttft" not in timings:
+                   timings["ttft"] = time.perf_counter() - start
+               yield json.loads(line[len("data:"):])
+           elif line.startswith("data:") and event == "error":
+               raise RuntimeError(json.loads(line[len("data:"):]))
+           elif event == "end":
+               break
+   timings["total"] = time.perf_counter() - start
 
 # Streamlit app
 st.title("LLM Application Using LCEL")
 input_text = st.text_input("Enter the text you want to convert to french")
 
 if input_text:
-   st.write(get_groq_response(input_text))
+   timings = {}
+   st.write_stream(stream_groq_response(input_text, timings))
+   if "ttft" in timings:
+       st.caption(f"Time to first token: {timings['ttft'] * 1000:.0f} ms · Total: {timings['total'] * 1000:.0f} ms")
 
 # To run:
 # 1. Make sure FastAPI server is running (uvicorn main:app --reload)
 # 2. Open new terminal and run: streamlit run app.py
-# 3. Open browser at http://localhost:8501
\ No newline at end of file
+# 3. Open browser at http://localhost:8501
@@ -0,0 +1,119 @@
+# Server-side micro-batching for the translation chain
+import asyncio
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.runnables.config import ensure_config, get_config_list, patch_config
+
+
+class MicroBatcher:
+    """Collects requests that arrive within a short window and runs them as one
+    `chain.abatch(...)` call, then hands each caller its own result."""
+
+    def __init__(self, chain, max_batch_size=8, max_wait_ms=20, max_concurrency=8):
+        self.chain = chain
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_concurrency = max_concurrency
+        self._queue = None
+        self._worker = None
+
+    def _ensure_worker(self):
+        # The queue and worker must live on the loop that serves the requests
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, input, config=None):
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((input, ensure_config(config), future))
+        return await future
+
+    async def _collect(self):
+        # Block for the first request, then keep collecting until the batch is full or the window closes
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        # One batch in flight at a time keeps the upstream at most `max_concurrency` calls deep;
+        # requests arriving meanwhile queue up and form the next batch
+        while True:
+            batch = await self._collect()
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch):
+        inputs = [item for item, _, _ in batch]
+        # Each caller keeps its own callbacks, tags and run name; the batch runs at the server's concurrency
+        configs = [patch_config(config, max_concurrency=self.max_concurrency) for _, config, _ in batch]
+        try:
+            results = await self.chain.abatch(inputs, config=configs, return_exceptions=True)
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (_, _, future), result in zip(batch, results):
+            if future.done():  # caller went away
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class BatchedRunnable(Runnable):
+    """Runnable facade over a MicroBatcher so it can be served with `add_routes`.
+
+    `ainvoke` goes through the batching window; streaming cannot be batched, so
+    `astream` is forwarded straight to the wrapped chain."""
+
+    def __init__(self, chain, **batcher_kwargs):
+        self.chain = chain
+        self.batcher = MicroBatcher(chain, **batcher_kwargs)
+
+    @property
+    def InputType(self):
+        return self.chain.InputType
+
+    @property
+    def OutputType(self):
+        return self.chain.OutputType
+
+    def get_input_schema(self, config: Optional[RunnableConfig] = None):
+        return self.chain.get_input_schema(config)
+
+    def get_output_schema(self, config: Optional[RunnableConfig] = None):
+        return self.chain.get_output_schema(config)
+
+    def invoke(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        return self.chain.invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        if kwargs:
+            # Extra invocation kwargs cannot be shared by a batch
+            return await self.chain.ainvoke(input, config, **kwargs)
+        return await self.batcher.submit(input, config)
+
+    def stream(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator:
+        yield from self.chain.stream(input, config, **kwargs)
+
+    async def astream(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator:
+        async for chunk in self.chain.astream(input, config, **kwargs):
+            yield chunk
+
+    async def abatch(self, inputs: List, config=None, *, return_exceptions=False, **kwargs: Any) -> List:
+        # Client-side batches are already batched; just cap their concurrency
+        limit = self.batcher.max_concurrency
+        configs = [
+            patch_config(c, max_concurrency=min(c.get("max_concurrency") or limit, limit))
+            for c in get_config_list(config, len(inputs))
+        ]
+        return await self.chain.abatch(inputs, config=configs, return_exceptions=return_exceptions, **kwargs)
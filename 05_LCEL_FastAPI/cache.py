@@ -0,0 +1,211 @@
+# Two-tier translation cache (in-process LRU + on-disk SQLite) for the translation chain
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Iterator, Optional
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+
+class TranslationCache:
+    """Caches translations keyed by (language, text).
+
+    Lookups hit the in-memory LRU first, then SQLite; a disk hit is promoted
+    back into memory. Entries older than `ttl_seconds` are treated as misses and
+    each tier is bounded, evicting the least recently used entries.
+
+    Disk hits do not write: their access times are buffered and flushed in one
+    statement every `touch_batch` hits or on the next `set`. The async methods
+    run SQLite work in a thread so the event loop never waits on the disk, and
+    the memory tier has its own lock, held only for dict operations, so a memory
+    hit never waits behind a SQLite write either."""
+
+    def __init__(self, db_path="translation_cache.db", max_memory_entries=10_000,
+                 max_disk_entries=1_000_000, ttl_seconds=7 * 24 * 3600, touch_batch=256):
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.touch_batch = touch_batch
+        self._memory = OrderedDict()
+        self._touched = {}  # key -> last access not yet written
+        self._memory_lock = threading.Lock()  # _memory and the memory counters
+        self._lock = threading.Lock()  # the SQLite connection and the disk counters; taken before _memory_lock
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, value TEXT, created_at REAL, last_access REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON translations(last_access)")
+        self._db.commit()
+        self._disk_entries = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "memory_evictions": 0, "disk_evictions": 0}
+
+    @staticmethod
+    def make_key(language, text):
+        return hashlib.sha256(f"{language}\0{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key, value, created_at):
+        with self._memory_lock:
+            self._memory[key] = (value, created_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+                self.counters["memory_evictions"] += 1
+
+    def _flush_touched(self):
+        if self._touched:
+            self._db.executemany(
+                "UPDATE translations SET last_access = ? WHERE key = ?",
+                [(at, key) for key, at in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _memory_get(self, key, now):
+        with self._memory_lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] < self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return entry[0]
+            if entry is not None:
+                del self._memory[key]
+            return None
+
+    def _disk_get(self, key, now):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, created_at FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] < self.ttl_seconds:
+                self._touched[key] = now
+                if len(self._touched) >= self.touch_batch:
+                    self._flush_touched()
+                    self._db.commit()
+                self._remember(key, row[0], row[1])
+                self.counters["disk_hits"] += 1
+                return row[0]
+
+            # Expired or absent
+            if row is not None:
+                self._touched.pop(key, None)
+                self._db.execute("DELETE FROM translations WHERE key = ?", (key,))
+                self._db.commit()
+                self._disk_entries -= 1
+            self.counters["misses"] += 1
+            return None
+
+    def get(self, language, text):
+        key = self.make_key(language, text)
+        now = time.time()
+        value = self._memory_get(key, now)
+        return value if value is not None else self._disk_get(key, now)
+
+    async def aget(self, language, text):
+        key = self.make_key(language, text)
+        now = time.time()
+        value = self._memory_get(key, now)
+        return value if value is not None else await asyncio.to_thread(self._disk_get, key, now)
+
+    def set(self, language, text, value):
+        key = self.make_key(language, text)
+        now = time.time()
+        self._remember(key, value, now)
+        with self._lock:
+            inserted = self._db.execute(
+                "INSERT OR IGNORE INTO translations VALUES (?, ?, ?, ?)", (key, value, now, now)
+            ).rowcount
+            if not inserted:
+                self._db.execute(
+                    "UPDATE translations SET value = ?, created_at = ?, last_access = ? WHERE key = ?",
+                    (value, now, now, key),
+                )
+            self._disk_entries += inserted
+            self._flush_touched()
+            overflow = self._disk_entries - self.max_disk_entries
+            if overflow > 0:
+                self._db.execute(
+                    "DELETE FROM translations WHERE key IN "
+                    "(SELECT key FROM translations ORDER BY last_access LIMIT ?)", (overflow,)
+                )
+                self._disk_entries -= overflow
+                self.counters["disk_evictions"] += overflow
+            self._db.commit()
+
+    async def aset(self, language, text, value):
+        await asyncio.to_thread(self.set, language, text, value)
+
+    def stats(self):
+        with self._lock, self._memory_lock:
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            lookups = hits + self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": self._disk_entries,
+            }
+
+
+class CachedRunnable(Runnable):
+    """Serves translations from a TranslationCache and only calls the wrapped
+    chain on a miss. Streamed misses are stored once the stream completes."""
+
+    def __init__(self, chain, cache: TranslationCache):
+        self.chain = chain
+        self.cache = cache
+
+    @property
+    def InputType(self):
+        return self.chain.InputType
+
+    @property
+    def OutputType(self):
+        return self.chain.OutputType
+
+    def get_input_schema(self, config: Optional[RunnableConfig] = None):
+        return self.chain.get_input_schema(config)
+
+    def get_output_schema(self, config: Optional[RunnableConfig] = None):
+        return self.chain.get_output_schema(config)
+
+    def invoke(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        cached = self.cache.get(input["language"], input["text"])
+        if cached is not None:
+            return cached
+        result = self.chain.invoke(input, config, **kwargs)
+        self.cache.set(input["language"], input["text"], result)
+        return result
+
+    async def ainvoke(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        cached = await self.cache.aget(input["language"], input["text"])
+        if cached is not None:
+            return cached
+        result = await self.chain.ainvoke(input, config, **kwargs)
+        await self.cache.aset(input["language"], input["text"], result)
+        return result
+
+    def stream(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator:
+        cached = self.cache.get(input["language"], input["text"])
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        for chunk in self.chain.stream(input, config, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        self.cache.set(input["language"], input["text"], "".join(chunks))
+
+    async def astream(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator:
+        cached = await self.cache.aget(input["language"], input["text"])
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        async for chunk in self.chain.astream(input, config, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        await self.cache.aset(input["language"], input["text"], "".join(chunks))
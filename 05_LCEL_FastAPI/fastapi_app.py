@@ -1,11 +1,21 @@
 # FastAPI Translation Server Setup
-from fastapi import FastAPI
+import asyncio
+import json
+import time
+from typing import List
+
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_groq import ChatGroq
 import os
 from langserve import add_routes
 from dotenv import load_dotenv
+from batching import BatchedRunnable
+from cache import CachedRunnable, TranslationCache
+from admission import PRIORITY_LANES, AdmissionController, AdmissionMiddleware, QueueFull, QueueTimeout
 
 load_dotenv()
 
@@ -24,6 +34,27 @@ parser = StrOutputParser()
 # Create chain
 chain = prompt_template|model|parser
 
+# Optional micro-batching: requests arriving within the window share one chain.batch call
+# BATCHING_ENABLED=true BATCH_MAX_SIZE=8 BATCH_MAX_WAIT_MS=20 BATCH_MAX_CONCURRENCY=8
+if os.getenv("BATCHING_ENABLED", "false").lower() == "true":
+    served_chain = BatchedRunnable(
+        chain,
+        max_batch_size=int(os.getenv("BATCH_MAX_SIZE", "8")),
+        max_wait_ms=float(os.getenv("BATCH_MAX_WAIT_MS", "20")),
+        max_concurrency=int(os.getenv("BATCH_MAX_CONCURRENCY", "8")),
+    )
+else:
+    served_chain = chain
+
+# Translation cache keyed by (language, text): in-process LRU in front of an on-disk SQLite tier
+translation_cache = TranslationCache(
+    db_path=os.getenv("CACHE_DB_PATH", "translation_cache.db"),
+    max_memory_entries=int(os.getenv("CACHE_MAX_MEMORY_ENTRIES", "10000")),
+    max_disk_entries=int(os.getenv("CACHE_MAX_DISK_ENTRIES", "1000000")),
+    ttl_seconds=float(os.getenv("CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+)
+served_chain = CachedRunnable(served_chain, translation_cache)
+
 # App definition
 app = FastAPI(
     title="Langchain Server",
@@ -31,13 +62,73 @@ app = FastAPI(
     description="A simple API server using Langchain runnable interfaces"
 )
 
+# Admission control: bounded in-flight requests and wait queue, X-Priority header picks the lane
+admission_controller = AdmissionController(
+    max_in_flight=int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "16")),
+    max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "64")),
+    queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10")),
+)
+# /fanout is not covered by the middleware: it takes one slot per upstream call instead of one per request
+app.add_middleware(AdmissionMiddleware, controller=admission_controller, path_prefixes=("/chain",))
+
 # Adding chain routes
 add_routes(
     app,
-    chain,
+    served_chain,
     path="/chain"
 )
 
+# Multi-language fan-out: one text, many target languages, results streamed as each finishes
+# FANOUT_MAX_CONCURRENCY caps the client's max_concurrency, FANOUT_MAX_LANGUAGES the languages per request
+FANOUT_MAX_CONCURRENCY = int(os.getenv("FANOUT_MAX_CONCURRENCY", "8"))
+FANOUT_MAX_LANGUAGES = int(os.getenv("FANOUT_MAX_LANGUAGES", "32"))
+
+class FanoutRequest(BaseModel):
+    text: str
+    languages: List[str]
+    max_concurrency: int = 8
+
+@app.post("/fanout")
+async def fanout(request: FanoutRequest, x_priority: str = Header("normal")):
+    languages = list(dict.fromkeys(request.languages))
+    if len(languages) > FANOUT_MAX_LANGUAGES:
+        raise HTTPException(status_code=422, detail=f"At most {FANOUT_MAX_LANGUAGES} languages per request.")
+    if admission_controller.queued >= admission_controller.max_queue:
+        return JSONResponse(
+            {"detail": "Server is overloaded, please retry later."}, status_code=429,
+            headers={"Retry-After": str(admission_controller.retry_after())},
+        )
+    priority = PRIORITY_LANES.get(x_priority.lower(), PRIORITY_LANES["normal"])
+    semaphore = asyncio.Semaphore(min(max(request.max_concurrency, 1), FANOUT_MAX_CONCURRENCY))
+
+    async def translate(language):
+        async with semaphore:
+            # Every upstream call is admitted on its own, like a /chain request
+            try:
+                await admission_controller.acquire(priority)
+            except (QueueFull, QueueTimeout):
+                return {"language": language, "error": "Server is overloaded, please retry later."}
+            start = time.perf_counter()
+            try:
+                translation = await served_chain.ainvoke({"language": language, "text": request.text})
+                return {"language": language, "translation": translation}
+            except Exception as e:
+                return {"language": language, "error": str(e)}
+            finally:
+                admission_controller.release(time.perf_counter() - start)
+
+    async def results():
+        # One JSON object per line, in completion order
+        for task in asyncio.as_completed([translate(language) for language in languages]):
+            yield json.dumps(await task, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+# Cache hit/miss and admission counters
+@app.get("/metrics")
+def metrics():
+    return {"cache": translation_cache.stats(), "admission": admission_controller.stats()}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -62,4 +153,12 @@ if __name__ == "__main__":
 # 2. Run command: uvicorn main:app --reload
 # 3. Visit http://127.0.0.1:8000/docs for Swagger UI
 # 4. Or test directly at http://127.0.0.1:8000/chain
-# 5. Use Ctrl+C to stop the server
\ No newline at end of file
+#    Cache hit/miss and admission counters are at http://127.0.0.1:8000/metrics
+#    Fan-out: curl -N -X POST http://127.0.0.1:8000/fanout -H "Content-Type: application/json" \
+#             -d '{"text": "Good morning", "languages": ["French", "German", "Spanish"]}'
+# 5. Use Ctrl+C to stop the server
+
+# Load test for the batching layer (uses a local fake chat model, no Groq calls):
+# python load_test.py --requests 400 --concurrency 100
+# Overload benchmark for admission control:
+# python benchmark_admission.py --requests 600 --concurrency 300
\ No newline at end of file
@@ -0,0 +1,107 @@
+# Load test for the micro-batching layer using a local fake chat model
+import argparse
+import asyncio
+import time
+from typing import Any, List
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+from batching import BatchedRunnable
+
+
+class FakeUpstreamChatModel(BaseChatModel):
+    """Stands in for ChatGroq. Each call costs `base_latency` seconds, and every
+    concurrent call above `capacity` adds `overload_penalty` seconds, the way a
+    rate-limited provider slows down when it is flooded."""
+
+    base_latency: float = 0.2
+    capacity: int = 8
+    overload_penalty: float = 0.05
+    in_flight: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-upstream"
+
+    def _reply(self, messages: List[BaseMessage]) -> ChatResult:
+        text = f"[fr] {messages[-1].content}"
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _latency(self) -> float:
+        return self.base_latency + self.overload_penalty * max(0, self.in_flight - self.capacity)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self._latency())
+        return self._reply(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self._latency())
+        finally:
+            self.in_flight -= 1
+        return self._reply(messages)
+
+
+def build_chain():
+    prompt_template = ChatPromptTemplate.from_messages([
+        ('system', "Translate the following into {language}:"),
+        ('user', '{text}')
+    ])
+    return prompt_template | FakeUpstreamChatModel() | StrOutputParser()
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_load(runnable, total_requests, concurrency):
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one_request(i):
+        async with gate:
+            start = time.perf_counter()
+            await runnable.ainvoke({"language": "French", "text": f"Hello number {i}"})
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request(i) for i in range(total_requests)))
+    elapsed = time.perf_counter() - start
+    return total_requests / elapsed, percentile(latencies, 0.50), percentile(latencies, 0.99)
+
+
+async def main(args):
+    direct = build_chain()
+    batched = BatchedRunnable(
+        build_chain(),
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        max_concurrency=args.max_concurrency,
+    )
+
+    print(f"{args.requests} requests, {args.concurrency} concurrent clients")
+    print(f"{'mode':<10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, runnable in [("direct", direct), ("batched", batched)]:
+        rps, p50, p99 = await run_load(runnable, args.requests, args.concurrency)
+        print(f"{name:<10}{rps:>10.1f}{p50 * 1000:>10.0f}{p99 * 1000:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare direct vs micro-batched chain under load")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=20)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    asyncio.run(main(parser.parse_args()))
+
+# To run:
+# python load_test.py --requests 400 --concurrency 100
+# The "batched" row shows the throughput gain from keeping the upstream within its
+# capacity, and the p50/p99 columns show the extra wait added by the batching window.
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain_core")
+from langchain_core.runnables import RunnableLambda
+
+from batching import BatchedRunnable
+
+
+def recording_chain(seen):
+    def translate(input, config):
+        seen.append((input["text"], config.get("tags"), config.get("max_concurrency")))
+        return input["text"].upper()
+    return RunnableLambda(translate)
+
+
+def test_ainvoke_batches_and_keeps_each_callers_config():
+    seen = []
+    runnable = BatchedRunnable(recording_chain(seen), max_batch_size=8, max_wait_ms=50, max_concurrency=4)
+
+    async def main():
+        return await asyncio.gather(*[
+            runnable.ainvoke({"text": text}, {"tags": [text]}) for text in ("a", "b", "c")
+        ])
+
+    assert asyncio.run(main()) == ["A", "B", "C"]
+    assert sorted(seen) == [("a", ["a"], 4), ("b", ["b"], 4), ("c", ["c"], 4)]
+
+
+def test_abatch_passes_config_and_caps_concurrency():
+    seen = []
+    runnable = BatchedRunnable(recording_chain(seen), max_concurrency=4)
+    results = asyncio.run(runnable.abatch(
+        [{"text": "x"}, {"text": "y"}], {"tags": ["client"], "max_concurrency": 16}
+    ))
+    assert results == ["X", "Y"]
+    assert sorted(seen) == [("x", ["client"], 4), ("y", ["client"], 4)]
@@ -0,0 +1,56 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("langchain_core")
+from cache import TranslationCache
+
+
+def last_access(cache, language, text):
+    key = TranslationCache.make_key(language, text)
+    return cache._db.execute("SELECT last_access FROM translations WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_disk_hits_buffer_access_times(tmp_path):
+    path = str(tmp_path / "cache.db")
+    TranslationCache(path).set("French", "hello", "bonjour")
+
+    cache = TranslationCache(path, touch_batch=2)
+    before = last_access(cache, "French", "hello")
+    assert cache.get("French", "hello") == "bonjour"
+    assert cache.counters["disk_hits"] == 1
+    assert last_access(cache, "French", "hello") == before  # buffered, not written
+
+    cache.set("German", "hello", "hallo")  # flushes the buffer
+    assert last_access(cache, "French", "hello") > before
+
+
+def test_async_lookup_and_store(tmp_path):
+    cache = TranslationCache(str(tmp_path / "cache.db"))
+
+    async def main():
+        assert await cache.aget("French", "cat") is None
+        await cache.aset("French", "cat", "chat")
+        return await cache.aget("French", "cat")
+
+    assert asyncio.run(main()) == "chat"
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_memory_hit_does_not_wait_for_sqlite(tmp_path):
+    cache = TranslationCache(str(tmp_path / "cache.db"))
+    cache.set("French", "dog", "chien")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        with cache._lock:  # as if a set() in another thread were committing
+            lookup = pool.submit(asyncio.run, cache.aget("French", "dog"))
+            assert lookup.result(timeout=2) == "chien"
+
+
+def test_evictions_are_counted_per_tier(tmp_path):
+    cache = TranslationCache(str(tmp_path / "cache.db"), max_memory_entries=2, max_disk_entries=3)
+    for word in ("one", "two", "three", "four", "five"):
+        cache.set("French", word, word.upper())
+    stats = cache.stats()
+    assert (stats["memory_entries"], stats["memory_evictions"]) == (2, 3)
+    assert (stats["disk_entries"], stats["disk_evictions"]) == (3, 2)
@@ -0,0 +1,36 @@
+# Process-wide registry of LLM clients and chains, shared across Streamlit reruns and sessions
+from functools import lru_cache
+
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+
+def _ollama(model, temperature, max_tokens, api_key):
+    from langchain_community.llms import Ollama
+    return Ollama(model=model, temperature=temperature, num_predict=max_tokens)
+
+
+def _openai(model, temperature, max_tokens, api_key):
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(model=model, temperature=temperature, max_tokens=max_tokens, api_key=api_key)
+
+
+# provider name -> factory(model, temperature, max_tokens, api_key)
+PROVIDERS = {
+    "ollama": _ollama,
+    "openai": _openai,
+}
+
+
+@lru_cache(maxsize=32)
+def get_llm(provider, model, temperature, max_tokens, api_key=None):
+    # Clients keep their HTTP connection pool, so reusing them keeps connections warm
+    return PROVIDERS[provider](model, temperature, max_tokens, api_key)
+
+
+@lru_cache(maxsize=32)
+def get_chain(prompt_messages, provider, model, temperature, max_tokens, api_key=None):
+    # prompt_messages is a tuple of (role, template) pairs so it can be part of the cache key
+    prompt = ChatPromptTemplate.from_messages(list(prompt_messages))
+    llm = get_llm(provider, model, temperature, max_tokens, api_key)
+    return prompt | llm | StrOutputParser()
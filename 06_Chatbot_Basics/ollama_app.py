@@ -1,7 +1,5 @@
 import streamlit as st
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_community.llms import Ollama
+from chain_registry import get_chain
 import os
 
 import os
@@ -14,18 +12,14 @@ os.environ["LANGCHAIN_TRACING_V2"]="true"
 os.environ["LANGCHAIN_PROJECT"]="Simple Q&A Chatbot With Ollama"
 
 ## Prompt Template
-prompt=ChatPromptTemplate.from_messages(
-    [
-        ("system","You are a helpful massistant . Please  repsonse to the user queries"),
-        ("user","Question:{question}")
-    ]
+prompt_messages=(
+    ("system","You are a helpful massistant . Please  repsonse to the user queries"),
+    ("user","Question:{question}")
 )
 
 def generate_response(question,llm,temperature,max_tokens):
-    
-    llm=Ollama(model=llm)
-    output_parser=StrOutputParser()
-    chain=prompt|llm|output_parser
+    # Client and chain are built once per (model, temperature, max_tokens) and reused across reruns
+    chain=get_chain(prompt_messages,"ollama",llm,temperature,max_tokens)
     answer=chain.invoke({'question':question})
     return answer
 
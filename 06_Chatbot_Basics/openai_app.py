@@ -1,8 +1,5 @@
 import streamlit as st
-import openai
-from langchain_openai import ChatOpenAI
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.prompts import ChatPromptTemplate
+from chain_registry import get_chain
 import os
 
 import os
@@ -15,19 +12,14 @@ os.environ["LANGCHAIN_TRACING_V2"]="true"
 os.environ["LANGCHAIN_PROJECT"]="Simple Q&A Chatbot With OPENAI"
 
 ## Prompt Template
-prompt=ChatPromptTemplate.from_messages(
-    [
-        ("system","You are a helpful assistant . Please  repsonse to the user queries"),
-        ("user","Question:{question}")
-    ]
+prompt_messages=(
+    ("system","You are a helpful assistant . Please  repsonse to the user queries"),
+    ("user","Question:{question}")
 )
 
 def generate_response(question,api_key,engine,temperature,max_tokens):
-    openai.api_key=api_key
-
-    llm=ChatOpenAI(model=engine)
-    output_parser=StrOutputParser()
-    chain=prompt|llm|output_parser
+    # Client and chain are built once per (model, temperature, max_tokens, key) and reused across reruns
+    chain=get_chain(prompt_messages,"openai",engine,temperature,max_tokens,api_key)
     answer=chain.invoke({'question':question})
     return answer
 
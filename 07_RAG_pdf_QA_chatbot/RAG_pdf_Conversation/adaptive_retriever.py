@@ -0,0 +1,113 @@
+# History-aware retrieval that skips or overlaps the LLM query rewrite
+import contextvars
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableLambda
+
+# Words that usually point back into the conversation ("what about its limits?")
+REFERENCE_WORDS = {
+    "it", "its", "this", "that", "these", "those", "they", "them", "their", "theirs",
+    "he", "him", "his", "she", "her", "hers", "above", "previous", "earlier", "former",
+    "latter", "same", "again", "else", "more", "there", "one", "ones",
+}
+FOLLOW_UP_STARTS = ("and ", "also ", "what about", "how about", "why not", "then ")
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculative-retrieval")
+
+
+def _words(text):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def is_standalone(question, min_words=4):
+    """Cheap check for questions that need no rewrite: long enough and without
+    pronouns or follow-up phrasing that refers to earlier turns."""
+    words = _words(question)
+    if len(words) < min_words:
+        return False
+    if question.strip().lower().startswith(FOLLOW_UP_STARTS):
+        return False
+    return not REFERENCE_WORDS.intersection(words)
+
+
+def is_equivalent(a, b, threshold=0.8):
+    # Jaccard similarity of the word sets
+    wa, wb = set(_words(a)), set(_words(b))
+    if not wa or not wb:
+        return wa == wb
+    return len(wa & wb) / len(wa | wb) >= threshold
+
+
+class RewriteStats:
+    """Counts how each turn was handled and estimates the latency saved."""
+
+    def __init__(self):
+        self.skipped = 0      # no rewrite call at all
+        self.reused = 0       # rewrite was equivalent, speculative results kept
+        self.rewritten = 0    # rewrite differed, retrieved again
+        self.saved_seconds = 0.0
+        self.avg_rewrite_seconds = None
+        self._lock = threading.Lock()
+
+    def record(self, outcome, saved_seconds=0.0, rewrite_seconds=None):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            self.saved_seconds += saved_seconds
+            if rewrite_seconds is not None:
+                previous = self.avg_rewrite_seconds
+                self.avg_rewrite_seconds = rewrite_seconds if previous is None else 0.8 * previous + 0.2 * rewrite_seconds
+
+    def summary(self):
+        turns = self.skipped + self.reused + self.rewritten
+        return {
+            "turns": turns,
+            "skipped": self.skipped,
+            "reused": self.reused,
+            "rewritten": self.rewritten,
+            "skip_or_reuse_rate": (self.skipped + self.reused) / turns if turns else 0.0,
+            "estimated_seconds_saved": round(self.saved_seconds, 3),
+        }
+
+
+def create_adaptive_history_aware_retriever(llm, retriever, prompt, stats: RewriteStats):
+    """Drop-in for create_history_aware_retriever.
+
+    - Empty history or a standalone question: retrieve with the raw question.
+    - Otherwise: start retrieving with the raw question while the LLM rewrites it.
+      If the rewrite is equivalent to the raw question, keep the speculative
+      results; if not, retrieve again with the rewritten question."""
+    rewrite_chain = prompt | llm | StrOutputParser()
+
+    def timed_retrieve(query, config):
+        start = time.perf_counter()
+        docs = retriever.invoke(query, config)
+        return docs, time.perf_counter() - start
+
+    def retrieve(inputs, config):
+        question = inputs["input"]
+        if not inputs.get("chat_history") or is_standalone(question):
+            docs, _ = timed_retrieve(question, config)
+            # Until a rewrite has been measured there is nothing to credit
+            stats.record("skipped", saved_seconds=stats.avg_rewrite_seconds or 0.0)
+            return docs
+
+        context = contextvars.copy_context()
+        speculative = _executor.submit(context.run, timed_retrieve, question, config)
+        start = time.perf_counter()
+        rewritten = rewrite_chain.invoke(inputs, config)
+        rewrite_seconds = time.perf_counter() - start
+
+        if is_equivalent(rewritten, question):
+            docs, retrieve_seconds = speculative.result()
+            stats.record("reused", saved_seconds=retrieve_seconds, rewrite_seconds=rewrite_seconds)
+            return docs
+
+        docs, _ = timed_retrieve(rewritten, config)
+        stats.record("rewritten", rewrite_seconds=rewrite_seconds)
+        return docs
+
+    return RunnableLambda(retrieve).with_config(run_name="adaptive_history_aware_retriever")
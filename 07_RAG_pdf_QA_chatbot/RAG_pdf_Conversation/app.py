@@ -3,22 +3,45 @@
 import streamlit as st
 from langchain.chains import create_history_aware_retriever, create_retrieval_chain
 from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain_chroma import Chroma
-from langchain_community.chat_message_histories import ChatMessageHistory
 from langchain_core.chat_history import BaseChatMessageHistory
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_groq import ChatGroq
+from langchain_core.runnables import RunnablePassthrough
 from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader
 import os
+import sys
+from pathlib import Path
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from upload_store import UploadVectorStores
+from session_store import HistoryBudget, SessionStore
+from adaptive_retriever import RewriteStats, create_adaptive_history_aware_retriever
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from common.embedding_cache import CachedEmbeddings
 
 from dotenv import load_dotenv
 load_dotenv()
 
 os.environ['HF_TOKEN']=os.getenv("HF_TOKEN")
-embeddings=HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+
+## Vector stores are shared by every session and keyed by the content hash of the uploaded files,
+## so reruns (e.g. typing a new question) reuse the collection instead of re-parsing and re-embedding
+@st.cache_resource
+def get_upload_stores():
+    # Chunk vectors are cached on disk, so re-uploading the same PDFs costs no embedding calls
+    embeddings=CachedEmbeddings(HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2"))
+    text_splitter=RecursiveCharacterTextSplitter(chunk_size=5000, chunk_overlap=500)
+    return UploadVectorStores(embeddings,text_splitter)
+
+def is_active_session(browser_session_id):
+    return runtime.exists() and runtime.get_instance().is_active_session(browser_session_id)
+
+upload_stores=get_upload_stores()
+## Drop collections that only belonged to sessions which have gone away
+upload_stores.release_inactive(is_active_session)
 
 
 ## set up Streamlit 
@@ -37,27 +60,25 @@ if api_key:
     session_id=st.text_input("Session ID",value="default_session")
     ## statefully manage chat history
 
+    ## Bounded store: LRU + idle TTL, optionally persisted to SQLite (SESSION_DB_PATH)
     if 'store' not in st.session_state:
-        st.session_state.store={}
+        st.session_state.store=SessionStore(
+            max_sessions=int(os.getenv("MAX_CHAT_SESSIONS","20")),
+            ttl_seconds=int(os.getenv("CHAT_SESSION_TTL_SECONDS","3600")),
+            db_path=os.getenv("SESSION_DB_PATH"),
+        )
+    store=st.session_state.store
+    ## Only the most recent turns that fit the budget (plus a rolling summary) are sent to the prompts
+    history_budget=HistoryBudget(max_tokens=int(os.getenv("HISTORY_TOKEN_BUDGET","1500")),summary_llm=llm)
 
     uploaded_files=st.file_uploader("Choose A PDf file",type="pdf",accept_multiple_files=True)
+    browser_session_id=get_script_run_ctx().session_id
+    if not uploaded_files:
+        upload_stores.release_session(browser_session_id)
     ## Process uploaded  PDF's
     if uploaded_files:
-        documents=[]
-        for uploaded_file in uploaded_files:
-            temppdf=f"./temp.pdf"
-            with open(temppdf,"wb") as file:
-                file.write(uploaded_file.getvalue())
-                file_name=uploaded_file.name
-
-            loader=PyPDFLoader(temppdf)
-            docs=loader.load()
-            documents.extend(docs)
-
-        # Split and create embeddings for the documents
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=5000, chunk_overlap=500)
-        splits = text_splitter.split_documents(documents)
-        vectorstore = Chroma.from_documents(documents=splits, embedding=embeddings)
+        # Parsed from memory, split and embedded only the first time this set of files is seen
+        vectorstore = upload_stores.get(browser_session_id, uploaded_files)
         retriever = vectorstore.as_retriever()    
 
         contextualize_q_system_prompt=(
@@ -75,7 +96,15 @@ if api_key:
                 ]
             )
         
-        history_aware_retriever=create_history_aware_retriever(llm,retriever,contextualize_q_prompt)
+        ## Adaptive mode skips the rewrite LLM call for standalone questions and otherwise
+        ## retrieves with the raw question while the rewrite runs
+        adaptive_rewrite=st.sidebar.checkbox("Adaptive query rewrite",value=True)
+        if 'rewrite_stats' not in st.session_state:
+            st.session_state.rewrite_stats=RewriteStats()
+        if adaptive_rewrite:
+            history_aware_retriever=create_adaptive_history_aware_retriever(llm,retriever,contextualize_q_prompt,st.session_state.rewrite_stats)
+        else:
+            history_aware_retriever=create_history_aware_retriever(llm,retriever,contextualize_q_prompt)
 
     
         # Answer question
@@ -100,12 +129,17 @@ if api_key:
         rag_chain=create_retrieval_chain(history_aware_retriever,question_answer_chain)
 
         def get_session_history(session:str)->BaseChatMessageHistory:
-            if session_id not in st.session_state.store:
-                st.session_state.store[session_id]=ChatMessageHistory()
-            return st.session_state.store[session_id]
+            return store.get(session)
+
+        def budgeted_history(inputs,config):
+            session=config["configurable"]["session_id"]
+            return history_budget.replay(store.get(session),inputs["chat_history"])
+
+        # The full history is stored, but the prompts only see the budgeted window
+        budgeted_rag_chain=RunnablePassthrough.assign(chat_history=budgeted_history)|rag_chain
         
         conversational_rag_chain=RunnableWithMessageHistory(
-            rag_chain,get_session_history,
+            budgeted_rag_chain,get_session_history,
             input_messages_key="input",
             history_messages_key="chat_history",
             output_messages_key="answer"
@@ -120,9 +154,11 @@ if api_key:
                     "configurable": {"session_id":session_id}
                 },  # constructs a key "abc123" in `store`.
             )
-            st.write(st.session_state.store)
+            st.write(f"Sessions in memory: {len(store)}")
             st.write("Assistant:", response['answer'])
             st.write("Chat History:", session_history.messages)
+
+        st.sidebar.write("Query rewrite:", st.session_state.rewrite_stats.summary())
 else:
     st.warning("Please enter the GRoq API Key")
 
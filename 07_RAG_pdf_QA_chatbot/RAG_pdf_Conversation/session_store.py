@@ -0,0 +1,182 @@
+# Bounded chat session store with token-budgeted history replay
+import json
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, SystemMessage, message_to_dict, messages_from_dict
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from common.tokens import approx_message_tokens
+
+
+class StoredChatHistory(BaseChatMessageHistory):
+    """In-memory history that writes new messages through to the store's SQLite file."""
+
+    def __init__(self, session_id, store: "SessionStore", messages=None, summary="", summarized_upto=0):
+        self.session_id = session_id
+        self.store = store
+        self.messages: List[BaseMessage] = list(messages or [])
+        # Rolling summary of messages[:summarized_upto]
+        self.summary = summary
+        self.summarized_upto = summarized_upto
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        start = len(self.messages)
+        self.messages.extend(messages)
+        self.store._persist_messages(self.session_id, start, messages)
+
+    def clear(self) -> None:
+        self.messages = []
+        self.summary = ""
+        self.summarized_upto = 0
+        self.store._delete(self.session_id)
+
+
+class SessionStore:
+    """Holds at most `max_sessions` histories in memory, evicting the least recently
+    used, and drops sessions idle for longer than `ttl_seconds`. With `db_path`
+    set, histories are also kept in SQLite and reloaded after eviction or restart."""
+
+    def __init__(self, max_sessions=100, ttl_seconds=3600, db_path=None):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()  # session id -> (history, last access)
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS chat_messages ("
+                "session_id TEXT, position INTEGER, message TEXT, PRIMARY KEY (session_id, position))"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS chat_summaries (session_id TEXT PRIMARY KEY, summary TEXT, summarized_upto INTEGER)"
+            )
+            self._db.commit()
+
+    def get(self, session_id) -> StoredChatHistory:
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            if session_id in self._sessions:
+                history, _ = self._sessions.pop(session_id)
+            else:
+                history = self._load(session_id)
+            self._sessions[session_id] = (history, now)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return history
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _expire(self, now):
+        for session_id in [s for s, (_, seen) in self._sessions.items() if now - seen > self.ttl_seconds]:
+            del self._sessions[session_id]
+
+    def _load(self, session_id):
+        if self._db is None:
+            return StoredChatHistory(session_id, self)
+        rows = self._db.execute(
+            "SELECT message FROM chat_messages WHERE session_id = ? ORDER BY position", (session_id,)
+        ).fetchall()
+        summary = self._db.execute(
+            "SELECT summary, summarized_upto FROM chat_summaries WHERE session_id = ?", (session_id,)
+        ).fetchone() or ("", 0)
+        messages = messages_from_dict([json.loads(row[0]) for row in rows])
+        return StoredChatHistory(session_id, self, messages, *summary)
+
+    def _persist_messages(self, session_id, start, messages):
+        if self._db is None:
+            return
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO chat_messages VALUES (?, ?, ?)",
+                [(session_id, start + i, json.dumps(message_to_dict(m))) for i, m in enumerate(messages)],
+            )
+            self._db.commit()
+
+    def _persist_summary(self, history):
+        if self._db is None:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO chat_summaries VALUES (?, ?, ?)",
+                (history.session_id, history.summary, history.summarized_upto),
+            )
+            self._db.commit()
+
+    def _delete(self, session_id):
+        if self._db is None:
+            return
+        with self._lock:
+            self._db.execute("DELETE FROM chat_messages WHERE session_id = ?", (session_id,))
+            self._db.execute("DELETE FROM chat_summaries WHERE session_id = ?", (session_id,))
+            self._db.commit()
+
+
+summary_prompt = ChatPromptTemplate.from_messages([
+    ("system", "Update the running summary of a conversation. Keep names, facts and open questions. "
+               "Answer with the new summary only, at most 150 words."),
+    ("human", "Current summary:\n{summary}\n\nNew messages:\n{messages}"),
+])
+
+
+class HistoryBudget:
+    """Chooses what history to replay into the prompts: the most recent messages
+    that fit in `max_tokens`, preceded by a rolling summary of older messages when
+    a `summary_llm` is given. The summary is refreshed in batches of at least
+    `summary_batch` messages so it does not cost an LLM call on every turn; until
+    then the messages waiting for it are replayed as they are."""
+
+    def __init__(self, max_tokens=1500, summary_llm=None, summary_batch=6, token_counter=approx_message_tokens):
+        self.max_tokens = max_tokens
+        self.summary_chain = summary_prompt | summary_llm | StrOutputParser() if summary_llm else None
+        self.summary_batch = summary_batch
+        self.token_counter = token_counter
+
+    def recent(self, messages):
+        kept, used = [], 0
+        for message in reversed(messages):
+            used += self.token_counter([message])
+            if used > self.max_tokens:
+                break
+            kept.append(message)
+        kept.reverse()
+        # Do not start the window in the middle of a question/answer pair
+        while kept and kept[0].type != "human":
+            kept.pop(0)
+        return kept
+
+    def replay(self, history: Optional[StoredChatHistory], messages: Sequence[BaseMessage]):
+        messages = list(messages)
+        kept = self.recent(messages)
+        if history is None or self.summary_chain is None:
+            return kept
+
+        dropped_upto = len(messages) - len(kept)
+        if dropped_upto - history.summarized_upto >= self.summary_batch:
+            new_messages = messages[history.summarized_upto:dropped_upto]
+            history.summary = self.summary_chain.invoke({
+                "summary": history.summary or "(none)",
+                "messages": "\n".join(f"{m.type}: {m.content}" for m in new_messages),
+            })
+            history.summarized_upto = dropped_upto
+            history.store._persist_summary(history)
+
+        # Dropped from the window but not summarized yet: replay them rather than lose them
+        kept = messages[history.summarized_upto:dropped_upto] + kept
+        if history.summary:
+            return [SystemMessage(content=f"Summary of the earlier conversation: {history.summary}")] + kept
+        return kept
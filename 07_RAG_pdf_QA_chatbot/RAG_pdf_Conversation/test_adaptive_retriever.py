@@ -0,0 +1,98 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnableLambda
+
+from adaptive_retriever import RewriteStats, create_adaptive_history_aware_retriever, is_equivalent, is_standalone
+
+HISTORY = [HumanMessage(content="What is a transformer?"), AIMessage(content="A neural network built on attention.")]
+prompt = ChatPromptTemplate.from_messages([
+    ("system", "Rewrite the question so it can be understood without the chat history."),
+    MessagesPlaceholder("chat_history"),
+    ("human", "{input}"),
+])
+
+
+@pytest.mark.parametrize("question, standalone", [
+    ("What is the attention mechanism in transformers?", True),
+    ("How does scaled dot product attention work?", True),
+    ("Explain self attention", False),  # too short to trust
+    ("What about its limits?", False),
+    ("And how does the decoder work?", False),
+    ("How does that compare with recurrent networks?", False),
+    ("Can you summarize the previous answer in detail?", False),
+])
+def test_is_standalone(question, standalone):
+    assert is_standalone(question) is standalone
+
+
+@pytest.mark.parametrize("a, b, equivalent", [
+    ("How long does it take to train the model?", "how long does it take to train the model", True),
+    ("How long does it take to train the model?", "How long does it take to train the big model?", True),
+    ("What about its limits?", "What are the limits of the transformer architecture?", False),
+])
+def test_is_equivalent(a, b, equivalent):
+    assert is_equivalent(a, b) is equivalent
+
+
+class Fakes:
+    """A retriever that returns the query it was given and an LLM that returns a fixed rewrite."""
+
+    def __init__(self, rewrite):
+        self.queries, self.rewrites = [], 0
+        self.rewrite = rewrite
+        self.retriever = RunnableLambda(self._retrieve)
+        self.llm = RunnableLambda(self._rewrite)
+
+    def _retrieve(self, query):
+        self.queries.append(query)
+        return [Document(page_content=query)]
+
+    def _rewrite(self, prompt_value):
+        self.rewrites += 1
+        return self.rewrite
+
+
+@pytest.mark.parametrize("question, history, rewrite, retrieved, rewrites, outcome", [
+    # No history: the raw question, no rewrite call
+    ("What about its limits?", [], "unused", "What about its limits?", 0, "skipped"),
+    # Standalone question despite history: no rewrite call
+    ("What is the attention mechanism in transformers?", HISTORY, "unused",
+     "What is the attention mechanism in transformers?", 0, "skipped"),
+    # Follow-up whose rewrite adds little: the speculative raw-question results are kept
+    ("How long does it take to train it?", HISTORY, "How long does it take to train it now?",
+     "How long does it take to train it?", 1, "reused"),
+    # Follow-up whose rewrite differs: retrieved again with the rewrite
+    ("What about its limits?", HISTORY, "What are the limits of the transformer architecture?",
+     "What are the limits of the transformer architecture?", 1, "rewritten"),
+])
+def test_rewrite_is_skipped_reused_or_applied(question, history, rewrite, retrieved, rewrites, outcome):
+    fakes, stats = Fakes(rewrite), RewriteStats()
+    retriever = create_adaptive_history_aware_retriever(fakes.llm, fakes.retriever, prompt, stats)
+
+    docs = retriever.invoke({"input": question, "chat_history": history})
+
+    assert [doc.page_content for doc in docs] == [retrieved]
+    if outcome == "rewritten":
+        assert retrieved in fakes.queries  # the speculative raw-question search may still be running
+    else:
+        assert fakes.queries == [question]  # one search, with the raw question
+    assert fakes.rewrites == rewrites
+    summary = stats.summary()
+    assert summary["turns"] == 1 and summary[outcome] == 1
+
+
+def test_stats_credit_skips_with_the_measured_rewrite_time():
+    stats = RewriteStats()
+    stats.record("skipped")  # nothing measured yet
+    stats.record("rewritten", rewrite_seconds=1.0)
+    stats.record("skipped", saved_seconds=stats.avg_rewrite_seconds)
+    stats.record("reused", saved_seconds=0.25, rewrite_seconds=2.0)
+    assert stats.avg_rewrite_seconds == pytest.approx(1.2)
+    assert stats.summary() == {
+        "turns": 4, "skipped": 2, "reused": 1, "rewritten": 1,
+        "skip_or_reuse_rate": 0.75, "estimated_seconds_saved": 1.25,
+    }
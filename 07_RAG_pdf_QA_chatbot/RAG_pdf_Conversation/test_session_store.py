@@ -0,0 +1,129 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
+
+import session_store
+from session_store import HistoryBudget, SessionStore
+
+
+def turns(count, start=0):
+    messages = []
+    for i in range(start, start + count):
+        messages += [HumanMessage(content=f"question {i}"), AIMessage(content=f"answer {i}")]
+    return messages
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(session_store.time, "time", clock)
+    return clock
+
+
+def test_least_recently_used_session_is_evicted():
+    store = SessionStore(max_sessions=2)
+    a = store.get("a")
+    store.get("b")
+    assert store.get("a") is a
+    store.get("c")
+    assert "a" in store and "c" in store and "b" not in store
+    assert len(store) == 2
+
+
+def test_idle_sessions_expire(clock):
+    store = SessionStore(ttl_seconds=60)
+    store.get("a")
+    clock.now += 30
+    store.get("b")
+    clock.now += 45
+    store.get("b")
+    assert "a" not in store and "b" in store
+
+
+def test_histories_are_reloaded_from_sqlite(tmp_path):
+    db_path = tmp_path / "sessions.db"
+    store = SessionStore(max_sessions=1, db_path=db_path)
+    history = store.get("a")
+    history.add_messages(turns(2))
+    history.summary, history.summarized_upto = "talked about questions", 2
+    store._persist_summary(history)
+
+    store.get("b")  # evicts "a" from memory
+    assert "a" not in store
+    reloaded = store.get("a")
+    assert reloaded is not history
+    assert reloaded.messages == turns(2)
+
+    restarted = SessionStore(db_path=db_path).get("a")
+    assert restarted.messages == turns(2)
+    assert (restarted.summary, restarted.summarized_upto) == ("talked about questions", 2)
+
+    restarted.clear()
+    assert SessionStore(db_path=db_path).get("a").messages == []
+
+
+class FakeSummarizer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, prompt):
+        self.calls.append(prompt.to_messages()[-1].content)
+        return f"summary {len(self.calls)}"
+
+
+@pytest.fixture
+def budget():
+    # Two messages fit in the window
+    summarizer = FakeSummarizer()
+    budget = HistoryBudget(max_tokens=20, summary_llm=RunnableLambda(summarizer), summary_batch=6,
+                           token_counter=lambda messages: 10 * len(messages))
+    budget.summarizer = summarizer
+    return budget
+
+
+def test_recent_window_fits_the_budget_and_starts_with_a_question(budget):
+    assert budget.recent(turns(3)) == turns(1, start=2)
+    assert budget.recent(turns(3)[:-1]) == [HumanMessage(content="question 2")]  # not [answer 1, question 2]
+
+
+def test_without_a_summarizer_only_the_window_is_replayed():
+    budget = HistoryBudget(max_tokens=20, token_counter=lambda messages: 10 * len(messages))
+    assert budget.replay(SessionStore().get("s"), turns(3)) == turns(1, start=2)
+
+
+@pytest.mark.parametrize("pairs", [2, 3])
+def test_messages_waiting_for_a_summary_are_replayed(budget, pairs):
+    # Fewer than summary_batch dropped messages: nothing is summarized and nothing is lost
+    assert budget.replay(SessionStore().get("s"), turns(pairs)) == turns(pairs)
+    assert budget.summarizer.calls == []
+
+
+def test_summary_covers_a_batch_and_the_rest_is_replayed(budget, tmp_path):
+    summarizer = budget.summarizer
+    store = SessionStore(db_path=tmp_path / "sessions.db")
+    history = store.get("s")
+
+    replayed = budget.replay(history, turns(4))
+    assert len(summarizer.calls) == 1
+    assert "question 0" in summarizer.calls[0] and "answer 2" in summarizer.calls[0]
+    assert "question 3" not in summarizer.calls[0]
+    assert replayed == [SystemMessage(content="Summary of the earlier conversation: summary 1")] + turns(1, start=3)
+    assert history.summarized_upto == 6
+
+    # Two more turns: four messages left the window, fewer than a batch, so they are replayed after the summary
+    replayed = budget.replay(history, turns(6))
+    assert len(summarizer.calls) == 1
+    assert replayed[1:] == turns(2, start=3) + turns(1, start=5)
+
+    restarted = SessionStore(db_path=tmp_path / "sessions.db").get("s")
+    assert (restarted.summary, restarted.summarized_upto) == ("summary 1", 6)
@@ -0,0 +1,78 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("langchain_chroma")
+pytest.importorskip("pypdf")
+from upload_store import UploadVectorStores
+
+
+class FakeUpload:
+    def __init__(self, name, data):
+        self.name = name
+        self._data = data
+
+    def getvalue(self):
+        return self._data
+
+
+class FakeStore:
+    deleted = False
+
+    def delete_collection(self):
+        self.deleted = True
+
+
+class BlockingStores(UploadVectorStores):
+    """Builds block until `release` is set; `started` is set once a build is running."""
+
+    def __init__(self):
+        super().__init__(embeddings=None, text_splitter=None)
+        self.builds = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def _build(self, content_hash, uploaded_files):
+        self.builds += 1
+        self.started.set()
+        assert self.release.wait(timeout=5)
+        return FakeStore()
+
+
+def test_concurrent_identical_uploads_build_once_without_blocking_others():
+    stores = BlockingStores()
+    upload = [FakeUpload("a.pdf", b"same")]
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        shared = [pool.submit(stores.get, f"s{i}", upload) for i in range(5)]
+        assert stores.started.wait(timeout=5)
+        # The global lock is free while the build is blocked: stats() returns before the build is released
+        stats = pool.submit(stores.stats).result(timeout=5)
+        assert not stores.release.is_set()
+        assert stats["collections"] == 0
+        stores.release.set()
+        results = {id(future.result(timeout=5)) for future in shared}
+    assert len(results) == 1
+    assert stores.builds == 1
+    assert stores.stats() == {"collections": 1, "sessions": 5}
+
+
+def test_store_released_during_its_build_is_not_returned_deleted():
+    stores = BlockingStores()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(stores.get, "s1", [FakeUpload("a.pdf", b"x")])
+        assert stores.started.wait(timeout=5)
+        stores.release_inactive(lambda session_id: False)
+        stores.release.set()
+        store = pending.result(timeout=5)
+    assert not store.deleted
+    assert stores.stats() == {"collections": 1, "sessions": 1}
+
+
+def test_collection_is_deleted_when_its_last_session_goes():
+    stores = BlockingStores()
+    stores.release.set()
+    store = stores.get("s1", [FakeUpload("a.pdf", b"x")])
+    stores.release_session("s1")
+    assert store.deleted
+    assert stores.stats() == {"collections": 0, "sessions": 0}
@@ -0,0 +1,111 @@
+# Vector stores for uploaded PDFs, shared by content hash and released with their sessions
+import hashlib
+import io
+import threading
+from concurrent.futures import Future
+
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from pypdf import PdfReader
+
+
+def upload_set_hash(uploaded_files):
+    # Same files (by name and content) in any order -> same hash
+    digests = sorted(
+        (f.name, hashlib.sha256(f.getvalue()).hexdigest()) for f in uploaded_files
+    )
+    return hashlib.sha256(repr(digests).encode("utf-8")).hexdigest()
+
+
+def load_pdf_bytes(name, data):
+    # Parse straight from memory; no shared temp file between sessions
+    reader = PdfReader(io.BytesIO(data))
+    return [
+        Document(page_content=page.extract_text(), metadata={"source": name, "page": number})
+        for number, page in enumerate(reader.pages)
+    ]
+
+
+class UploadVectorStores:
+    """One Chroma collection per distinct set of uploaded PDFs.
+
+    Sessions that upload the same files share a collection. A collection is
+    deleted once no live session refers to it any more. Builds run outside the
+    lock, and concurrent requests for the same upload wait for a single build."""
+
+    def __init__(self, embeddings, text_splitter):
+        self.embeddings = embeddings
+        self.text_splitter = text_splitter
+        self._stores = {}    # upload hash -> Chroma
+        self._sessions = {}  # session id -> upload hash
+        self._building = {}  # upload hash -> Future of the Chroma being built
+        self._lock = threading.Lock()
+
+    def _build(self, content_hash, uploaded_files):
+        documents = []
+        for uploaded_file in uploaded_files:
+            documents.extend(load_pdf_bytes(uploaded_file.name, uploaded_file.getvalue()))
+        splits = self.text_splitter.split_documents(documents)
+        return Chroma.from_documents(
+            documents=splits, embedding=self.embeddings, collection_name=f"uploads-{content_hash[:32]}"
+        )
+
+    def get(self, session_id, uploaded_files):
+        content_hash = upload_set_hash(uploaded_files)
+        while True:
+            with self._lock:
+                self._claim(session_id, content_hash)
+                if content_hash in self._stores:
+                    return self._stores[content_hash]
+                future = self._building.get(content_hash)
+                owner = future is None
+                if owner:
+                    future = self._building[content_hash] = Future()
+            if owner:
+                break
+            # Another session is building it; look again once it is done, as it may be released by then
+            future.result()
+
+        try:
+            store = self._build(content_hash, uploaded_files)
+        except BaseException as e:
+            with self._lock:
+                del self._building[content_hash]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._building[content_hash]
+            self._stores[content_hash] = store
+            # The session may have been released during the build, but the caller is about to use the store
+            self._claim(session_id, content_hash)
+        future.set_result(store)
+        return store
+
+    def release_session(self, session_id):
+        with self._lock:
+            if session_id in self._sessions:
+                self._release_unused(self._sessions.pop(session_id))
+
+    def release_inactive(self, is_active):
+        """Forget sessions for which `is_active(session_id)` is False and delete
+        the collections nobody uses any more."""
+        with self._lock:
+            for session_id in [s for s in self._sessions if not is_active(s)]:
+                self._release_unused(self._sessions.pop(session_id))
+
+    def _claim(self, session_id, content_hash):
+        previous = self._sessions.get(session_id)
+        self._sessions[session_id] = content_hash
+        if previous and previous != content_hash:
+            self._release_unused(previous)
+
+    def _release_unused(self, content_hash):
+        if content_hash in self._sessions.values():
+            return
+        store = self._stores.pop(content_hash, None)
+        if store is not None:
+            store.delete_collection()
+
+    def stats(self):
+        with self._lock:
+            return {"collections": len(self._stores), "sessions": len(self._sessions)}
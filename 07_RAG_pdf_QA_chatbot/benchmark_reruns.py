@@ -0,0 +1,78 @@
+# Startup vs warm-rerun latency of the 07 RAG app resources
+import argparse
+import os
+import time
+
+from langchain.chains import create_retrieval_chain
+from langchain.chains.combine_documents import create_stuff_documents_chain
+from langchain_core.prompts import ChatPromptTemplate
+
+from resources import get_retrieval_chain, get_vector_index
+
+prompt_template = """
+    Answer the questions based on the provided context only.
+    <context>
+    {context}
+    <context>
+    Question:{input}
+    """
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def rerun(index_dir, groq_api_key):
+    # Everything huggingface_app.py does before answering a question
+    index = get_vector_index(index_dir, "huggingface")
+    return get_retrieval_chain(index.vectorstore, id(index.vectorstore), prompt_template, groq_api_key)
+
+
+def rebuild_every_time(index_dir, groq_api_key):
+    # What the app used to do on each question: new embedding model, LLM and chains
+    from langchain_groq import ChatGroq
+    from langchain_huggingface import HuggingFaceEmbeddings
+    HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+    index = get_vector_index(index_dir, "huggingface")
+    llm = ChatGroq(groq_api_key=groq_api_key, model_name="Llama3-8b-8192")
+    document_chain = create_stuff_documents_chain(llm, ChatPromptTemplate.from_template(prompt_template))
+    return create_retrieval_chain(index.vectorstore.as_retriever(), document_chain)
+
+
+def report(label, ms):
+    print(f"{label:<45}{ms:>12.3f} ms")
+
+
+def main(args):
+    # No LLM call is made, so any key works for the benchmark
+    groq_api_key = os.getenv("GROQ_API_KEY") or "gsk-benchmark"
+
+    index, cold_ms = timed(lambda: get_vector_index(args.index_dir, "huggingface"))
+    report("cold start (load embedding model + index)", cold_ms)
+    if index.vectorstore is None:
+        _, sync_ms = timed(lambda: index.sync(args.pdf_dir))
+        report(f"first sync of {args.pdf_dir}", sync_ms)
+
+    _, first_ms = timed(lambda: rerun(args.index_dir, groq_api_key))
+    report("first question (build LLM + chain)", first_ms)
+
+    warm = [timed(lambda: rerun(args.index_dir, groq_api_key))[1] for _ in range(args.reruns)]
+    report(f"warm rerun, mean of {args.reruns}", sum(warm) / len(warm))
+
+    before = [timed(lambda: rebuild_every_time(args.index_dir, groq_api_key))[1] for _ in range(args.before_runs)]
+    report(f"rerun before caching, mean of {args.before_runs}", sum(before) / len(before))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure cold start and warm rerun cost of the cached resources")
+    parser.add_argument("--index-dir", default="faiss_index_hf")
+    parser.add_argument("--pdf-dir", default="research_papers")
+    parser.add_argument("--reruns", type=int, default=100)
+    parser.add_argument("--before-runs", type=int, default=3)
+    main(parser.parse_args())
+
+# To run (outside `streamlit run`, Streamlit caches fall back to in-memory storage and
+# print a "No runtime found" warning, which is expected):
+# python benchmark_reruns.py --reruns 100
@@ -0,0 +1,145 @@
+# Incremental, content-hashed FAISS index persisted on disk
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+from langchain_community.vectorstores import FAISS
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.pdf_ingestion import iter_pdf_documents
+
+MANIFEST_NAME = "manifest.json"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_id(source, doc):
+    # Same file + page + text -> same id, so unchanged chunks are never re-embedded
+    key = f"{source}\0{doc.metadata.get('page', '')}\0{doc.page_content}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class IncrementalFaissIndex:
+    """FAISS index stored in `index_dir` together with a manifest of every PDF's
+    content hash and the ids of its chunks.
+
+    `sync(pdf_dir)` embeds only new or changed PDFs (and only the chunks of a
+    changed PDF that actually changed) and removes the chunks of deleted PDFs."""
+
+    def __init__(self, index_dir, embeddings, text_splitter, workers=None):
+        self.index_dir = Path(index_dir)
+        self.embeddings = embeddings
+        self.text_splitter = text_splitter
+        self.workers = workers
+        self._lock = threading.Lock()  # the index can be shared by several sessions
+        self.manifest = {"files": {}}
+        self.vectorstore = None
+        self.load()
+
+    def load(self):
+        manifest_path = self.index_dir / MANIFEST_NAME
+        if manifest_path.exists() and (self.index_dir / "index.faiss").exists():
+            self.manifest = json.loads(manifest_path.read_text())
+            # The pickle was written by this class, so it is safe to load
+            self.vectorstore = FAISS.load_local(
+                str(self.index_dir), self.embeddings, allow_dangerous_deserialization=True
+            )
+        return self.vectorstore
+
+    def save(self):
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        if self.vectorstore is not None:
+            self.vectorstore.save_local(str(self.index_dir))
+        tmp_path = self.index_dir / (MANIFEST_NAME + ".tmp")
+        tmp_path.write_text(json.dumps(self.manifest, indent=1))
+        os.replace(tmp_path, self.index_dir / MANIFEST_NAME)
+
+    def load_files(self, paths):
+        # Pages of all changed files are parsed in parallel, then grouped back per file
+        pages = defaultdict(list)
+        for doc in iter_pdf_documents(paths, workers=self.workers):
+            pages[doc.metadata["source"]].append(doc)
+        return pages
+
+    def _delete(self, ids):
+        if ids and self.vectorstore is not None:
+            self.vectorstore.delete(list(ids))
+
+    def _add(self, docs, ids):
+        if not docs:
+            return
+        if self.vectorstore is None:
+            self.vectorstore = FAISS.from_documents(docs, self.embeddings, ids=ids)
+        else:
+            self.vectorstore.add_documents(docs, ids=ids)
+
+    def sync(self, pdf_dir):
+        with self._lock:
+            return self._sync(Path(pdf_dir))
+
+    def _sync(self, pdf_dir):
+        stats = {"added_files": 0, "changed_files": 0, "removed_files": 0,
+                 "unchanged_files": 0, "embedded_chunks": 0, "removed_chunks": 0}
+        files = self.manifest["files"]
+        dirty = not (self.index_dir / MANIFEST_NAME).exists()
+        current = {str(p.relative_to(pdf_dir)): p for p in sorted(pdf_dir.glob("**/*.pdf"))}
+
+        # Drop chunks of PDFs that are gone
+        for name in sorted(set(files) - set(current)):
+            self._delete(files[name]["chunks"])
+            stats["removed_chunks"] += len(files[name]["chunks"])
+            stats["removed_files"] += 1
+            del files[name]
+
+        changed = {}
+        for name, path in current.items():
+            stat = path.stat()
+            entry = files.get(name)
+            # Size and mtime unchanged: skip hashing entirely
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                stats["unchanged_files"] += 1
+                continue
+            sha = file_sha256(path)
+            if entry and entry["sha256"] == sha:
+                entry.update(size=stat.st_size, mtime=stat.st_mtime)
+                stats["unchanged_files"] += 1
+                dirty = True
+                continue
+            changed[name] = (path, sha, stat)
+
+        pages = self.load_files([str(path) for path, _, _ in changed.values()])
+        for name, (path, sha, stat) in changed.items():
+            entry = files.get(name)
+            chunks = self.text_splitter.split_documents(pages[str(path)])
+            new_ids, new_docs, seen = [], [], set()
+            for doc in chunks:
+                cid = chunk_id(name, doc)
+                if cid not in seen:
+                    seen.add(cid)
+                    new_ids.append(cid)
+                    new_docs.append(doc)
+
+            old_ids = set(entry["chunks"]) if entry else set()
+            stale = old_ids - seen
+            self._delete(stale)
+            fresh = [(cid, doc) for cid, doc in zip(new_ids, new_docs) if cid not in old_ids]
+            self._add([doc for _, doc in fresh], [cid for cid, _ in fresh])
+
+            stats["changed_files" if entry else "added_files"] += 1
+            stats["embedded_chunks"] += len(fresh)
+            stats["removed_chunks"] += len(stale)
+            files[name] = {"sha256": sha, "size": stat.st_size, "mtime": stat.st_mtime, "chunks": new_ids}
+
+        if dirty or any(stats[k] for k in ("added_files", "changed_files", "removed_files")):
+            self.save()
+        return stats
@@ -1,15 +1,7 @@
 import streamlit as st
 import os
-from langchain_groq import ChatGroq
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.embeddings import OllamaEmbeddings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain_core.prompts import ChatPromptTemplate
-from langchain.chains import create_retrieval_chain
-from langchain_community.vectorstores import FAISS
-from langchain_community.document_loaders import PyPDFDirectoryLoader
-import openai
+from resources import get_vector_index, get_retrieval_chain
+from common.latency import default_recorder, timed_invoke
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -19,10 +11,7 @@ os.environ['GROQ_API_KEY']=os.getenv("GROQ_API_KEY")
 
 groq_api_key=os.getenv("GROQ_API_KEY")
 
-llm=ChatGroq(groq_api_key=groq_api_key,model_name="Llama3-8b-8192")
-
-prompt=ChatPromptTemplate.from_template(
-    """
+prompt_template="""
     Answer the questions based on the provided context only.
     Please provide the most accurate respone based on the question
     <context>
@@ -32,42 +21,33 @@ prompt=ChatPromptTemplate.from_template(
 
     """
 
-)
+# The embedding model, LLM client, index and retrieval chain are built once per process
+# (see resources.py), so a rerun only pays for the widgets
+index = get_vector_index("faiss_index_openai", "openai")
 
 def create_vector_embedding():
-    
-    if "vectors" not in st.session_state:
-        
-        st.session_state.embeddings = OpenAIEmbeddings() #Embedding model
-        
-        st.session_state.loader = PyPDFDirectoryLoader("research_papers") # Data Ingestion step
-        st.session_state.docs = st.session_state.loader.load() # Document Loading
-        
-        st.session_state.text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000,chunk_overlap=200) # chunk docs
-        st.session_state.final_documents = st.session_state.text_splitter.split_documents(st.session_state.docs[:50]) # split docs
-        
-        # create vectors(FAISS), use; docs+embed model
-        st.session_state.vectors = FAISS.from_documents(st.session_state.final_documents,st.session_state.embeddings) 
-        
-        
+    # Only new or changed PDFs in research_papers are embedded; chunks of deleted PDFs are removed
+    return index.sync("research_papers")
+
+
 st.title("RAG Document Q&A With Groq And llama3")
 
 user_prompt=st.text_input("Enter your message based on the research paper")
 
 if st.button("Document Embedding"):
-    create_vector_embedding()
+    stats = create_vector_embedding()
     st.write("Vector Database is ready")
+    st.write(stats)
 
-import time
 
-if user_prompt:
-    document_chain=create_stuff_documents_chain(llm,prompt)
-    retriever=st.session_state.vectors.as_retriever()
-    retrieval_chain=create_retrieval_chain(retriever,document_chain)
+if user_prompt and index.vectorstore is None:
+    st.warning("Please create the document embeddings first")
+elif user_prompt:
+    retrieval_chain=get_retrieval_chain(index.vectorstore,id(index.vectorstore),prompt_template,groq_api_key)
 
-    start=time.process_time()
-    response=retrieval_chain.invoke({'input':user_prompt})
-    print(f"Response time :{time.process_time()-start}")
+    # Wall-clock time per stage (embedding, vector search, prompt, LLM TTFT/total, tokens)
+    response,timings=timed_invoke(retrieval_chain,{'input':user_prompt})
+    print(f"Response time :{timings}")
 
     st.write(response['answer'])
 
@@ -77,8 +57,6 @@ if user_prompt:
             st.write(doc.page_content)
             st.write('------------------------')
 
-
-
-
-
-
+    with st.expander("Latency by stage (p50/p95/p99, seconds)"):
+        st.json(timings)
+        st.json(default_recorder.snapshot())
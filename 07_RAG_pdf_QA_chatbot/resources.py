@@ -0,0 +1,44 @@
+# Process-wide, lazily created resources for the 07 RAG apps
+# Streamlit re-executes the app script on every interaction; anything built here is
+# created on first use and then shared by every rerun and every session.
+import streamlit as st
+from langchain.chains import create_retrieval_chain
+from langchain.chains.combine_documents import create_stuff_documents_chain
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.prompts import ChatPromptTemplate
+
+from index_store import IncrementalFaissIndex
+from common.embedding_cache import CachedEmbeddings
+from common.latency import TimedEmbeddings
+
+
+@st.cache_resource(show_spinner="Loading embedding model...")
+def get_embeddings(provider):
+    if provider == "huggingface":
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return TimedEmbeddings(CachedEmbeddings(HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")))
+    if provider == "openai":
+        from langchain_openai import OpenAIEmbeddings
+        return TimedEmbeddings(CachedEmbeddings(OpenAIEmbeddings()))
+    raise ValueError(f"Unknown embedding provider: {provider}")
+
+
+@st.cache_resource
+def get_llm(groq_api_key, model_name="Llama3-8b-8192"):
+    from langchain_groq import ChatGroq
+    # streaming=True lets the latency callbacks see the first token
+    return ChatGroq(groq_api_key=groq_api_key, model_name=model_name, streaming=True)
+
+
+@st.cache_resource(show_spinner="Loading vector index...")
+def get_vector_index(index_dir, provider):
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    return IncrementalFaissIndex(index_dir, get_embeddings(provider), text_splitter)
+
+
+@st.cache_resource
+def get_retrieval_chain(_vectorstore, vectorstore_id, prompt_template, groq_api_key, model_name="Llama3-8b-8192"):
+    # _vectorstore is not hashed by Streamlit; vectorstore_id (its id()) keys the cache instead
+    prompt = ChatPromptTemplate.from_template(prompt_template)
+    document_chain = create_stuff_documents_chain(get_llm(groq_api_key, model_name), prompt)
+    return create_retrieval_chain(_vectorstore.as_retriever(), document_chain)
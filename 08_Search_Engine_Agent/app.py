@@ -1,11 +1,7 @@
 import streamlit as st
-from langchain_groq import ChatGroq
 from langchain_community.utilities import ArxivAPIWrapper, WikipediaAPIWrapper
 from langchain_community.tools import ArxivQueryRun, WikipediaQueryRun
-from langchain.agents import initialize_agent, AgentType
 from langchain_community.callbacks.streamlit import StreamlitCallbackHandler
-from langchain.tools import Tool
-import time
 import os
 from dotenv import load_dotenv
 from duckduckgo_search import DDGS  # Different approach using duckduckgo_search directly
@@ -13,6 +9,9 @@ from duckduckgo_search import DDGS  # Different approach using duckduckgo_search
 # Load environment variables
 load_dotenv()
 
+from search_agent import build_search_agent
+from search_tools import SearchToolLayer
+
 # Initialize Arxiv and Wikipedia tools
 arxiv_wrapper = ArxivAPIWrapper(top_k_results=1, doc_content_chars_max=200)
 arxiv = ArxivQueryRun(api_wrapper=arxiv_wrapper)
@@ -21,25 +20,50 @@ wiki_wrapper = WikipediaAPIWrapper(top_k_results=1, doc_content_chars_max=200)
 wiki = WikipediaQueryRun(api_wrapper=wiki_wrapper)
 
 # Modified search function using DDGS directly
+# Pacing is done by the DuckDuckGo token bucket in the tool layer, not by a fixed sleep
 def safe_search(query):
-    try:
-        time.sleep(1)
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=2))
-            if results:
-                # Combine the results into a single string
-                combined_results = " ".join([result['body'] for result in results])
-                return combined_results[:500]  # Limit response length
-            return "No results found. Please try a different search query."
-    except Exception as e:
-        return f"Search error occurred. Please try again with a different query. Error: {str(e)}"
-
-# Define safe search function as a Tool
-safe_search_tool = Tool(
-    name="Safe Search",
-    func=safe_search,
-    description="Used for safely searching with DuckDuckGo."
-)
+    with DDGS() as ddgs:
+        results = list(ddgs.text(query, max_results=2))
+        if results:
+            # Combine the results into a single string
+            combined_results = " ".join([result['body'] for result in results])
+            return combined_results[:500]  # Limit response length
+        return "No results found. Please try a different search query."
+
+# One tool layer per server process, so the rate limits and the result cache are shared by all sessions
+@st.cache_resource
+def get_search_layer():
+    return SearchToolLayer(
+        backends={"duckduckgo": safe_search, "arxiv": arxiv_wrapper.run, "wikipedia": wiki_wrapper.run},
+        # (calls per second, burst) per backend
+        rates={
+            "duckduckgo": (float(os.getenv("DDG_RATE", "1")), 2),
+            "arxiv": (float(os.getenv("ARXIV_RATE", "1")), 1),
+            "wikipedia": (float(os.getenv("WIKI_RATE", "5")), 5),
+        },
+        ttl_seconds=int(os.getenv("SEARCH_CACHE_TTL", "600")),
+    )
+
+search_layer = get_search_layer()
+
+# Define tools; each call goes through the rate limiter and the TTL cache
+@st.cache_resource
+def get_tools():
+    tools = [
+        # Queries that fit several sources are sent to all of them concurrently in one agent step
+        search_layer.fan_out_tool(),
+        search_layer.tool("duckduckgo", "Safe Search", "Used for safely searching with DuckDuckGo."),
+        search_layer.tool("arxiv", arxiv.name, arxiv.description),
+        search_layer.tool("wikipedia", wiki.name, wiki.description),
+    ]
+    return {tool.name: tool for tool in tools}
+
+# The agent is built once per (api key, model, tool set) and reused for every message;
+# initialize_agent renders the ReAct prompt with the tool descriptions only at build time
+@st.cache_resource
+def get_search_agent(api_key, model_name, tool_names):
+    tools = get_tools()
+    return build_search_agent(api_key, model_name, [tools[name] for name in tool_names])
 
 # Streamlit title and description
 st.title("🔎 LangChain - Chat with Search")
@@ -68,24 +92,13 @@ if prompt := st.chat_input(placeholder="What is machine learning?"):
     st.session_state["messages"].append({"role": "user", "content": prompt})
     st.chat_message("user").write(prompt)
 
-    # Initialize Groq language model
+    # Check the Groq API key
     if not api_key:
         st.error("Please enter your Groq API Key in the sidebar.")
     else:
-        llm = ChatGroq(groq_api_key=api_key, model_name="Llama3-8b-8192", streaming=True)
-
-        # Define tools
-        tools = [safe_search_tool, arxiv, wiki]
-
-        # Create agent
+        # Create agent (cached across messages and reruns)
         try:
-            search_agent = initialize_agent(
-                tools=tools,
-                llm=llm,
-                agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-                handle_parsing_errors=True,
-                max_iterations=3  # Add max iterations to prevent infinite loops
-            )
+            search_agent = get_search_agent(api_key, "Llama3-8b-8192", tuple(get_tools()))
 
             # Generate and display response
             with st.chat_message("assistant"):
@@ -94,4 +107,7 @@ if prompt := st.chat_input(placeholder="What is machine learning?"):
                 st.session_state["messages"].append({"role": "assistant", "content": response})
                 st.write(response)
         except Exception as e:
-            st.error(f"An error occurred: {e}")
\ No newline at end of file
+            st.error(f"An error occurred: {e}")
+
+st.sidebar.write("Search cache:", {"hits": search_layer.cache.hits, "misses": search_layer.cache.misses,
+                                  "coalesced": search_layer.coalesced})
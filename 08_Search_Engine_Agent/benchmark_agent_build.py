@@ -0,0 +1,55 @@
+# Per-message agent construction overhead: built on every message (before) vs cached factory (after)
+import argparse
+import time
+from functools import lru_cache
+
+from search_agent import build_search_agent
+from search_tools import SearchToolLayer
+
+
+def make_tools():
+    # Stub backends: only construction is measured, nothing is searched
+    layer = SearchToolLayer(backends={name: str for name in ("duckduckgo", "arxiv", "wikipedia")})
+    return [
+        layer.fan_out_tool(),
+        layer.tool("duckduckgo", "Safe Search", "Used for safely searching with DuckDuckGo."),
+        layer.tool("arxiv", "arxiv", "Search Arxiv papers."),
+        layer.tool("wikipedia", "wikipedia", "Search Wikipedia."),
+    ]
+
+
+# Same keying as get_search_agent in app.py; lru_cache stands in for st.cache_resource
+TOOLS = {tool.name: tool for tool in make_tools()}
+
+
+@lru_cache(maxsize=16)
+def get_search_agent(api_key, model_name, tool_names):
+    return build_search_agent(api_key, model_name, [TOOLS[name] for name in tool_names])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent construction overhead per chat message")
+    parser.add_argument("--messages", type=int, default=50)
+    args = parser.parse_args()
+    api_key, model_name = "gsk-benchmark", "Llama3-8b-8192"  # no request is sent
+
+    start = time.perf_counter()
+    for _ in range(args.messages):
+        build_search_agent(api_key, model_name, make_tools())
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.messages):
+        get_search_agent(api_key, model_name, tuple(TOOLS))
+    after = time.perf_counter() - start
+
+    print(f"{args.messages} messages")
+    print(f"before (build per message): {before / args.messages * 1000:.2f} ms/message, {before:.2f}s total")
+    print(f"after (cached factory):     {after / args.messages * 1000:.3f} ms/message, {after:.3f}s total")
+
+
+if __name__ == "__main__":
+    main()
+
+# To run:
+# python benchmark_agent_build.py --messages 50
@@ -0,0 +1,173 @@
+# Offline latency harness for the search agent: stubbed backends + scripted LLM, no network or API key
+import argparse
+import statistics
+import time
+from collections import Counter
+
+from langchain.agents import AgentType, initialize_agent
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain.tools import Tool
+from langchain_community.llms.fake import FakeListLLM
+
+from search_tools import SearchToolLayer
+
+QUESTIONS = [
+    "What is machine learning?",
+    "Who introduced the transformer architecture?",
+    "What is retrieval augmented generation?",
+]
+DEFAULT_RATES = {"duckduckgo": (1.0, 2), "arxiv": (1.0, 1), "wikipedia": (5.0, 5)}
+
+
+class ToolCallCounter(BaseCallbackHandler):
+    def __init__(self):
+        self.calls = Counter()
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        self.calls[serialized.get("name")] += 1
+
+
+def make_stub(name, latency, calls):
+    # `calls` counts the requests that actually reach the backend
+    def stub(query):
+        calls[name] += 1
+        time.sleep(latency)
+        return f"{name} result for '{query}'"
+    return stub
+
+
+def sequential_script(question):
+    # The original agent: one source per ReAct step
+    steps = [("Safe Search", question), ("arxiv", question), ("wikipedia", question)]
+    script = [f"Thought: I should check {tool}.\nAction: {tool}\nAction Input: {query}" for tool, query in steps]
+    script.append(f"Thought: I now know the final answer.\nFinal Answer: summary of {question}")
+    return script
+
+
+def fan_out_script(question):
+    # With the tool layer: all three sources in a single step
+    return [
+        f"Thought: This fits several sources.\nAction: Multi Search\nAction Input: {question}",
+        f"Thought: I now know the final answer.\nFinal Answer: summary of {question}",
+    ]
+
+
+def run_agent(tools, script, question, counter):
+    agent = initialize_agent(
+        tools=tools,
+        llm=FakeListLLM(responses=script),
+        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        handle_parsing_errors=True,
+        max_iterations=5,
+    )
+    start = time.perf_counter()
+    agent.run(question, callbacks=[counter])
+    return time.perf_counter() - start
+
+
+def layer_tools(latencies, calls, rates):
+    layer = SearchToolLayer(
+        backends={name: make_stub(name, latencies[name], calls) for name in latencies},
+        rates=rates,
+    )
+    tools = [
+        layer.fan_out_tool(),
+        layer.tool("duckduckgo", "Safe Search", "Used for safely searching with DuckDuckGo."),
+        layer.tool("arxiv", "arxiv", "Search Arxiv papers."),
+        layer.tool("wikipedia", "wikipedia", "Search Wikipedia."),
+    ]
+    return layer, tools
+
+
+def run_harness(rounds=2, latencies=None, fixed_sleep=1.0, rates=DEFAULT_RATES):
+    """Asks every question `rounds` times in three setups and returns, per setup,
+    the latencies, tool calls made by the agent and calls that reached each backend.
+    The sequential script is run with and without the tool layer so the gain from
+    the cache and rate limiter is measured apart from the gain from fan-out."""
+    latencies = latencies or {"duckduckgo": 0.4, "arxiv": 0.6, "wikipedia": 0.2}
+    setups = {}
+
+    calls = Counter()
+    ddg, arxiv, wiki = (make_stub(name, latencies[name], calls) for name in ("duckduckgo", "arxiv", "wikipedia"))
+
+    def slept_ddg(query):
+        time.sleep(fixed_sleep)
+        return ddg(query)
+
+    baseline_tools = [
+        Tool(name="Safe Search", func=slept_ddg, description="Used for safely searching with DuckDuckGo."),
+        Tool(name="arxiv", func=arxiv, description="Search Arxiv papers."),
+        Tool(name="wikipedia", func=wiki, description="Search Wikipedia."),
+    ]
+    setups["baseline (sleep + sequential)"] = (baseline_tools, sequential_script, calls, None)
+
+    calls = Counter()
+    layer, tools = layer_tools(latencies, calls, rates)
+    setups["tool layer, sequential"] = (tools, sequential_script, calls, layer)
+
+    calls = Counter()
+    layer, tools = layer_tools(latencies, calls, rates)
+    setups["tool layer, fan-out"] = (tools, fan_out_script, calls, layer)
+
+    results = {}
+    for name, (tools, script, calls, layer) in setups.items():
+        counter = ToolCallCounter()
+        times = [run_agent(tools, script(question), question, counter)
+                 for _ in range(rounds) for question in QUESTIONS]
+        results[name] = {
+            "latencies": times,
+            "tool_calls": dict(counter.calls),
+            "backend_calls": dict(calls),
+            "cache_hits": layer.cache.hits if layer else 0,
+        }
+    return results
+
+
+def check(results, rounds):
+    """Asserts on what the agent and the backends actually did."""
+    asked = len(QUESTIONS) * rounds
+    per_source = {"Safe Search": asked, "arxiv": asked, "wikipedia": asked}
+    every_question = {name: len(QUESTIONS) for name in ("duckduckgo", "arxiv", "wikipedia")}
+
+    baseline = results["baseline (sleep + sequential)"]
+    assert baseline["tool_calls"] == per_source, baseline["tool_calls"]
+    assert baseline["backend_calls"] == {name: asked for name in every_question}, baseline["backend_calls"]
+
+    # Same agent steps, but repeated questions never reach a backend
+    sequential = results["tool layer, sequential"]
+    assert sequential["tool_calls"] == per_source, sequential["tool_calls"]
+    assert sequential["backend_calls"] == every_question, sequential["backend_calls"]
+    assert sequential["cache_hits"] == 3 * len(QUESTIONS) * (rounds - 1)
+
+    # One agent step per question, one backend call per source and question
+    fan_out = results["tool layer, fan-out"]
+    assert fan_out["tool_calls"] == {"Multi Search": asked}, fan_out["tool_calls"]
+    assert fan_out["backend_calls"] == every_question, fan_out["backend_calls"]
+    assert fan_out["cache_hits"] == 3 * len(QUESTIONS) * (rounds - 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline agent latency harness")
+    parser.add_argument("--rounds", type=int, default=2, help="times each question is asked (repeats hit the cache)")
+    parser.add_argument("--ddg-latency", type=float, default=0.4)
+    parser.add_argument("--arxiv-latency", type=float, default=0.6)
+    parser.add_argument("--wiki-latency", type=float, default=0.2)
+    parser.add_argument("--fixed-sleep", type=float, default=1.0, help="sleep before each DuckDuckGo call in the baseline")
+    args = parser.parse_args()
+
+    latencies = {"duckduckgo": args.ddg_latency, "arxiv": args.arxiv_latency, "wikipedia": args.wiki_latency}
+    results = run_harness(args.rounds, latencies, args.fixed_sleep)
+    for name, result in results.items():
+        times = result["latencies"]
+        print(f"{name:32s} mean {statistics.mean(times):.3f}s  max {max(times):.3f}s  total {sum(times):.2f}s"
+              f"  tool calls {sum(result['tool_calls'].values())}  backend calls {sum(result['backend_calls'].values())}"
+              f"  cache hits {result['cache_hits']}")
+    check(results, args.rounds)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
+
+# To run:
+# python offline_harness.py --rounds 3
@@ -0,0 +1,14 @@
+# Builds the search agent over a given list of tools
+from langchain_groq import ChatGroq
+from langchain.agents import initialize_agent, AgentType
+
+
+def build_search_agent(api_key, model_name, tools):
+    llm = ChatGroq(groq_api_key=api_key, model_name=model_name, streaming=True)
+    return initialize_agent(
+        tools=tools,
+        llm=llm,
+        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        handle_parsing_errors=True,
+        max_iterations=3  # Add max iterations to prevent infinite loops
+    )
@@ -0,0 +1,164 @@
+# Shared async search tool layer: per-backend rate limits, TTL cache and concurrent fan-out
+import asyncio
+import re
+import threading
+import time
+from concurrent.futures import Future
+
+from langchain.tools import Tool
+
+
+class TokenBucket:
+    """Allows `rate` calls per second with bursts of up to `capacity`.
+
+    Callers reserve a token and sleep only as long as needed, instead of a fixed
+    sleep before every call. Reservations are thread-safe, so the same bucket
+    works from the ReAct loop thread and from event loops."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            # A negative balance is a queue of reservations; wait until ours is covered
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class TTLCache:
+    def __init__(self, ttl_seconds=600, max_entries=1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Drop the entry closest to expiry
+                self._entries.pop(min(self._entries, key=lambda k: self._entries[k][0]))
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+
+def normalize_query(query):
+    return re.sub(r"\s+", " ", query.strip().strip("\"'?!.").lower())
+
+
+def _run_sync(coro):
+    # Agents call tools synchronously; run the coroutine on a private loop
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", asyncio.run(coro)))
+    thread.start()
+    thread.join()
+    return result["value"]
+
+
+class SearchToolLayer:
+    """Wraps blocking search backends (name -> fn(query) -> str) with a token
+    bucket per backend and a TTL cache keyed by (backend, normalized query).
+
+    Concurrent misses for the same key share one backend call, whichever event
+    loop or thread they come from."""
+
+    def __init__(self, backends, rates=None, ttl_seconds=600):
+        self.backends = backends
+        rates = rates or {}
+        self.buckets = {name: TokenBucket(*rates.get(name, (1.0, 1))) for name in backends}
+        self.cache = TTLCache(ttl_seconds)
+        self.coalesced = 0
+        self._in_flight = {}  # key -> Future of the backend call
+        self._lock = threading.Lock()
+
+    async def _call(self, backend, query, key):
+        await self.buckets[backend].acquire()
+        try:
+            result = await asyncio.to_thread(self.backends[backend], query)
+        except Exception as e:
+            return f"{backend} search failed. Please try a different query. Error: {e}"
+        self.cache.set(key, result)
+        return result
+
+    async def asearch(self, backend, query):
+        key = (backend, normalize_query(query))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not owner:
+            return await asyncio.wrap_future(future)
+
+        try:
+            result = await self._call(backend, query, key)
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+        future.set_result(result)
+        return result
+
+    async def afan_out(self, query, backends=None):
+        backends = backends or list(self.backends)
+        results = await asyncio.gather(*(self.asearch(name, query) for name in backends))
+        return "\n\n".join(f"[{name}] {result}" for name, result in zip(backends, results))
+
+    def search(self, backend, query):
+        return _run_sync(self.asearch(backend, query))
+
+    def fan_out(self, query, backends=None):
+        return _run_sync(self.afan_out(query, backends))
+
+    def tool(self, backend, name, description):
+        return Tool(
+            name=name,
+            func=lambda query: self.search(backend, query),
+            coroutine=lambda query: self.asearch(backend, query),
+            description=description,
+        )
+
+    def fan_out_tool(self, name="Multi Search", description=None):
+        return Tool(
+            name=name,
+            func=self.fan_out,
+            coroutine=self.afan_out,
+            description=description or (
+                "Searches " + ", ".join(self.backends) + " at the same time. "
+                "Use it when a query could be answered by more than one source."
+            ),
+        )
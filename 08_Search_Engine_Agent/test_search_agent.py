@@ -0,0 +1,31 @@
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("langchain_groq")
+from search_agent import build_search_agent
+from search_tools import SearchToolLayer
+
+API_KEY = "gsk-test"  # nothing is sent
+
+
+@pytest.fixture
+def tools():
+    layer = SearchToolLayer(backends={name: str for name in ("duckduckgo", "arxiv", "wikipedia")})
+    return [
+        layer.fan_out_tool(),
+        layer.tool("duckduckgo", "Safe Search", "Used for safely searching with DuckDuckGo."),
+        layer.tool("arxiv", "arxiv", "Search Arxiv papers."),
+        layer.tool("wikipedia", "wikipedia", "Search Wikipedia."),
+    ]
+
+
+def test_agent_uses_exactly_the_given_tools(tools):
+    agent = build_search_agent(API_KEY, "Llama3-8b-8192", tools)
+    assert [tool.name for tool in agent.tools] == ["Multi Search", "Safe Search", "arxiv", "wikipedia"]
+    assert [tool.name for tool in build_search_agent(API_KEY, "Llama3-8b-8192", tools[:1]).tools] == ["Multi Search"]
+
+
+def test_agent_is_bounded_and_tolerates_parse_errors(tools):
+    agent = build_search_agent(API_KEY, "Llama3-8b-8192", tools)
+    assert agent.max_iterations == 3
+    assert agent.handle_parsing_errors is True
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("langchain")
+from search_tools import SearchToolLayer
+
+
+def slow_backend(calls):
+    lock = threading.Lock()
+
+    def search(query):
+        with lock:
+            calls.append(query)
+        time.sleep(0.2)
+        return f"result for {query}"
+    return search
+
+
+def test_concurrent_identical_misses_share_one_backend_call():
+    calls = []
+    layer = SearchToolLayer({"wiki": slow_backend(calls)}, rates={"wiki": (100.0, 100)})
+
+    async def main():
+        return await asyncio.gather(*(layer.asearch("wiki", q) for q in ["Python?", "python", " PYTHON "]))
+
+    assert len(set(asyncio.run(main()))) == 1
+    assert len(calls) == 1
+    assert layer.coalesced == 2
+    assert layer.search("wiki", "python") == "result for Python?"  # now cached
+    assert len(calls) == 1
+
+
+def test_single_flight_across_threads_and_event_loops():
+    calls = []
+    layer = SearchToolLayer({"wiki": slow_backend(calls)}, rates={"wiki": (100.0, 100)})
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: layer.search("wiki", "transformers"), range(4)))
+    assert results == ["result for transformers"] * 4
+    assert len(calls) == 1
+
+
+def test_errors_are_shared_but_not_cached():
+    def failing(query):
+        time.sleep(0.1)
+        raise RuntimeError("down")
+
+    layer = SearchToolLayer({"wiki": failing}, rates={"wiki": (100.0, 100)})
+
+    async def main():
+        return await asyncio.gather(layer.asearch("wiki", "x"), layer.asearch("wiki", "x"))
+
+    first, second = asyncio.run(main())
+    assert first == second and "search failed" in first
+    assert layer.cache.get(("wiki", "x")) is None
+
+
+def test_offline_harness_counts_tool_calls_and_cache_hits():
+    pytest.importorskip("langchain_community")
+    from offline_harness import check, run_harness
+
+    fast = {"duckduckgo": 0.0, "arxiv": 0.0, "wikipedia": 0.0}
+    rates = {name: (1000.0, 1000) for name in fast}
+    results = run_harness(rounds=2, latencies=fast, fixed_sleep=0.0, rates=rates)
+    check(results, rounds=2)
@@ -0,0 +1,48 @@
+# Callback that counts LLM calls and tool steps per agent run
+from collections import Counter
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+class AgentStepCounter(BaseCallbackHandler):
+    def __init__(self):
+        self.llm_calls = 0
+        self.tool_calls = Counter()
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self.llm_calls += 1
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.llm_calls += 1
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        self.tool_calls[(serialized or {}).get("name", kwargs.get("name", "tool"))] += 1
+
+    def summary(self):
+        return {
+            "llm_calls": self.llm_calls,
+            "tool_steps": sum(self.tool_calls.values()),
+            "tools": dict(self.tool_calls),
+        }
+
+
+class AgentRunStats:
+    """Running totals over many questions, e.g. kept in st.session_state."""
+
+    def __init__(self):
+        self.questions = 0
+        self.llm_calls = 0
+        self.tool_steps = 0
+
+    def add(self, counter: AgentStepCounter):
+        self.questions += 1
+        self.llm_calls += counter.llm_calls
+        self.tool_steps += sum(counter.tool_calls.values())
+
+    def summary(self):
+        n = self.questions or 1
+        return {
+            "questions": self.questions,
+            "llm_calls_per_question": round(self.llm_calls / n, 2),
+            "tool_steps_per_question": round(self.tool_steps / n, 2),
+        }
@@ -0,0 +1,145 @@
+# Two-level answer cache for the SQL agent: question -> SQL, (SQL, data fingerprint) -> result
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from langchain_core.callbacks import BaseCallbackHandler
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+
+def normalize_question(question):
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", question.lower())).strip()
+
+
+STOPPED_OUTPUT = "Agent stopped due to iteration limit or time limit."
+
+
+class SQLCaptureHandler(BaseCallbackHandler):
+    """Records the sql_db_query calls of an agent run. Only a run whose answer
+    came from exactly one successful query can be replayed from its SQL."""
+
+    def __init__(self):
+        self.sql = None
+        self.result = None
+        self.queries = 0
+        self.errors = 0
+        self._pending = None
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        name = (serialized or {}).get("name", kwargs.get("name"))
+        self._pending = input_str if name == "sql_db_query" else None
+        if self._pending is not None:
+            self.queries += 1
+
+    def on_tool_end(self, output, **kwargs):
+        output = str(output)
+        if self._pending is not None:
+            if output.startswith("Error"):
+                self.errors += 1
+            else:
+                self.sql, self.result = self._pending.strip(), output
+        self._pending = None
+
+    def on_tool_error(self, error, **kwargs):
+        if self._pending is not None:
+            self.errors += 1
+        self._pending = None
+
+    def cacheable(self, response):
+        return (self.sql is not None and self.queries == 1 and not self.errors
+                and not str(response).startswith(STOPPED_OUTPUT))
+
+
+class AnswerCache:
+    """L1 maps a normalized question to the SQL the agent ran for it (and the
+    answer it gave). L2 maps (SQL, data fingerprint) to the query result.
+
+    The data fingerprint is the SQLite file's size/mtime (with its -wal file)
+    or, for MySQL, the per-table UPDATE_TIME/TABLE_ROWS/AUTO_INCREMENT from
+    information_schema, read with the MySQL 8 statistics cache disabled for the
+    session. An L1 hit with a new fingerprint re-executes the SQL without the LLM.
+
+    UPDATE_TIME has one-second resolution and is not kept across a MySQL
+    restart, so an UPDATE in the same second as a cached answer that changes
+    no row count can go unnoticed until the next write."""
+
+    def __init__(self, db, sqlite_path=None, max_entries=500):
+        self.db = db
+        self.sqlite_path = sqlite_path
+        self.max_entries = max_entries
+        self._questions = OrderedDict()  # question -> (sql, answer, fingerprint of the answer)
+        self._results = OrderedDict()    # (sql, fingerprint) -> result
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.reexecuted = 0
+        self.misses = 0
+
+    def fingerprint(self):
+        if self.sqlite_path:
+            parts = []
+            for path in (str(self.sqlite_path), f"{self.sqlite_path}-wal"):
+                if os.path.exists(path):
+                    stat = os.stat(path)
+                    parts.append((stat.st_size, stat.st_mtime_ns))
+            return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+        if self.db.dialect == "mysql":
+            with self.db._engine.connect() as conn:
+                try:
+                    # MySQL 8 otherwise serves these columns from a cache refreshed once a day
+                    conn.execute(text("SET SESSION information_schema_stats_expiry = 0"))
+                except DBAPIError:
+                    pass  # MySQL 5.7 has no such cache
+                rows = conn.execute(text(
+                    "SELECT TABLE_NAME, UPDATE_TIME, TABLE_ROWS, AUTO_INCREMENT "
+                    "FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() ORDER BY TABLE_NAME"
+                )).fetchall()
+            return hashlib.sha256(repr([tuple(r) for r in rows]).encode("utf-8")).hexdigest()
+        # Unknown backend: no data versioning, so L2 is never reused
+        return None
+
+    def _put(self, cache, key, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+    def lookup(self, question):
+        """Returns None on a miss, else a dict with sql, result and answer
+        (answer is None when the data changed since it was given)."""
+        key = normalize_question(question)
+        with self._lock:
+            entry = self._questions.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._questions.move_to_end(key)
+        sql, answer, answer_fingerprint = entry
+        fingerprint = self.fingerprint()
+        with self._lock:
+            result = self._results.get((sql, fingerprint)) if fingerprint else None
+        if result is None:
+            result = self.db.run(sql)
+            with self._lock:
+                self.reexecuted += 1
+                if fingerprint:
+                    self._put(self._results, (sql, fingerprint), result)
+        else:
+            with self._lock:
+                self.hits += 1
+        fresh = fingerprint is not None and fingerprint == answer_fingerprint
+        return {"sql": sql, "result": result, "answer": answer if fresh else None}
+
+    def store(self, question, sql, result, answer=None, fingerprint=None):
+        # Pass the fingerprint taken before the agent ran, so a write during the run is not masked
+        fingerprint = fingerprint or self.fingerprint()
+        with self._lock:
+            self._put(self._questions, normalize_question(question), (sql, answer, fingerprint))
+            if fingerprint:
+                self._put(self._results, (sql, fingerprint), result)
+
+    def stats(self):
+        return {"hits": self.hits, "reexecuted": self.reexecuted, "misses": self.misses,
+                "questions": len(self._questions), "results": len(self._results)}
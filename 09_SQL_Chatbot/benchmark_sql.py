@@ -0,0 +1,96 @@
+# Query/execution path benchmark at 1k, 1M and 10M students with a stub LLM that emits fixed SQL
+import argparse
+import os
+import statistics
+import time
+
+from langchain.agents import create_sql_agent
+from langchain.agents.agent_toolkits import SQLDatabaseToolkit
+from langchain.agents.agent_types import AgentType
+from langchain_community.agent_toolkits.sql.prompt import SQL_PREFIX
+from langchain_community.llms.fake import FakeListLLM
+
+from answer_cache import AnswerCache, SQLCaptureHandler
+from generate_data import generate
+from guarded_db import GuardedSQLDatabase, sqlite_engine
+from schema_digest import SchemaDigest
+
+QUERIES = {
+    "average marks in Data Science": "SELECT AVG(MARKS) FROM STUDENT WHERE CLASS = 'Data Science'",
+    "who has the top score": "SELECT NAME, MARKS FROM STUDENT ORDER BY MARKS DESC LIMIT 1",
+    "students per section": "SELECT SECTION, COUNT(*) FROM STUDENT GROUP BY SECTION",
+    "average grade per department": (
+        "SELECT c.DEPARTMENT, AVG(e.GRADE) FROM ENROLLMENT e JOIN COURSE c ON c.ID = e.COURSE_ID GROUP BY c.DEPARTMENT"
+    ),
+    "courses of student 42": (
+        "SELECT c.NAME, e.TERM, e.GRADE FROM ENROLLMENT e JOIN COURSE c ON c.ID = e.COURSE_ID WHERE e.STUDENT_ID = 42"
+    ),
+    "list all students": "SELECT * FROM STUDENT",
+}
+
+
+def stub_agent(db, digest, sql):
+    # Same agent construction as app.py; the LLM runs the fixed SQL once and answers
+    llm = FakeListLLM(responses=[
+        f"I can write the query from the schema.\nAction: sql_db_query\nAction Input: {sql}",
+        "I now know the final answer.\nFinal Answer: see the query result",
+    ])
+    return create_sql_agent(
+        llm=llm,
+        toolkit=SQLDatabaseToolkit(db=db, llm=llm),
+        agent_type=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        prefix=SQL_PREFIX + digest.prompt_section(),
+    )
+
+
+def bench_size(students, data_dir, indexes, repeats):
+    db_path = os.path.join(data_dir, f"students_{students}{'_idx' if indexes else ''}.db")
+    if not os.path.exists(db_path):
+        load_seconds = generate(db_path, students, indexes=indexes)
+        print(f"generated {db_path} in {load_seconds:.1f}s")
+
+    db = GuardedSQLDatabase(sqlite_engine(db_path), max_rows=1000)
+    start = time.perf_counter()
+    digest = SchemaDigest(db)
+    digest_seconds = time.perf_counter() - start
+    db.table_rows = digest.row_counts
+    cache = AnswerCache(db, sqlite_path=db_path)
+
+    print(f"\n== {students:,} students{' (indexed)' if indexes else ''} | schema digest {digest_seconds * 1000:.0f} ms ==")
+    print(f"{'question':32s} {'agent p50':>10s} {'sql p50':>9s} {'rows':>5s} {'trunc':>5s} {'scan':>5s} {'cached':>8s}")
+    for question, sql in QUERIES.items():
+        agent_times, sql_times = [], []
+        for _ in range(repeats):
+            capture = SQLCaptureHandler()
+            start = time.perf_counter()
+            stub_agent(db, digest, sql).run(question, callbacks=[capture])
+            agent_times.append(time.perf_counter() - start)
+            sql_times.append(db.last_metrics()["latency_ms"])
+        metric = db.last_metrics()
+        cache.store(question, capture.sql, capture.result)
+        start = time.perf_counter()
+        cache.lookup(question)
+        cached_ms = (time.perf_counter() - start) * 1000
+        print(
+            f"{question:32s} {statistics.median(agent_times) * 1000:8.1f}ms {statistics.median(sql_times):7.1f}ms "
+            f"{metric['rows']:5d} {str(metric['truncated']):>5s} {str(bool(metric['full_scans'])):>5s} {cached_ms:6.2f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQL chatbot query path benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 1_000_000, 10_000_000])
+    parser.add_argument("--data-dir", default="benchmark_data")
+    parser.add_argument("--indexes", action="store_true")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    for students in args.sizes:
+        bench_size(students, args.data_dir, args.indexes, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
+
+# To run:
+# python benchmark_sql.py --sizes 1000 1000000 10000000
+# python benchmark_sql.py --sizes 1000 1000000 10000000 --indexes
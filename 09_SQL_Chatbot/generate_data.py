@@ -0,0 +1,128 @@
+# Bulk synthetic data for the SQL chatbot: STUDENT, COURSE and ENROLLMENT tables at any size
+import argparse
+import os
+import random
+import sqlite3
+import time
+from itertools import islice
+
+FIRST_NAMES = ["Jones", "Duygu", "Smiths", "Jacob", "Chris", "Ava", "Liam", "Mia", "Noah", "Emma",
+               "Omar", "Zeynep", "Lucas", "Sofia", "Ethan", "Aria", "Mateo", "Elif", "Leo", "Nora"]
+LAST_NAMES = ["Smith", "Kaya", "Brown", "Garcia", "Miller", "Demir", "Wilson", "Lopez", "Taylor", "Yilmaz"]
+COURSES = [
+    ("Data Science", "Computing"), ("DEVOPS", "Computing"), ("Machine Learning", "Computing"),
+    ("Cloud Engineering", "Computing"), ("Statistics", "Mathematics"), ("Linear Algebra", "Mathematics"),
+    ("Marketing", "Business"), ("Finance", "Business"),
+]
+SECTIONS = ["A", "B", "C", "D"]
+TERMS = ["2023-Fall", "2024-Spring", "2024-Fall", "2025-Spring"]
+
+SCHEMA = """
+CREATE TABLE STUDENT(
+    ID INTEGER PRIMARY KEY,
+    NAME VARCHAR(25),
+    CLASS VARCHAR(25),
+    SECTION VARCHAR(25),
+    MARKS INT
+);
+CREATE TABLE COURSE(
+    ID INTEGER PRIMARY KEY,
+    NAME VARCHAR(50),
+    DEPARTMENT VARCHAR(50)
+);
+CREATE TABLE ENROLLMENT(
+    STUDENT_ID INTEGER REFERENCES STUDENT(ID),
+    COURSE_ID INTEGER REFERENCES COURSE(ID),
+    TERM VARCHAR(20),
+    GRADE INT
+);
+"""
+
+INDEXES = [
+    "CREATE INDEX idx_student_class ON STUDENT(CLASS)",
+    "CREATE INDEX idx_student_marks ON STUDENT(MARKS)",
+    "CREATE INDEX idx_enrollment_student ON ENROLLMENT(STUDENT_ID)",
+    "CREATE INDEX idx_enrollment_course ON ENROLLMENT(COURSE_ID)",
+]
+
+
+def student_rows(count, rng):
+    for student_id in range(1, count + 1):
+        course = rng.choice(COURSES)[0]
+        # Marks roughly normal around 70, clipped to 0-100
+        marks = max(0, min(100, int(rng.gauss(70, 15))))
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        yield (student_id, name, course, rng.choice(SECTIONS), marks)
+
+
+def enrollment_rows(students, per_student, rng):
+    for student_id in range(1, students + 1):
+        for course_id in rng.sample(range(1, len(COURSES) + 1), per_student):
+            yield (student_id, course_id, rng.choice(TERMS), max(0, min(100, int(rng.gauss(70, 15)))))
+
+
+def insert_batches(cursor, sql, rows, batch_size):
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        cursor.executemany(sql, batch)
+
+
+def generate(db_path, students, enrollments_per_student=2, indexes=False, batch_size=50_000, seed=42):
+    """Creates db_path from scratch and returns the load time in seconds."""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # Safe for a throwaway bulk load; the file is only used once the load has committed
+    connection.execute("PRAGMA synchronous=OFF")
+    cursor = connection.cursor()
+    cursor.executescript(SCHEMA)
+
+    # Everything in one transaction
+    cursor.execute("BEGIN")
+    cursor.executemany("INSERT INTO COURSE VALUES (?, ?, ?)", [(i + 1, name, dept) for i, (name, dept) in enumerate(COURSES)])
+    insert_batches(cursor, "INSERT INTO STUDENT VALUES (?, ?, ?, ?, ?)", student_rows(students, rng), batch_size)
+    insert_batches(
+        cursor, "INSERT INTO ENROLLMENT VALUES (?, ?, ?, ?)",
+        enrollment_rows(students, min(enrollments_per_student, len(COURSES)), rng), batch_size,
+    )
+    cursor.execute("COMMIT")
+
+    # Indexes are built after the load, which is much faster than maintaining them per insert
+    if indexes:
+        for statement in INDEXES:
+            cursor.execute(statement)
+    cursor.execute("ANALYZE")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic student database")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="number of students")
+    parser.add_argument("--db", default="benchmark_data/students.db")
+    parser.add_argument("--enrollments-per-student", type=int, default=2)
+    parser.add_argument("--indexes", action="store_true", help="create secondary indexes after the load")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    seconds = generate(args.db, args.rows, args.enrollments_per_student, args.indexes, args.batch_size, args.seed)
+    total_rows = args.rows * (1 + args.enrollments_per_student)
+    print(f"{args.db}: {args.rows} students, {total_rows} rows in {seconds:.1f}s ({total_rows / seconds:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
+
+# To run:
+# python generate_data.py --rows 1000000 --indexes
+# SQLITE_DB_PATH=benchmark_data/students.db streamlit run app.py
@@ -0,0 +1,182 @@
+# Execution layer for agent-generated SQL: pooled engines, timeouts, capped fetches, full-scan guard, metrics
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from langchain_community.utilities.sql_database import SQLDatabase, truncate_word
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import QueuePool
+
+
+class QueryTimeout(SQLAlchemyError):
+    pass
+
+
+class FullScanRejected(SQLAlchemyError):
+    pass
+
+
+def sqlite_engine(path, pool_size=5, max_overflow=5, read_only=True):
+    # One connection per pooled slot; check_same_thread=False because Streamlit reruns use different threads
+    mode = "?mode=ro" if read_only else ""
+    creator = lambda: sqlite3.connect(f"file:{path}{mode}", uri=True, check_same_thread=False)
+    return create_engine(
+        "sqlite://", creator=creator, poolclass=QueuePool,
+        pool_size=pool_size, max_overflow=max_overflow, pool_timeout=10,
+    )
+
+
+def mysql_engine(url, pool_size=5, max_overflow=5):
+    return create_engine(
+        url, pool_size=pool_size, max_overflow=max_overflow, pool_timeout=10,
+        pool_recycle=3600, pool_pre_ping=True,
+    )
+
+
+class GuardedSQLDatabase(SQLDatabase):
+    """SQLDatabase whose `run` (used by sql_db_query) enforces a time limit,
+    stops fetching at `max_rows` rows or `max_bytes` of result text, checks the
+    EXPLAIN plan for full scans of tables with more than `large_table_rows`
+    rows (rejected when `block_full_scans`), and records per-query metrics.
+
+    `table_rows` (table name -> row count) is used for the SQLite scan check,
+    e.g. the row counts from the schema digest."""
+
+    def __init__(self, engine, *args, timeout_seconds=10.0, max_rows=1000, max_bytes=1_000_000,
+                 large_table_rows=100_000, block_full_scans=False, **kwargs):
+        super().__init__(engine, *args, **kwargs)
+        self.timeout_seconds = timeout_seconds
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.large_table_rows = large_table_rows
+        self.block_full_scans = block_full_scans
+        self.table_rows = {}
+        self.metrics = deque(maxlen=200)
+        self._metrics_lock = threading.Lock()
+
+    def _full_scans(self, conn, command, parameters=None):
+        """(table, rows) pairs for large tables the plan reads in full."""
+        scans = []
+        if self.dialect == "sqlite":
+            rows = {name.lower(): count for name, count in self.table_rows.items()}
+            for plan in conn.execute(text(f"EXPLAIN QUERY PLAN {command}"), parameters or {}).fetchall():
+                match = re.match(r"SCAN (?:TABLE )?(\w+)", plan[-1])
+                if match and rows.get(match.group(1).lower(), 0) > self.large_table_rows:
+                    scans.append((match.group(1), rows[match.group(1).lower()]))
+        elif self.dialect == "mysql":
+            for plan in conn.execute(text(f"EXPLAIN {command}"), parameters or {}).mappings():
+                if plan.get("type") == "ALL" and (plan.get("rows") or 0) > self.large_table_rows:
+                    scans.append((plan.get("table"), plan.get("rows")))
+        return scans
+
+    def _rows_read(self, conn):
+        if self.dialect != "mysql":
+            return None
+        status = conn.execute(text("SHOW SESSION STATUS LIKE 'Handler_read%'")).fetchall()
+        return sum(int(value) for _, value in status)
+
+    def _set_timeout(self, conn, deadline):
+        if self.dialect == "sqlite":
+            # Called every 10k VM instructions; a truthy return aborts the statement
+            conn.connection.dbapi_connection.set_progress_handler(lambda: time.monotonic() > deadline, 10_000)
+        elif self.dialect == "mysql":
+            conn.execute(text(f"SET SESSION MAX_EXECUTION_TIME = {int(self.timeout_seconds * 1000)}"))
+
+    def _clear_timeout(self, conn):
+        if self.dialect == "sqlite":
+            conn.connection.dbapi_connection.set_progress_handler(None, 0)
+        elif self.dialect == "mysql":
+            conn.execute(text("SET SESSION MAX_EXECUTION_TIME = 0"))
+
+    def run(self, command, fetch="all", include_columns=False, *, parameters=None, execution_options=None):
+        if fetch == "cursor" or not isinstance(command, str):
+            return super().run(command, fetch=fetch, include_columns=include_columns,
+                               parameters=parameters, execution_options=execution_options)
+
+        metric = {"sql": command, "rows": 0, "bytes": 0, "truncated": False, "full_scans": [],
+                  "rows_examined": None, "timed_out": False, "error": None}
+        start = time.perf_counter()
+        rows = []
+        try:
+            with self._engine.begin() as conn:
+                is_select = command.lstrip().lower().startswith(("select", "with"))
+                if is_select:
+                    metric["full_scans"] = self._full_scans(conn, command, parameters)
+                    if metric["full_scans"] and self.block_full_scans:
+                        tables = ", ".join(f"{t} (~{n} rows)" for t, n in metric["full_scans"])
+                        raise FullScanRejected(
+                            f"query would scan all rows of {tables}; filter on an indexed column or aggregate instead"
+                        )
+                rows_before = self._rows_read(conn)
+                deadline = time.monotonic() + self.timeout_seconds
+                self._set_timeout(conn, deadline)
+                try:
+                    options = {"stream_results": True, **(execution_options or {})}
+                    result = conn.execution_options(**options).execute(text(command), parameters or {})
+                    if result.returns_rows:
+                        columns = list(result.keys())
+                        limit = 1 if fetch == "one" else self.max_rows
+                        batch = []
+                        while len(rows) < limit and metric["bytes"] < self.max_bytes:
+                            if not batch:
+                                batch = list(result.fetchmany(min(100, limit - len(rows))))
+                                if not batch:
+                                    break
+                            # One row at a time, so the byte cap holds within a batch
+                            values = {c: truncate_word(v, length=self._max_string_length) for c, v in zip(columns, batch.pop(0))}
+                            metric["bytes"] += len(repr(values))
+                            rows.append(values)
+                        metric["truncated"] = fetch != "one" and (bool(batch) or result.fetchone() is not None)
+                        result.close()
+                except SQLAlchemyError as e:
+                    if time.monotonic() > deadline:
+                        metric["timed_out"] = True
+                        raise QueryTimeout(
+                            f"query exceeded the {self.timeout_seconds:g}s time limit and was cancelled; narrow it down"
+                        ) from e
+                    raise
+                finally:
+                    self._clear_timeout(conn)
+                if rows_before is not None:
+                    metric["rows_examined"] = self._rows_read(conn) - rows_before
+                elif metric["full_scans"]:
+                    metric["rows_examined"] = sum(n for _, n in metric["full_scans"])
+        except SQLAlchemyError as e:
+            metric["error"] = str(e).splitlines()[0]
+            raise
+        finally:
+            metric["rows"] = len(rows)
+            metric["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            with self._metrics_lock:
+                self.metrics.append(metric)
+
+        if not include_columns:
+            rows = [tuple(row.values()) for row in rows]
+        if not rows:
+            return ""
+        output = str(rows)
+        if metric["truncated"]:
+            output += f"\n(Result truncated to {len(rows)} rows; add a LIMIT or aggregate.)"
+        return output
+
+    def last_metrics(self):
+        with self._metrics_lock:
+            return self.metrics[-1] if self.metrics else None
+
+    def summary(self):
+        with self._metrics_lock:
+            metrics = list(self.metrics)
+        if not metrics:
+            return {"queries": 0}
+        latencies = sorted(m["latency_ms"] for m in metrics)
+        return {
+            "queries": len(metrics),
+            "p50_ms": latencies[len(latencies) // 2],
+            "max_ms": latencies[-1],
+            "timeouts": sum(m["timed_out"] for m in metrics),
+            "truncated": sum(m["truncated"] for m in metrics),
+            "full_scans": sum(bool(m["full_scans"]) for m in metrics),
+        }
@@ -0,0 +1,80 @@
+# Schema digest for the SQL agent: tables, columns, row counts and value samples, built once per connection
+import hashlib
+import threading
+
+from sqlalchemy import inspect, text
+
+
+def schema_fingerprint(engine, tables=None):
+    """Hash of table names, column names and column types. Changes on DDL, not on data."""
+    inspector = inspect(engine)
+    tables = sorted(tables or inspector.get_table_names())
+    parts = []
+    for table in tables:
+        columns = inspector.get_columns(table)
+        parts.append((table, [(c["name"], str(c["type"])) for c in columns]))
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+
+class SchemaDigest:
+    """Compact description of the database for the agent prompt.
+
+    Columns with at most `max_distinct` distinct values (measured on the first
+    `scan_limit` rows) are listed with their values, so the agent can filter on
+    e.g. CLASS = 'Data Science' without first querying sample rows."""
+
+    def __init__(self, db, max_distinct=12, scan_limit=100_000):
+        self.db = db
+        self.engine = db._engine
+        self.max_distinct = max_distinct
+        self.scan_limit = scan_limit
+        self.fingerprint = None
+        self.text = ""
+        self.row_counts = {}
+        self.builds = 0
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild if the schema fingerprint changed. Returns True when rebuilt."""
+        tables = sorted(self.db.get_usable_table_names())
+        fingerprint = schema_fingerprint(self.engine, tables)
+        with self._lock:
+            if fingerprint == self.fingerprint:
+                return False
+            self.text, self.row_counts = self._build(tables)
+            self.fingerprint = fingerprint
+            self.builds += 1
+            return True
+
+    def _build(self, tables):
+        inspector = inspect(self.engine)
+        quote = self.engine.dialect.identifier_preparer.quote
+        lines = []
+        row_counts = {}
+        with self.engine.connect() as conn:
+            for table in tables:
+                qt = quote(table)
+                row_count = row_counts[table] = conn.execute(text(f"SELECT COUNT(*) FROM {qt}")).scalar()
+                lines.append(f"Table {table} (~{row_count} rows)")
+                for column in inspector.get_columns(table):
+                    qc = quote(column["name"])
+                    line = f"  {column['name']} {column['type']}"
+                    sample = f"(SELECT {qc} FROM {qt} LIMIT {self.scan_limit}) AS sample"
+                    distinct = conn.execute(text(f"SELECT COUNT(DISTINCT {qc}) FROM {sample}")).scalar()
+                    if distinct and distinct <= self.max_distinct:
+                        values = conn.execute(
+                            text(f"SELECT DISTINCT {qc} FROM {sample} ORDER BY 1")
+                        ).scalars().all()
+                        line += " values: " + ", ".join(repr(v) if isinstance(v, str) else str(v) for v in values)
+                    lines.append(line)
+        return "\n".join(lines), row_counts
+
+    def prompt_section(self):
+        # Braces are escaped because the agent prefix is used as a format template
+        digest = self.text.replace("{", "{{").replace("}", "}}")
+        return (
+            "\n\nThe complete, current database schema is listed below. Write the SQL from it directly; "
+            "only use sql_db_list_tables or sql_db_schema if a query fails.\n"
+            f"{digest}\n"
+        )
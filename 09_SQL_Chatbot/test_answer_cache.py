@@ -0,0 +1,99 @@
+from contextlib import contextmanager
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("sqlalchemy")
+from answer_cache import AnswerCache, normalize_question
+
+
+class FakeDB:
+    def __init__(self, dialect="sqlite", rows=()):
+        self.dialect = dialect
+        self.runs = []
+        self.statements = []
+        self._rows = rows
+        self._engine = self
+
+    def run(self, sql):
+        self.runs.append(sql)
+        return f"[result of {sql}]"
+
+    @contextmanager
+    def connect(self):
+        yield self
+
+    def execute(self, statement):
+        self.statements.append(str(statement))
+        return self
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+def test_questions_are_normalized():
+    assert normalize_question("  How many  students?? ") == normalize_question("how many students")
+
+
+def test_answer_is_served_until_the_data_changes(tmp_path):
+    path = tmp_path / "student.db"
+    path.write_bytes(b"v1")
+    db = FakeDB()
+    cache = AnswerCache(db, sqlite_path=path)
+
+    cache.store("How many students?", "SELECT COUNT(*) FROM STUDENT", "[(5,)]", "There are 5 students.")
+    assert cache.lookup("how many students") == {
+        "sql": "SELECT COUNT(*) FROM STUDENT", "result": "[(5,)]", "answer": "There are 5 students.",
+    }
+    assert db.runs == []
+
+    path.write_bytes(b"v2 with a new row")
+    cached = cache.lookup("How many students?")
+    assert cached["answer"] is None
+    assert db.runs == ["SELECT COUNT(*) FROM STUDENT"]
+    assert cache.lookup("Unseen question") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["reexecuted"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_mysql_fingerprint_bypasses_the_statistics_cache():
+    db = FakeDB(dialect="mysql", rows=[("STUDENT", "2026-10-18 10:00:00", 5, 6)])
+    fingerprint = AnswerCache(db).fingerprint()
+    assert "information_schema_stats_expiry = 0" in db.statements[0]
+    assert "information_schema.TABLES" in db.statements[1]
+
+    db._rows = [("STUDENT", "2026-10-18 10:00:01", 6, 7)]
+    assert AnswerCache(db).fingerprint() != fingerprint
+
+
+def run_queries(capture, outputs):
+    for sql, output in outputs:
+        capture.on_tool_start({"name": "sql_db_query"}, sql)
+        capture.on_tool_end(output)
+
+
+def test_only_single_successful_query_runs_are_cacheable():
+    from answer_cache import SQLCaptureHandler
+
+    single = SQLCaptureHandler()
+    single.on_tool_start({"name": "sql_db_query_checker"}, "SELECT 1")
+    single.on_tool_end("SELECT 1")
+    run_queries(single, [("SELECT COUNT(*) FROM STUDENT", "[(5,)]")])
+    assert single.cacheable("There are 5 students.")
+    assert (single.sql, single.result) == ("SELECT COUNT(*) FROM STUDENT", "[(5,)]")
+
+    several = SQLCaptureHandler()
+    run_queries(several, [("SELECT CLASS FROM STUDENT", "[('A',)]"), ("SELECT COUNT(*) FROM STUDENT", "[(5,)]")])
+    assert not several.cacheable("Class A has 5 students.")
+
+    retried = SQLCaptureHandler()
+    run_queries(retried, [("SELECT nme FROM STUDENT", "Error: no such column: nme"), ("SELECT NAME FROM STUDENT", "[('Ann',)]")])
+    assert not retried.cacheable("Ann")
+
+    failed = SQLCaptureHandler()
+    failed.on_tool_start({"name": "sql_db_query"}, "SELECT 1")
+    failed.on_tool_error(RuntimeError("timeout"))
+    assert not failed.cacheable("I could not answer.")
+
+    stopped = SQLCaptureHandler()
+    run_queries(stopped, [("SELECT COUNT(*) FROM STUDENT", "[(5,)]")])
+    assert not stopped.cacheable("Agent stopped due to iteration limit or time limit.")
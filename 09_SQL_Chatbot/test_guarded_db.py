@@ -0,0 +1,116 @@
+import sqlite3
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("langchain_community")
+from sqlalchemy import event
+
+from guarded_db import FullScanRejected, GuardedSQLDatabase, QueryTimeout, sqlite_engine
+
+ENDLESS = "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) SELECT COUNT(*) FROM n"
+
+
+@pytest.fixture
+def make_db(tmp_path):
+    path = tmp_path / "student.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE STUDENT (NAME TEXT, CLASS TEXT, MARKS INT)")
+        conn.executemany("INSERT INTO STUDENT VALUES (?, ?, ?)", [("Ann", "A", 90), ("Bob", "B", 70)])
+        conn.execute("CREATE TABLE EVENTS (ID INT, KIND TEXT, PAYLOAD TEXT)")
+        conn.execute("CREATE INDEX EVENTS_ID ON EVENTS (ID)")
+        conn.executemany("INSERT INTO EVENTS VALUES (?, ?, ?)", [(i, f"k{i % 5}", "x" * 100) for i in range(500)])
+
+    def make(**kwargs):
+        return GuardedSQLDatabase(sqlite_engine(path), **kwargs)
+    return make
+
+
+@pytest.fixture
+def db(make_db):
+    return make_db()
+
+
+def test_parameters_are_bound(db):
+    assert db.run("SELECT NAME FROM STUDENT WHERE MARKS > :marks", parameters={"marks": 80}) == "[('Ann',)]"
+    assert "Bob" in db.run_no_throw("SELECT NAME FROM STUDENT WHERE CLASS = :c", parameters={"c": "B"})
+    assert db.last_metrics()["rows"] == 1
+
+
+def test_execution_options_are_passed_through(db):
+    seen = []
+    event.listen(db._engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, params, context, executemany: seen.append(context.execution_options))
+    db.run("SELECT COUNT(*) FROM STUDENT", execution_options={"logging_token": "agent"})
+    assert seen[-1]["logging_token"] == "agent"
+    assert seen[-1]["stream_results"] is True
+
+
+def test_long_query_is_cancelled_at_the_time_limit(make_db):
+    db = make_db(timeout_seconds=0.2)
+    with pytest.raises(QueryTimeout):
+        db.run(ENDLESS)
+    metric = db.last_metrics()
+    assert metric["timed_out"] is True
+    assert metric["error"].startswith("query exceeded the 0.2s time limit")
+    assert metric["latency_ms"] < 5000
+    # The progress handler is cleared, so the pooled connection serves the next query normally
+    assert db.run("SELECT COUNT(*) FROM STUDENT") == "[(2,)]"
+
+
+def test_fetch_stops_at_max_rows(make_db):
+    db = make_db(max_rows=10)
+    output = db.run("SELECT ID FROM EVENTS")
+    assert output.startswith(str([(i,) for i in range(10)]))
+    assert output.endswith("(Result truncated to 10 rows; add a LIMIT or aggregate.)")
+    assert db.last_metrics()["rows"] == 10
+    assert db.last_metrics()["truncated"] is True
+
+    assert db.run("SELECT ID FROM EVENTS LIMIT 10") == str([(i,) for i in range(10)])
+    assert db.last_metrics()["truncated"] is False
+
+
+def test_fetch_stops_at_max_bytes(make_db):
+    db = make_db(max_bytes=2000)
+    db.run("SELECT PAYLOAD FROM EVENTS")
+    metric = db.last_metrics()
+    assert 0 < metric["rows"] < 100  # each row is ~120 bytes of result text
+    assert metric["bytes"] >= 2000
+    assert metric["truncated"] is True
+
+
+def test_full_scan_of_large_table_is_flagged(make_db):
+    db = make_db(large_table_rows=100)
+    db.table_rows = {"EVENTS": 500, "STUDENT": 2}
+    db.run("SELECT COUNT(*) FROM EVENTS WHERE KIND = 'k1'")
+    assert db.last_metrics()["full_scans"] == [("EVENTS", 500)]
+    assert db.last_metrics()["rows_examined"] == 500
+
+    db.run("SELECT KIND FROM EVENTS WHERE ID = 7")  # uses EVENTS_ID
+    assert db.last_metrics()["full_scans"] == []
+    db.run("SELECT NAME FROM STUDENT")  # small table
+    assert db.last_metrics()["full_scans"] == []
+
+
+def test_full_scan_of_large_table_is_rejected_when_blocked(make_db):
+    db = make_db(large_table_rows=100, block_full_scans=True)
+    db.table_rows = {"EVENTS": 500}
+    with pytest.raises(FullScanRejected, match="EVENTS"):
+        db.run("SELECT * FROM EVENTS WHERE KIND = 'k1'")
+    assert db.last_metrics()["error"].startswith("query would scan all rows of EVENTS (~500 rows)")
+    assert db.run("SELECT KIND FROM EVENTS WHERE ID = 7") == "[('k2',)]"
+
+
+def test_metrics_summary(make_db):
+    db = make_db(timeout_seconds=0.2, max_rows=10, large_table_rows=100)
+    db.table_rows = {"EVENTS": 500}
+    assert db.summary() == {"queries": 0}
+    db.run("SELECT ID FROM EVENTS")
+    db.run("SELECT NAME FROM STUDENT WHERE MARKS > 80")
+    with pytest.raises(QueryTimeout):
+        db.run(ENDLESS)
+    summary = db.summary()
+    assert summary["queries"] == 3
+    assert (summary["timeouts"], summary["truncated"], summary["full_scans"]) == (1, 1, 1)
+    assert summary["p50_ms"] <= summary["max_ms"]
+    assert [m["rows"] for m in db.metrics] == [10, 1, 0]
@@ -2,8 +2,8 @@ import validators
 import streamlit as st
 from langchain.prompts import PromptTemplate
 from langchain_groq import ChatGroq
-from langchain.chains.summarize import load_summarize_chain
-from langchain_community.document_loaders import YoutubeLoader, UnstructuredURLLoader
+from long_summarizer import LongDocumentSummarizer
+from content_cache import FetchCache, SummaryCache
 from yt_dlp import YoutubeDL
 
 ## Streamlit APP Configuration
@@ -22,7 +22,15 @@ with st.sidebar:
 generic_url = st.text_input("Enter URL (YouTube or Website)", label_visibility="collapsed")
 
 ## Initialize Gemma Model Using Groq API
-llm = ChatGroq(model="Gemma-7b-It", groq_api_key=groq_api_key)
+MODEL_NAME = "Gemma-7b-It"
+llm = ChatGroq(model=MODEL_NAME, groq_api_key=groq_api_key)
+
+## Fetched content and finished summaries are kept on disk and shared by all sessions
+@st.cache_resource
+def get_caches():
+    return FetchCache(), SummaryCache()
+
+fetch_cache, summary_cache = get_caches()
 
 ## Prompt Template for Summarization
 prompt_template = """
@@ -31,6 +39,11 @@ Content:{text}
 """
 prompt = PromptTemplate(template=prompt_template, input_variables=["text"])
 
+## Short content is summarized in one call; long content is split to fit Gemma's 8k context,
+## the parts are summarized in parallel and merged hierarchically
+max_concurrency = st.sidebar.slider("Parallel LLM calls", min_value=1, max_value=16, value=4)
+summarizer = LongDocumentSummarizer(llm, prompt, context_tokens=8192, max_concurrency=max_concurrency)
+
 ## Function to Handle YouTube Videos Using yt-dlp
 def fetch_youtube_transcript(url):
     ydl_opts = {"noplaylist": True, "quiet": True}
@@ -53,31 +66,44 @@ if st.button("Summarize the Content from YT or Website"):
     else:
         try:
             with st.spinner("Processing..."):
+                # Web pages are revalidated with ETag/Last-Modified; YouTube metadata is reused for an hour
                 if "youtube.com" in generic_url or "youtu.be" in generic_url:
-                    content = fetch_youtube_transcript(generic_url)
+                    content, digest = fetch_cache.fetch_with(generic_url, fetch_youtube_transcript)
                     if content is None:
                         st.error("Failed to fetch YouTube content.")
                         st.stop()
-                    docs = [Document(page_content=content)]
                 else:
-                    loader = UnstructuredURLLoader(
-                        urls=[generic_url],
-                        ssl_verify=False,
-                        headers={
-                            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_5_1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36"
-                        },
-                    )
-                    # Load website content as Document objects
-                    docs = loader.load()
+                    content, digest = fetch_cache.fetch_page(generic_url)
+                docs = [Document(page_content=content, metadata={"source": generic_url})]
 
-                # Chain for Summarization
-                chain = load_summarize_chain(llm, chain_type="stuff", prompt=prompt)
-                output_summary = chain.run(docs)
+                # Unchanged content with the same prompt and model is never summarized twice
+                summary_key = SummaryCache.key(generic_url, digest, prompt_template, MODEL_NAME)
+                cached_summary = summary_cache.get(summary_key)
+                if cached_summary is not None:
+                    st.success(cached_summary)
+                    st.caption("Served from the summary cache")
+                else:
+                    # Summarization with incremental progress
+                    progress = st.progress(0.0, text="Summarizing...")
+                    def on_progress(stage, done, total):
+                        progress.progress(done / total, text=f"{stage}: {done}/{total}")
 
-                st.success(output_summary)
+                    output_summary, info = summarizer.summarize(docs, on_progress=on_progress)
+
+                    summary_cache.set(summary_key, output_summary)
+                    st.success(output_summary)
+                    st.caption(
+                        f"{info['mode']} | ~{info['tokens']} tokens | {info['chunks']} chunks | "
+                        f"{info['reduce_levels']} reduce levels | {info['seconds']}s"
+                    )
         except Exception as e:
             st.exception(f"Exception occurred: {e}")
 
+## Cache statistics
+with st.sidebar:
+    st.write("Fetch cache:", fetch_cache.stats())
+    st.write("Summary cache:", summary_cache.stats())
+
 # ### Code Flow:
 # 1. Set up Streamlit interface and configuration
 # 2. Get Groq API key and URL input from user
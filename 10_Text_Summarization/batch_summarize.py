@@ -0,0 +1,233 @@
+# Headless batch summarization: a file of URLs in, resumable JSONL out
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from langchain.docstore.document import Document
+from langchain.prompts import PromptTemplate
+from langchain_core.runnables import Runnable
+
+from content_cache import FetchCache, SummaryCache
+from long_summarizer import LongDocumentSummarizer, approx_tokens
+
+prompt_template = """
+Provide a summary of the following content in 300 words:
+Content:{text}
+"""
+
+
+def is_rate_limit(error):
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or "ratelimit" in type(error).__name__.lower()
+
+
+def retry_after(error):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class CappedLLM(Runnable):
+    """Wraps an LLM so at most `max_concurrency` calls run at once across the
+    whole batch, and rate-limit errors are retried with exponential backoff
+    (honoring Retry-After) without holding a slot while waiting."""
+
+    def __init__(self, llm, max_concurrency=4, max_retries=5, base_delay=1.0):
+        self.llm = llm
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.retries = 0
+        self._slots = threading.Semaphore(max_concurrency)
+        self._lock = threading.Lock()
+
+    def invoke(self, input, config=None, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self._slots:
+                    return self.llm.invoke(input, config, **kwargs)
+            except Exception as e:
+                if not is_rate_limit(e) or attempt == self.max_retries:
+                    raise
+                with self._lock:
+                    self.retries += 1
+                delay = retry_after(e) or self.base_delay * 2 ** attempt
+                time.sleep(delay * random.uniform(1.0, 1.5))
+
+
+class HostLimiter:
+    """At most `per_host` requests in flight per host, started at least `min_interval` seconds apart."""
+
+    def __init__(self, per_host=2, min_interval=1.0):
+        self.per_host = per_host
+        self.min_interval = min_interval
+        self._slots = {}
+        self._next_start = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            semaphore = self._slots.setdefault(host, threading.Semaphore(self.per_host))
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.min_interval
+            time.sleep(start - now)
+            yield
+
+
+def fetch_youtube(url):
+    from yt_dlp import YoutubeDL
+    with YoutubeDL({"noplaylist": True, "quiet": True}) as ydl:
+        return ydl.extract_info(url, download=False).get("description")
+
+
+def drop_partial_line(output_path):
+    # A run killed mid-write leaves a last line without its newline; appending after it would glue
+    # the next record onto it, so cut the file back to the end of the last complete line
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, "rb+") as f:
+        position = f.seek(0, os.SEEK_END)
+        if position == 0:
+            return
+        f.seek(position - 1)
+        if f.read(1) == b"\n":
+            return
+        while position > 0:
+            step = min(4096, position)
+            f.seek(position - step)
+            newline = f.read(step).rfind(b"\n")
+            if newline != -1:
+                f.truncate(position - step + newline + 1)
+                return
+            position -= step
+        f.truncate(0)
+
+
+def read_done(output_path):
+    # URLs already summarized; a partially written last line from an interrupted run is ignored
+    done = set()
+    if os.path.exists(output_path):
+        with open(output_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("status") == "ok":
+                    done.add(record["url"])
+    return done
+
+
+def run_batch(urls, output_path, llm, model_name, fetch_cache=None, summary_cache=None, workers=8,
+              per_host=2, host_interval=1.0, llm_concurrency=4, max_retries=5, report_every=10):
+    """Summarizes every URL not yet in output_path and appends one JSON line per URL. Returns stats."""
+    fetch_cache = fetch_cache or FetchCache()
+    summary_cache = summary_cache or SummaryCache()
+    prompt = PromptTemplate(template=prompt_template, input_variables=["text"])
+    capped_llm = CappedLLM(llm, max_concurrency=llm_concurrency, max_retries=max_retries)
+    summarizer = LongDocumentSummarizer(capped_llm, prompt, max_concurrency=llm_concurrency, token_counter=approx_tokens)
+    hosts = HostLimiter(per_host=per_host, min_interval=host_interval)
+    local = threading.local()
+
+    def process(url):
+        start = time.perf_counter()
+        record = {"url": url}
+        try:
+            if "youtube.com" in url or "youtu.be" in url:
+                with hosts.slot(url):
+                    content, digest = fetch_cache.fetch_with(url, fetch_youtube)
+                if content is None:
+                    raise ValueError("no YouTube description available")
+            else:
+                if not hasattr(local, "session"):
+                    local.session = requests.Session()
+                with hosts.slot(url):
+                    content, digest = fetch_cache.fetch_page(url, session=local.session)
+            key = SummaryCache.key(url, digest, prompt_template, model_name)
+            summary = summary_cache.get(key)
+            record["cached"] = summary is not None
+            if summary is None:
+                summary, info = summarizer.summarize([Document(page_content=content, metadata={"source": url})])
+                summary_cache.set(key, summary)
+                record.update(mode=info["mode"], tokens=info["tokens"])
+            record.update(status="ok", summary=summary)
+        except Exception as e:
+            record.update(status="error", error=f"{type(e).__name__}: {e}")
+        record["seconds"] = round(time.perf_counter() - start, 2)
+        return record
+
+    drop_partial_line(output_path)
+    done = read_done(output_path)
+    pending = list(dict.fromkeys(url for url in urls if url not in done))
+    stats = {"total": len(pending), "skipped": len(urls) - len(pending), "ok": 0, "error": 0}
+    start = time.perf_counter()
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        with open(output_path, "a", encoding="utf-8") as out:
+            futures = [pool.submit(process, url) for url in pending]
+            for finished, future in enumerate(as_completed(futures), start=1):
+                record = future.result()
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                stats[record["status"]] += 1
+                if finished % report_every == 0 or finished == len(pending):
+                    elapsed = time.perf_counter() - start
+                    print(f"{finished}/{len(pending)} done, {stats['error']} errors, "
+                          f"{finished / elapsed * 60:.1f} URLs/min")
+    finally:
+        # On Ctrl-C, drop queued URLs; everything finished so far is already on disk
+        pool.shutdown(wait=False, cancel_futures=True)
+    elapsed = time.perf_counter() - start
+    processed = stats["ok"] + stats["error"]
+    stats.update(
+        seconds=round(elapsed, 2),
+        urls_per_min=round(processed / elapsed * 60, 1) if elapsed else 0.0,
+        llm_retries=capped_llm.retries,
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a file of URLs (one per line) into JSONL")
+    parser.add_argument("urls_file")
+    parser.add_argument("--output", default="summaries.jsonl")
+    parser.add_argument("--model", default="Gemma-7b-It")
+    parser.add_argument("--workers", type=int, default=8, help="URLs processed at once")
+    parser.add_argument("--per-host", type=int, default=2, help="concurrent requests per host")
+    parser.add_argument("--host-interval", type=float, default=1.0, help="seconds between requests to one host")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="LLM calls in flight across the batch")
+    parser.add_argument("--max-retries", type=int, default=5)
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from langchain_groq import ChatGroq
+    load_dotenv()
+    llm = ChatGroq(model=args.model, groq_api_key=os.getenv("GROQ_API_KEY"), max_retries=0)
+
+    with open(args.urls_file, encoding="utf-8") as f:
+        urls = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    stats = run_batch(urls, args.output, llm, args.model, workers=args.workers, per_host=args.per_host,
+                      host_interval=args.host_interval, llm_concurrency=args.llm_concurrency,
+                      max_retries=args.max_retries)
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
+
+# To run:
+# GROQ_API_KEY=... python batch_summarize.py urls.txt --output summaries.jsonl
+# Re-running the same command after an interruption only processes the URLs that are not done yet.
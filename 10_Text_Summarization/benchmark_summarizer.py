@@ -0,0 +1,44 @@
+# Long-document summarization latency vs concurrency limit, with a fake LLM of fixed per-call latency
+import argparse
+import random
+
+from langchain.docstore.document import Document
+from langchain.prompts import PromptTemplate
+from langchain_community.llms.fake import FakeListLLM
+
+from long_summarizer import LongDocumentSummarizer, approx_tokens
+
+WORDS = "model data latency summary network token context request page chunk answer result".split()
+
+
+def synthetic_page(tokens, seed=0):
+    rng = random.Random(seed)
+    sentences = []
+    while approx_tokens(" ".join(sentences)) < tokens:
+        sentences.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + ".")
+    return " ".join(sentences)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarization latency vs concurrency")
+    parser.add_argument("--tokens", type=int, default=50_000)
+    parser.add_argument("--call-latency", type=float, default=0.5, help="seconds per fake LLM call")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    docs = [Document(page_content=synthetic_page(args.tokens))]
+    prompt = PromptTemplate.from_template("Provide a summary of the following content in 300 words:\nContent:{text}\n")
+    llm = FakeListLLM(responses=["A short partial summary of this part of the page. " * 20], sleep=args.call_latency)
+
+    for concurrency in args.concurrency:
+        summarizer = LongDocumentSummarizer(llm, prompt, max_concurrency=concurrency, token_counter=approx_tokens)
+        _, info = summarizer.summarize(docs)
+        print(f"concurrency {concurrency:2d}: {info['seconds']:6.2f}s  ({info['mode']}, {info['chunks']} chunks, "
+              f"{info['reduce_levels']} reduce levels)")
+
+
+if __name__ == "__main__":
+    main()
+
+# To run:
+# python benchmark_summarizer.py --tokens 50000 --call-latency 0.5
@@ -0,0 +1,220 @@
+# On-disk caches for URL summarization: fetched content (with HTTP revalidation) and finished summaries
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent / ".content_cache" / "cache.db"
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_5_1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36"
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid")
+
+
+def normalize_url(url):
+    # Case-insensitive scheme/host, no fragment, default port, tracking params or trailing slash
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if parts.port and (parts.scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query) if not k.lower().startswith(TRACKING_PARAMS))
+    return urlunsplit((parts.scheme.lower(), host, parts.path.rstrip("/") or "/", urlencode(query), ""))
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def html_to_text(html):
+    # Same extraction as UnstructuredURLLoader
+    from unstructured.partition.html import partition_html
+    return "\n\n".join(str(element) for element in partition_html(text=html))
+
+
+def pdf_to_text(data):
+    from pypdf import PdfReader
+    return "\n\n".join(page.extract_text() or "" for page in PdfReader(io.BytesIO(data)).pages)
+
+
+def response_to_text(response):
+    # Binary formats are parsed from the raw bytes; response.text would decode them as garbage
+    content_type = response.headers.get("Content-Type", "text/html").split(";")[0].strip().lower()
+    if "html" in content_type:
+        return html_to_text(response.text)
+    if content_type == "application/pdf":
+        return pdf_to_text(response.content)
+    if content_type.startswith("text/") or content_type in ("application/json", "application/xml"):
+        return response.text
+    raise ValueError(f"unsupported content type {content_type!r}")
+
+
+def _open(path):
+    path = Path(path or os.getenv("CONTENT_CACHE_PATH", DEFAULT_CACHE_PATH))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(str(path), check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    return db
+
+
+class FetchCache:
+    """Extracted page text keyed by normalized URL.
+
+    Pages that sent an ETag or Last-Modified are revalidated with a conditional
+    GET, so unchanged pages cost a 304 and no re-parsing. Content without
+    validators (and YouTube metadata) is reused for `max_age` seconds. Holds at
+    most `max_entries` pages and evicts the least recently used."""
+
+    def __init__(self, path=None, max_age=3600, timeout=20, max_entries=2_000):
+        self.max_age = max_age
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = _open(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+            "content TEXT, content_hash TEXT, fetched_at REAL, last_access REAL)"
+        )
+        # Caches written before the size cap have no last_access column
+        if "last_access" not in [row[1] for row in self._db.execute("PRAGMA table_info(pages)")]:
+            self._db.execute("ALTER TABLE pages ADD COLUMN last_access REAL")
+            self._db.execute("UPDATE pages SET last_access = fetched_at")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_pages_last_access ON pages(last_access)")
+        self._db.commit()
+
+    def _get(self, key):
+        with self._lock:
+            return self._db.execute(
+                "SELECT etag, last_modified, content, content_hash, fetched_at FROM pages WHERE url = ?", (key,)
+            ).fetchone()
+
+    def _put(self, key, etag, last_modified, content):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, content, content_hash(content), now, now),
+            )
+            self._db.execute(
+                "DELETE FROM pages WHERE url IN (SELECT url FROM pages ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
+
+    def _touch(self, key, revalidated=False):
+        now = time.time()
+        with self._lock:
+            if revalidated:
+                self._db.execute("UPDATE pages SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, key))
+            else:
+                self._db.execute("UPDATE pages SET last_access = ? WHERE url = ?", (now, key))
+            self._db.commit()
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def fetch_page(self, url, session=None):
+        """Returns (text, content hash) for a web page."""
+        key = normalize_url(url)
+        cached = self._get(key)
+        headers = {"User-Agent": USER_AGENT}
+        if cached:
+            etag, last_modified, content, digest, fetched_at = cached
+            if not (etag or last_modified) and time.time() - fetched_at < self.max_age:
+                self._count("hits")
+                self._touch(key)
+                return content, digest
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        response = (session or requests).get(url, headers=headers, timeout=self.timeout, verify=False)
+        if cached and response.status_code == 304:
+            self._count("revalidated")
+            self._touch(key, revalidated=True)
+            return cached[2], cached[3]
+        response.raise_for_status()
+        text = response_to_text(response)
+        self._count("misses")
+        self._put(key, response.headers.get("ETag"), response.headers.get("Last-Modified"), text)
+        return text, content_hash(text)
+
+    def fetch_with(self, url, fetcher):
+        """Cache any other source (e.g. YouTube via yt-dlp) for `max_age`; fetcher(url) -> text or None."""
+        key = normalize_url(url)
+        cached = self._get(key)
+        if cached and time.time() - cached[4] < self.max_age:
+            self._count("hits")
+            self._touch(key)
+            return cached[2], cached[3]
+        text = fetcher(url)
+        if text is None:
+            return None, None
+        self._count("misses")
+        self._put(key, None, None, text)
+        return text, content_hash(text)
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(content)), 0) FROM pages").fetchone()
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            "entries": entries,
+            "size_mb": round(size / 1e6, 2),
+            "hit_rate": round((self.hits + self.revalidated) / lookups, 2) if lookups else 0.0,
+            "not_modified": self.revalidated,
+        }
+
+
+class SummaryCache:
+    """Finished summaries keyed by (normalized URL, content hash, prompt, model),
+    so unchanged content is never summarized twice. Holds at most `max_entries`
+    summaries and evicts the least recently used."""
+
+    def __init__(self, path=None, max_entries=10_000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = _open(path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, summary TEXT, last_access REAL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_summaries_last_access ON summaries(last_access)")
+        self._db.commit()
+
+    @staticmethod
+    def key(url, digest, prompt, model):
+        return hashlib.sha256("\0".join([normalize_url(url), digest, prompt, model]).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute("UPDATE summaries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            return row[0]
+
+    def set(self, key, summary):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO summaries VALUES (?, ?, ?)", (key, summary, time.time()))
+            self._db.execute(
+                "DELETE FROM summaries WHERE key IN (SELECT key FROM summaries ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {"entries": entries, "hit_rate": round(self.hits / lookups, 2) if lookups else 0.0}
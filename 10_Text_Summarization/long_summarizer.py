@@ -0,0 +1,118 @@
+# Token-aware summarization: one "stuff" call when the content fits, parallel map + hierarchical reduce when it does not
+import sys
+import time
+from pathlib import Path
+
+from langchain.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.tokens import approx_tokens
+
+map_prompt = PromptTemplate.from_template(
+    "Write a concise summary of the following part of a longer document. Keep names, numbers and key facts.\n"
+    "Part:{text}\n"
+    "SUMMARY:"
+)
+collapse_prompt = PromptTemplate.from_template(
+    "The following are summaries of consecutive parts of one document. "
+    "Merge them into a single concise summary, keeping names, numbers and key facts.\n"
+    "Summaries:{text}\n"
+    "SUMMARY:"
+)
+
+
+class LongDocumentSummarizer:
+    """Summarizes Documents of any length with `prompt` (a template with {text}).
+
+    If the content fits `context_tokens` minus room for the prompt and the
+    answer, it is summarized in one call. Otherwise it is split into chunks of
+    about `chunk_tokens`, the chunks are summarized concurrently (at most
+    `max_concurrency` LLM calls at once), and the partial summaries are merged
+    level by level until they fit one final call with `prompt`."""
+
+    def __init__(self, llm, prompt, context_tokens=8192, output_tokens=512, chunk_tokens=3000,
+                 max_concurrency=4, token_counter=None):
+        self.prompt = prompt
+        self.final_chain = prompt | llm | StrOutputParser()
+        self.map_chain = map_prompt | llm | StrOutputParser()
+        self.collapse_chain = collapse_prompt | llm | StrOutputParser()
+        self.max_concurrency = max_concurrency
+        self.count_tokens = token_counter or self._llm_token_counter(llm)
+        # Room left for content once the longest template and the answer are accounted for
+        overhead = max(self.count_tokens(p.template) for p in (prompt, map_prompt, collapse_prompt))
+        self.budget = context_tokens - output_tokens - overhead
+        self.chunk_tokens = min(chunk_tokens, self.budget)
+
+    @staticmethod
+    def _llm_token_counter(llm):
+        # LangChain's get_num_tokens: exact only for models that override it (e.g. tiktoken for OpenAI);
+        # others, Groq included, count with the GPT-2 tokenizer. Falls back to a character estimate
+        try:
+            llm.get_num_tokens("probe")
+            return llm.get_num_tokens
+        except Exception:
+            return approx_tokens
+
+    def _splitter(self, chars_per_token):
+        # Chunks are measured in characters, converted with the characters-per-token ratio of the
+        # content itself, so the splitter never tokenizes candidate pieces; 10% headroom covers
+        # parts denser than the average
+        chunk_chars = max(1, int(self.chunk_tokens * chars_per_token * 0.9))
+        return RecursiveCharacterTextSplitter(chunk_size=chunk_chars, chunk_overlap=chunk_chars // 20)
+
+    def _run_concurrently(self, chain, texts, stage, on_progress):
+        results = [None] * len(texts)
+        config = {"max_concurrency": self.max_concurrency}
+        for done, (index, output) in enumerate(
+            chain.batch_as_completed([{"text": t} for t in texts], config=config), start=1
+        ):
+            results[index] = output
+            if on_progress:
+                on_progress(stage, done, len(texts))
+        return results
+
+    def _group(self, summaries):
+        # Consecutive summaries packed into groups that fit one collapse call
+        groups, current, used = [], [], 0
+        for summary in summaries:
+            tokens = self.count_tokens(summary)
+            if current and used + tokens > self.budget:
+                groups.append("\n\n".join(current))
+                current, used = [], 0
+            current.append(summary)
+            used += tokens
+        groups.append("\n\n".join(current))
+        return groups
+
+    def summarize(self, docs, on_progress=None):
+        """Returns (summary, info). on_progress(stage, done, total) is called as calls finish."""
+        start = time.perf_counter()
+        text = "\n\n".join(doc.page_content for doc in docs)
+        tokens = self.count_tokens(text)
+        info = {"tokens": tokens, "mode": "stuff", "chunks": 1, "reduce_levels": 0}
+
+        if tokens <= self.budget:
+            summary = self.final_chain.invoke({"text": text})
+        else:
+            info["mode"] = "map_reduce"
+            chunks = self._splitter(len(text) / tokens).split_documents(docs)
+            info["chunks"] = len(chunks)
+            summaries = self._run_concurrently(self.map_chain, [c.page_content for c in chunks], "map", on_progress)
+            while sum(self.count_tokens(s) for s in summaries) > self.budget:
+                info["reduce_levels"] += 1
+                groups = self._group(summaries)
+                if len(groups) == len(summaries):
+                    # Each summary alone fills the budget; merging cannot shrink further, so truncate
+                    summaries = [s[: len(s) * self.budget // (2 * self.count_tokens(s))] for s in summaries]
+                    continue
+                summaries = self._run_concurrently(
+                    self.collapse_chain, groups, f"reduce {info['reduce_levels']}", on_progress
+                )
+            summary = self.final_chain.invoke({"text": "\n\n".join(summaries)})
+
+        if on_progress:
+            on_progress("final", 1, 1)
+        info["seconds"] = round(time.perf_counter() - start, 2)
+        return summary, info
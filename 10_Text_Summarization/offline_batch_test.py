@@ -0,0 +1,129 @@
+# Offline check of the batch runner: local HTTP fixture servers and a fake, occasionally rate-limited LLM
+# Pages are served as text/plain so no HTML parser (or the models it downloads) is needed
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain_community.llms.fake import FakeListLLM
+from langchain_core.runnables import RunnableLambda
+
+from batch_summarize import run_batch
+from content_cache import FetchCache, SummaryCache
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if not self.path.startswith("/page/"):
+            self.send_error(404)
+            return
+        self.server.requests.append(dict(self.headers))
+        number = self.path.rsplit("/", 1)[-1]
+        # Bumping server.revision changes every page, as if the site had been edited
+        body = f"Page {number} (revision {self.server.revision})\n\n" + f"Paragraph about topic {number}.\n" * 200
+        etag = '"' + hashlib.md5(body.encode()).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", f"Mon, 01 Jan 2024 00:{self.server.revision:02d}:00 GMT")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+
+def fake_llm(latency, rate_limit_every):
+    llm = FakeListLLM(responses=["A fake summary of the page."])
+    calls = itertools.count(1)
+
+    def call(prompt):
+        if next(calls) % rate_limit_every == 0:
+            raise FakeRateLimitError("rate limited")
+        time.sleep(latency)
+        return llm.invoke(prompt)
+
+    return RunnableLambda(call)
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    server.revision = 0
+    server.requests = []  # request headers, in arrival order
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def read_records(path):
+    # Strict: every line must be a complete record
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline batch runner test")
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--llm-latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    servers = [start_server(), start_server()]  # two hosts for the per-host limits
+    urls = [f"http://127.0.0.1:{servers[i % 2].server_port}/page/{i}" for i in range(args.pages)]
+    urls.append(f"http://127.0.0.1:{servers[0].server_port}/missing")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fetch_cache = FetchCache(path=os.path.join(tmp, "cache.db"))
+        summary_cache = SummaryCache(path=os.path.join(tmp, "cache.db"))
+        output = os.path.join(tmp, "summaries.jsonl")
+        options = dict(fetch_cache=fetch_cache, summary_cache=summary_cache, workers=8, per_host=2,
+                       host_interval=0.02, llm_concurrency=4, report_every=1000)
+        llm = fake_llm(args.llm_latency, rate_limit_every=7)
+
+        # 1. An "interrupted" run over the first half, plus a half-written last line
+        half = urls[: len(urls) // 2]
+        first = run_batch(half, output, llm, "fake", **options)
+        with open(output, "a", encoding="utf-8") as f:
+            f.write('{"url": "http://127.0.0.1/partial", "sta')
+        print("first half:", first)
+
+        # 2. Resume: only the remaining URLs are processed
+        resumed = run_batch(urls, output, llm, "fake", **options)
+        print("resumed:   ", resumed)
+        assert resumed["skipped"] == first["ok"], resumed
+        records = read_records(output)
+        ok_urls = {r["url"] for r in records if r["status"] == "ok"}
+        assert ok_urls == set(urls[:-1]), "every fixture page should be summarized"
+        assert any(r["status"] == "error" and r["url"] == urls[-1] for r in records), "404 should be recorded"
+        assert first["llm_retries"] + resumed["llm_retries"] > 0, "rate limits should have been retried"
+
+        # 3. Fresh output, warm caches: pages revalidate with 304 and summaries come from the cache
+        rerun = run_batch(urls, os.path.join(tmp, "rerun.jsonl"), llm, "fake", **options)
+        print("warm rerun:", rerun)
+        assert all(r.get("cached") for r in read_records(os.path.join(tmp, "rerun.jsonl")) if r["status"] == "ok")
+        assert fetch_cache.stats()["not_modified"] >= args.pages
+        print("fetch cache:", fetch_cache.stats(), "summary cache:", summary_cache.stats())
+
+    for server in servers:
+        server.shutdown()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
+
+# To run:
+# python offline_batch_test.py --pages 40
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("langchain_community")
+from batch_summarize import drop_partial_line, read_done, run_batch
+from content_cache import FetchCache, SummaryCache
+from offline_batch_test import fake_llm, start_server
+
+
+def test_partial_last_line_is_dropped(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_text('{"url": "a", "status": "ok"}\n{"url": "b", "sta', encoding="utf-8")
+    drop_partial_line(path)
+    assert path.read_text(encoding="utf-8") == '{"url": "a", "status": "ok"}\n'
+    drop_partial_line(path)  # complete files are left alone
+    assert path.read_text(encoding="utf-8") == '{"url": "a", "status": "ok"}\n'
+
+    path.write_text('{"url": "only partial"', encoding="utf-8")
+    drop_partial_line(path)
+    assert path.read_text(encoding="utf-8") == ""
+
+
+def test_resume_after_a_kill_mid_line(tmp_path):
+    server = start_server()
+    urls = [f"http://127.0.0.1:{server.server_port}/page/{i}" for i in range(6)]
+    output = tmp_path / "summaries.jsonl"
+    options = dict(fetch_cache=FetchCache(path=tmp_path / "cache.db"), summary_cache=SummaryCache(path=tmp_path / "cache.db"),
+                   workers=4, per_host=2, host_interval=0, llm_concurrency=2, report_every=1000)
+    llm = fake_llm(latency=0, rate_limit_every=1000)
+    try:
+        run_batch(urls[:4], str(output), llm, "fake", **options)
+        # Killed while the fourth record was being written: only half of its line reached the disk
+        data = output.read_bytes()
+        last_line = data.rstrip(b"\n").rfind(b"\n") + 1
+        output.write_bytes(data[: last_line + (len(data) - last_line) // 2])
+        assert len(read_done(str(output))) == 3
+
+        resumed = run_batch(urls, str(output), llm, "fake", **options)
+    finally:
+        server.shutdown()
+
+    assert resumed["skipped"] == 3 and resumed["ok"] == 3
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert sorted(record["url"] for record in records) == sorted(urls)
+    assert all(record["status"] == "ok" for record in records)
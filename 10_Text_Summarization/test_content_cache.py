@@ -0,0 +1,90 @@
+import pytest
+
+pytest.importorskip("requests")
+import content_cache
+from content_cache import FetchCache, SummaryCache, content_hash, normalize_url, response_to_text
+from offline_batch_test import start_server
+
+
+class FakeResponse:
+    def __init__(self, content_type, content):
+        self.headers = {"Content-Type": content_type} if content_type else {}
+        self.content = content
+        self.text = content.decode("latin-1")
+
+
+def test_urls_are_normalized():
+    assert normalize_url("HTTPS://Example.com:443/a/?utm_source=x&b=2#top") == "https://example.com/a?b=2"
+
+
+def test_plain_text_is_kept_as_is():
+    assert response_to_text(FakeResponse("text/plain; charset=utf-8", b"plain words")) == "plain words"
+
+
+def test_pdf_is_parsed_from_bytes(monkeypatch):
+    seen = []
+    monkeypatch.setattr(content_cache, "pdf_to_text", lambda data: seen.append(data) or "pdf text")
+    assert response_to_text(FakeResponse("application/pdf", b"%PDF-1.7\x00\xff")) == "pdf text"
+    assert seen == [b"%PDF-1.7\x00\xff"]
+
+
+def test_other_binary_content_is_rejected():
+    with pytest.raises(ValueError, match="unsupported content type 'image/png'"):
+        response_to_text(FakeResponse("image/png", b"\x89PNG\r\n"))
+
+
+def test_summary_cache_evicts_least_recently_used(tmp_path):
+    cache = SummaryCache(path=tmp_path / "cache.db", max_entries=2)
+    keys = [SummaryCache.key(f"https://example.com/{i}", "digest", "prompt", "model") for i in range(3)]
+    cache.set(keys[0], "zero")
+    cache.set(keys[1], "one")
+    assert cache.get(keys[0]) == "zero"
+    cache.set(keys[2], "two")
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == "zero"
+
+
+@pytest.fixture
+def server():
+    server = start_server()
+    yield server
+    server.shutdown()
+
+
+def test_pages_are_revalidated_with_their_validators(server, tmp_path):
+    cache = FetchCache(path=tmp_path / "cache.db")
+    url = f"http://127.0.0.1:{server.server_port}/page/1"
+
+    text, digest = cache.fetch_page(url)
+    assert text.startswith("Page 1 (revision 0)") and digest == content_hash(text)
+    assert "If-None-Match" not in server.requests[-1]
+
+    # Unchanged: conditional GET, 304, served from the cache
+    assert cache.fetch_page(url) == (text, digest)
+    sent = server.requests[-1]
+    assert sent["If-None-Match"].startswith('"') and sent["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert (cache.misses, cache.revalidated) == (1, 1)
+
+    # Changed: the 200 replaces the entry and its validators
+    server.revision = 1
+    changed, changed_digest = cache.fetch_page(url)
+    assert changed.startswith("Page 1 (revision 1)") and changed_digest != digest
+    assert cache.fetch_page(url) == (changed, changed_digest)
+    assert server.requests[-1]["If-Modified-Since"] == "Mon, 01 Jan 2024 00:01:00 GMT"
+    assert (cache.misses, cache.revalidated) == (2, 2)
+    assert cache.stats()["entries"] == 1
+
+
+def test_fetch_cache_evicts_least_recently_used(server, tmp_path):
+    cache = FetchCache(path=tmp_path / "cache.db", max_entries=2)
+    urls = [f"http://127.0.0.1:{server.server_port}/page/{i}" for i in range(3)]
+    cache.fetch_page(urls[0])
+    cache.fetch_page(urls[1])
+    cache.fetch_page(urls[0])  # revalidated, so page 1 is now the least recently used
+    cache.fetch_page(urls[2])
+    assert cache.stats()["entries"] == 2
+
+    cache.fetch_page(urls[1])
+    assert "If-None-Match" not in server.requests[-1]  # evicted: fetched unconditionally
+    cache.fetch_page(urls[2])
+    assert "If-None-Match" in server.requests[-1]
@@ -0,0 +1,41 @@
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("langchain_text_splitters")
+from langchain.prompts import PromptTemplate
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+
+from long_summarizer import LongDocumentSummarizer, approx_tokens, map_prompt
+
+
+class CountingTokenizer:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return approx_tokens(text)
+
+
+def test_long_content_is_split_without_tokenizing_every_piece():
+    tokenizer = CountingTokenizer()
+    seen = []
+
+    def llm(prompt_value):
+        seen.append(prompt_value.to_string())
+        return "short summary"
+
+    summarizer = LongDocumentSummarizer(RunnableLambda(llm), PromptTemplate.from_template("Final: {text}"), context_tokens=2048,
+                                        output_tokens=256, chunk_tokens=500, token_counter=tokenizer)
+    text = " ".join(f"Sentence number {i} about the topic." for i in range(2000))
+    summary, info = summarizer.summarize([Document(page_content=text)])
+
+    assert summary == "short summary"
+    assert info["mode"] == "map_reduce"
+    assert info["chunks"] >= info["tokens"] // 500
+    map_inputs = [p for p in seen if p.startswith("Write a concise summary")]
+    assert len(map_inputs) == info["chunks"]
+    assert max(approx_tokens(p) for p in map_inputs) <= 500 + approx_tokens(map_prompt.template)
+    # The whole text, the templates and the partial summaries; not one call per split candidate
+    assert tokenizer.calls < info["chunks"] + 10
@@ -1,11 +1,10 @@
 import streamlit as st
-from langchain_groq import ChatGroq
-from langchain.chains import LLMMathChain, LLMChain
-from langchain.prompts import PromptTemplate
-from langchain_community.utilities import WikipediaAPIWrapper
-from langchain.agents.agent_types import AgentType
-from langchain.agents import Tool, initialize_agent
 from langchain.callbacks import StreamlitCallbackHandler
+import time
+from assistant_agent import TOOL_NAMES, build_assistant_agent
+from fast_math import default_stats, solve
+from history_window import HistoryWindow, TokenUsageCounter
+import os
 
 # Configure the Streamlit app
 st.set_page_config(page_title="Text To Math Problem Solver And Data Search Assistant", page_icon="🧮")
@@ -18,69 +17,26 @@ if not groq_api_key:
     st.info("Please add your Groq API key to continue.")
     st.stop()
 
-# Initialize the language model using Groq API
-llm = ChatGroq(model="Gemma2-9b-It", groq_api_key=groq_api_key)
+# The LLM, the chains, the tools and the agent are built once per (api key, model, tool set) and reused on
+# every rerun; the agent's ReAct prompt with the tool descriptions is rendered only at build time
+@st.cache_resource
+def get_assistant_agent(groq_api_key, model_name="Gemma2-9b-It", tool_names=TOOL_NAMES):
+    return build_assistant_agent(groq_api_key, model_name, tool_names)
 
 
-
-# Initialize Wikipedia search tool
-wikipedia_wrapper = WikipediaAPIWrapper()
-wikipedia_tool = Tool(
-    name="Wikipedia",
-    func=wikipedia_wrapper.run,
-    description="A tool for searching the Internet to find various information on the topics mentioned."
-)
-
-
-# Initialize the Math solving tool
-math_chain = LLMMathChain.from_llm(llm=llm)
-calculator = Tool(
-    name="Calculator",
-    func=math_chain.run,
-    description="A tool for answering math-related questions. Only mathematical expressions need to be provided."
-)
-
-
-# Define the reasoning prompt template
-prompt = """
-You are an agent tasked with solving users' mathematical questions. Logically arrive at the solution and provide a detailed explanation,
-displaying it point-wise for the question below:
-Question: {question}
-Answer:
-"""
-prompt_template = PromptTemplate(
-    input_variables=["question"],
-    template=prompt
-)
-
+assistant_agent = get_assistant_agent(groq_api_key, "Gemma2-9b-It", TOOL_NAMES)
 
 
-# Combine the tools into a reasoning chain
-chain = LLMChain(llm=llm, prompt=prompt_template)
-
-reasoning_tool = Tool(
-    name="Reasoning tool",
-    func=chain.run,
-    description="A tool for answering logic-based and reasoning questions."
-)
-
-
-
-# Initialize the assistant agent
-assistant_agent = initialize_agent(
-    tools=[wikipedia_tool, calculator, reasoning_tool],
-    llm=llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=False,
-    handle_parsing_errors=True
-)
-
+# Only the current question and the relevant earlier turns that fit this budget are sent to the agent
+history_window = HistoryWindow(max_tokens=int(os.getenv("HISTORY_TOKEN_BUDGET", "600")))
 
 # Initialize chat session state
 if "messages" not in st.session_state:
     st.session_state["messages"] = [
         {"role": "assistant", "content": "Hi, I'm a Math chatbot who can answer all your math questions."}
     ]
+if "token_log" not in st.session_state:
+    st.session_state["token_log"] = []
 
 # Display chat messages
 for msg in st.session_state.messages:
@@ -101,9 +57,26 @@ if st.button("Find my answer"):
             st.session_state.messages.append({"role": "user", "content": question})
             st.chat_message("user").write(question)
 
-            # Generate the response using the assistant agent
-            st_cb = StreamlitCallbackHandler(st.container(), expand_new_thoughts=False)
-            response = assistant_agent.run(st.session_state.messages, callbacks=[st_cb])
+            # Plain arithmetic and simple counting problems are answered locally, without any LLM call
+            start = time.perf_counter()
+            solved = solve(question)
+            if solved:
+                response = f"{solved[0]}\n\nComputed locally: {solved[1]}"
+            else:
+                # Generate the response using the assistant agent
+                agent_input, accounting = history_window.build_input(st.session_state.messages[:-1], question)
+                st_cb = StreamlitCallbackHandler(st.container(), expand_new_thoughts=False)
+                token_usage = TokenUsageCounter()
+                response = assistant_agent.run(agent_input, callbacks=[st_cb, token_usage])
+                accounting.update(token_usage.summary())
+                st.session_state["token_log"].append(accounting)
+                st.caption(
+                    f"Input: {accounting['question_tokens']} question + {accounting['history_tokens']} history tokens "
+                    f"({accounting['turns_included']}/{accounting['turns_available']} earlier turns) | "
+                    f"{accounting['llm_calls']} LLM calls, {accounting['prompt_tokens']} prompt + "
+                    f"{accounting['completion_tokens']} completion tokens"
+                )
+            default_stats.record(fast=solved is not None, seconds=time.perf_counter() - start)
 
             # Add assistant response to session state and display it
             st.session_state.messages.append({'role': 'assistant', "content": response})
@@ -111,3 +84,8 @@ if st.button("Find my answer"):
             st.success(response)
     else:
         st.warning("Please enter the question.")
+
+st.sidebar.write("Answered without an LLM:", default_stats.summary())
+if st.session_state["token_log"]:
+    with st.sidebar.expander("Tokens per agent call"):
+        st.dataframe(st.session_state["token_log"][-20:])
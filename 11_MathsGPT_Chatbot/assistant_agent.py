@@ -0,0 +1,67 @@
+# Builds the math assistant: the LLM, its chains, the tools and the ReAct agent
+from langchain_groq import ChatGroq
+from langchain.chains import LLMMathChain, LLMChain
+from langchain.prompts import PromptTemplate
+from langchain_community.utilities import WikipediaAPIWrapper
+from langchain.agents.agent_types import AgentType
+from langchain.agents import Tool, initialize_agent
+
+from fast_math import calculator as fast_calculator, default_stats
+
+TOOL_NAMES = ("Wikipedia", "Calculator", "Reasoning tool")
+
+# Define the reasoning prompt template
+prompt = """
+You are an agent tasked with solving users' mathematical questions. Logically arrive at the solution and provide a detailed explanation,
+displaying it point-wise for the question below:
+Question: {question}
+Answer:
+"""
+prompt_template = PromptTemplate(
+    input_variables=["question"],
+    template=prompt
+)
+
+
+def build_tools(llm):
+    # Initialize Wikipedia search tool
+    wikipedia_wrapper = WikipediaAPIWrapper()
+    wikipedia_tool = Tool(
+        name="Wikipedia",
+        func=wikipedia_wrapper.run,
+        description="A tool for searching the Internet to find various information on the topics mentioned."
+    )
+
+    # Initialize the Math solving tool
+    math_chain = LLMMathChain.from_llm(llm=llm)
+    calculator = Tool(
+        name="Calculator",
+        # Plain expressions are evaluated locally; LLMMathChain only runs when they cannot be parsed
+        func=fast_calculator(math_chain, default_stats),
+        description="A tool for answering math-related questions. Only mathematical expressions need to be provided."
+    )
+
+    # Combine the tools into a reasoning chain
+    chain = LLMChain(llm=llm, prompt=prompt_template)
+
+    reasoning_tool = Tool(
+        name="Reasoning tool",
+        func=chain.run,
+        description="A tool for answering logic-based and reasoning questions."
+    )
+    return {tool.name: tool for tool in (wikipedia_tool, calculator, reasoning_tool)}
+
+
+def build_assistant_agent(groq_api_key, model_name="Gemma2-9b-It", tool_names=TOOL_NAMES):
+    # Initialize the language model using Groq API
+    llm = ChatGroq(model=model_name, groq_api_key=groq_api_key)
+    tools = build_tools(llm)
+
+    # Initialize the assistant agent
+    return initialize_agent(
+        tools=[tools[name] for name in tool_names],
+        llm=llm,
+        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        verbose=False,
+        handle_parsing_errors=True
+    )
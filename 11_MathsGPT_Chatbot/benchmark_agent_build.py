@@ -0,0 +1,37 @@
+# Per-rerun construction overhead of the LLM, chains, tools and agent: rebuilt (before) vs cached factory (after)
+import argparse
+import time
+from functools import lru_cache
+
+from assistant_agent import TOOL_NAMES, build_assistant_agent
+
+# lru_cache stands in for st.cache_resource; same (api key, model, tool set) key as get_assistant_agent in app.py
+get_assistant_agent = lru_cache(maxsize=16)(build_assistant_agent)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent construction overhead per rerun")
+    parser.add_argument("--reruns", type=int, default=50)
+    args = parser.parse_args()
+    api_key, model_name = "gsk-benchmark", "Gemma2-9b-It"  # nothing is sent to Groq or Wikipedia
+
+    start = time.perf_counter()
+    for _ in range(args.reruns):
+        build_assistant_agent(api_key, model_name, TOOL_NAMES)
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.reruns):
+        get_assistant_agent(api_key, model_name, TOOL_NAMES)
+    after = time.perf_counter() - start
+
+    print(f"{args.reruns} reruns")
+    print(f"before (rebuilt every rerun): {before / args.reruns * 1000:.2f} ms/rerun, {before:.2f}s total")
+    print(f"after (cached factory):       {after / args.reruns * 1000:.3f} ms/rerun, {after:.3f}s total")
+
+
+if __name__ == "__main__":
+    main()
+
+# To run:
+# python benchmark_agent_build.py --reruns 50
@@ -0,0 +1,434 @@
+# Local solver for plain arithmetic and simple counting word problems, tried before any LLM call
+import ast
+import math
+import operator
+import re
+import threading
+
+BINARY_OPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod, ast.Pow: operator.pow,
+}
+UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+FUNCTIONS = {
+    "sqrt": math.sqrt, "sin": math.sin, "cos": math.cos, "tan": math.tan, "log": math.log,
+    "log10": math.log10, "exp": math.exp, "abs": abs, "round": round, "floor": math.floor, "ceil": math.ceil,
+}
+CONSTANTS = {"pi": math.pi, "e": math.e}
+MAX_EXPONENT = 100
+MAX_BITS = 10_000  # ~3000 digits; bounds every intermediate result, not just the exponent
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9,
+    "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15, "sixteen": 16,
+    "seventeen": 17, "eighteen": 18, "nineteen": 19, "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "hundred": 100, "dozen": 12, "a dozen": 12,
+}
+OPERATOR_WORDS = [
+    (r"\bmultiplied by\b", "*"), (r"\bdivided by\b", "/"), (r"\btimes\b", "*"), (r"\bplus\b", "+"),
+    (r"\bminus\b", "-"), (r"\bover\b", "/"), (r"\bsquared\b", "**2"), (r"\bcubed\b", "**3"),
+    (r"\bmod(?:ulo)?\b", "%"), (r"\bsquare root of\b", "sqrt"), (r"×", "*"), (r"÷", "/"), (r"\^", "**"),
+    (r"(?<=\d)\s*x\s*(?=\d)", "*"),
+]
+QUESTION_PREFIX = re.compile(
+    r"^\s*(?:please\s+)?(?:what\s+is|what's|calculate|compute|evaluate|solve|how\s+much\s+is)\s*", re.I
+)
+
+
+class FastMathError(ValueError):
+    pass
+
+
+def _checked(value):
+    # Real, finite and of bounded size, so nothing downstream can blow up
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise FastMathError("result is not a real number")
+    if isinstance(value, float) and not math.isfinite(value):
+        raise FastMathError("result is not finite")
+    if isinstance(value, int) and value.bit_length() > MAX_BITS:
+        raise FastMathError("result too large")
+    return value
+
+
+def _bits(value):
+    return abs(value).bit_length() if isinstance(value, int) else 0
+
+
+def _eval(node):
+    if isinstance(node, ast.Expression):
+        return _eval(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return _checked(node.value)
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPS:
+        left, right = _eval(node.left), _eval(node.right)
+        # Refuse before computing: (2**100)**100 passes the exponent check but not the size estimate
+        if isinstance(node.op, ast.Pow):
+            if abs(right) > MAX_EXPONENT:
+                raise FastMathError("exponent too large")
+            if abs(left) > 1 and _bits(left) * abs(right) > MAX_BITS:
+                raise FastMathError("result too large")
+        if isinstance(node.op, ast.Mult) and _bits(left) + _bits(right) > MAX_BITS:
+            raise FastMathError("result too large")
+        return _checked(BINARY_OPS[type(node.op)](left, right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPS:
+        return _checked(UNARY_OPS[type(node.op)](_eval(node.operand)))
+    if isinstance(node, ast.Name) and node.id in CONSTANTS:
+        return CONSTANTS[node.id]
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS
+            and not node.keywords):
+        return _checked(FUNCTIONS[node.func.id](*[_eval(arg) for arg in node.args]))
+    raise FastMathError(f"unsupported expression: {ast.dump(node)[:60]}")
+
+
+def safe_eval(expression):
+    """Evaluates arithmetic only: numbers, + - * / // % **, a few math functions, pi and e.
+    Every intermediate result must be a finite real number of at most MAX_BITS bits."""
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise FastMathError(str(e)) from e
+    try:
+        return _eval(tree)
+    except (ArithmeticError, TypeError, ValueError) as e:
+        raise FastMathError(str(e)) from e
+
+
+def format_number(value):
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return str(round(value, 10)) if isinstance(value, float) else str(value)
+
+
+def to_expression(text):
+    """Turns "What is 5 plus 2 times 3?" into "5 + 2 * 3", or returns None if
+    the text is not plain arithmetic."""
+    expression = QUESTION_PREFIX.sub("", text.strip().lower()).rstrip("?=. ")
+    expression = expression.replace(",", "")
+    for pattern, replacement in OPERATOR_WORDS:
+        expression = re.sub(pattern, f" {replacement} ", expression)
+    for word, value in sorted(NUMBER_WORDS.items(), key=lambda item: -len(item[0])):
+        expression = re.sub(rf"\b{word}\b", str(value), expression)
+    expression = re.sub(r"\s+", " ", expression).strip()
+    names = set(re.findall(r"[a-z_]+", expression))
+    if not expression or not re.search(r"\d", expression) or names - set(FUNCTIONS) - set(CONSTANTS):
+        return None
+    return expression
+
+
+# Counting word problems: "I have 5 bananas and 7 grapes. I eat 2 bananas ... How many ... in total?"
+# Holdings are tracked per person, so "Tom has 3 apples. Sara has 4 apples." keeps Tom's and Sara's apart
+VERB_FORMS = {
+    "gain": [("have", "has", "had"), ("buy", "buys", "bought"), ("get", "gets", "got"),
+             ("receive", "receives", "received"), ("find", "finds", "found"), ("pick", "picks", "picked"),
+             ("add", "adds", "added"), ("collect", "collects", "collected")],
+    "loss": [("eat", "eats", "ate", "eaten"), ("lose", "loses", "lost"), ("sell", "sells", "sold"),
+             ("use", "uses", "used"), ("drop", "drops", "dropped")],
+    # To someone ("gives him 3", "gives 3 apples to Tom") or away
+    "give": [("give", "gives", "gave", "given")],
+}
+VERBS = {form: (kind, forms[0]) for kind, groups in VERB_FORMS.items() for forms in groups for form in forms}
+FIRST_PERSON = {"i": "I", "me": "I", "we": "we", "us": "we", "you": "you"}
+THIRD_PERSON = {"he", "him", "she", "her", "they", "them"}
+ADVERBS = {"also", "then", "just", "now", "later", "still"}
+POSSESSIVES = {"my", "your", "his", "her", "its", "our", "their"}
+# The only words a statement may contain besides verbs, numbers, the nouns they count and the people involved
+FILLER = ADVERBS | {"and"}
+# ...and the only words a question may add after who and what it asks about
+QUESTION_FILLER = {"of", "in", "at", "the", "end", "now", "left", "there", "altogether", "all", "total"}
+GENERIC_NOUNS = {"fruit", "piece", "item", "thing", "object", "total", "all"}
+NUMBER = r"\d+(?:\.\d+)?|a dozen|" + "|".join(w for w in NUMBER_WORDS if w != "a dozen")
+EACH = re.compile(
+    rf"\beach\s+(?P<container>[a-z]+?)s?\s+(?:of\s+[a-z]+\s+)?(?:contains|has|holds|have|contain)\s+(?P<count>{NUMBER})\s+[a-z]+",
+    re.I,
+)
+QUESTION = re.compile(
+    r"\bhow\s+(?:many|much)\s+(?P<phrase>.*?)\s*(?:\b(?:do|does|did|will|would|is|are|was|were)\s+(?P<rest>.*))?$", re.I
+)
+UNSUPPORTED = re.compile(r"\b(?:twice|half|times|percent|per|every|average|ratio|fraction|share|split|if|than)\b|%", re.I)
+
+
+def _number(text):
+    text = text.lower()
+    return NUMBER_WORDS[text] if text in NUMBER_WORDS else float(text)
+
+
+def _is_number(token):
+    return token.lower() in NUMBER_WORDS or re.fullmatch(r"\d+(?:\.\d+)?", token) is not None
+
+
+def _singular(noun):
+    noun = noun.lower()
+    return noun[:-1] if noun.endswith("s") and not noun.endswith("ss") else noun
+
+
+def _is_person(token):
+    lower = token.lower()
+    if lower in POSSESSIVES or lower in FILLER or lower in VERBS:
+        return False
+    return lower in FIRST_PERSON or lower in THIRD_PERSON or token[0].isupper()
+
+
+def _is_noun(token):
+    lower = token.lower()
+    return (token.islower() and not _is_number(token) and lower not in VERBS and lower not in FILLER
+            and lower not in FIRST_PERSON and lower not in THIRD_PERSON and lower not in POSSESSIVES
+            and lower not in QUESTION_FILLER and lower not in ("more", "to", "away"))
+
+
+def _resolve(token, people, exclude=None):
+    # I/me -> "I"; a name -> itself; he/she/him/her/they/them -> the one other person mentioned, else None
+    lower = token.lower()
+    if lower in FIRST_PERSON:
+        return FIRST_PERSON[lower]
+    if lower in THIRD_PERSON:
+        others = {p for p in people if p != exclude and p not in FIRST_PERSON.values()}
+        return others.pop() if len(others) == 1 else None
+    return token if token[0].isupper() else None
+
+
+class _Ledger:
+    """What each person holds and how much each verb moved, with the terms that explain it."""
+
+    def __init__(self):
+        self.people = []
+        self.holdings = {}    # person -> noun -> count
+        self.containers = {}  # person -> (container, content) -> count
+        self.changes = {}     # (person, verb, noun) -> count
+        self.terms = []       # (person, noun, verb, "+ 5 apples")
+
+    def meet(self, person):
+        if person not in self.people:
+            self.people.append(person)
+
+    def add(self, person, verb, count, noun, content=None, note=""):
+        self.meet(person)
+        target = self.containers if content else self.holdings
+        key = (_singular(noun), _singular(content)) if content else _singular(noun)
+        held = target.setdefault(person, {})
+        held[key] = held.get(key, 0) + count
+        of = f" of {content}" if content else ""
+        self.terms.append((person, _singular(content or noun), verb,
+                           f"{'+' if count >= 0 else '-'} {format_number(abs(count))} {noun}{of}{note}"))
+
+    def change(self, person, verb, noun, count):
+        key = (person, verb, _singular(noun))
+        self.changes[key] = self.changes.get(key, 0) + count
+
+
+def _read_statement(sentence, ledger, state):
+    """Applies one sentence to the ledger; False unless every word is one the patterns account for."""
+    tokens = re.findall(r"[A-Za-z]+|\d+(?:\.\d+)?", sentence)
+    used, i = set(), 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token.lower() in VERBS:
+            kind, lemma = VERBS[token.lower()]
+            j = i - 1
+            while j >= 0 and tokens[j].lower() in ADVERBS:
+                j -= 1
+            if j >= 0 and _is_person(tokens[j]):
+                if j >= 2 and tokens[j - 1].lower() == "and" and _is_person(tokens[j - 2]):
+                    return False  # "Tom and Sara have ..." is a joint subject
+                state["subject"] = _resolve(tokens[j], ledger.people)
+                if state["subject"] is None:
+                    return False
+                ledger.meet(state["subject"])
+                used.add(j)
+            if state["subject"] is None:
+                return False
+            state["recipient"], verb_at = None, [i]
+            if kind == "give" and i + 1 < len(tokens):
+                following = tokens[i + 1]
+                if following.lower() == "away":
+                    kind, i = "loss", i + 1
+                    verb_at.append(i)
+                elif i + 2 < len(tokens) and _is_number(tokens[i + 2]) and _is_person(following):
+                    state["recipient"] = _resolve(following, ledger.people, exclude=state["subject"])
+                    if state["recipient"] is None:
+                        return False
+                    i += 1
+                    verb_at.append(i)
+            state["verb"] = (kind, lemma, verb_at)  # counted as read only once a number uses it
+            i += 1
+            continue
+
+        if _is_number(token):
+            if state["verb"] is None:
+                return False
+            count, j = _number(token), i + 1
+            if j < len(tokens) and tokens[j].lower() == "more":
+                j += 1
+            if j + 1 < len(tokens) and tokens[j].lower() == "of" and tokens[j + 1].lower() in ("them", "those", "these"):
+                noun, content, j = state["noun"], None, j + 2  # "2 of them": the last thing counted
+            elif j < len(tokens) and _is_noun(tokens[j]):
+                noun, content, j = tokens[j], None, j + 1
+                if j + 1 < len(tokens) and tokens[j].lower() == "of" and _is_noun(tokens[j + 1]):
+                    content, j = tokens[j + 1], j + 2
+            else:
+                return False
+            if noun is None:
+                return False
+            kind, lemma, verb_at = state["verb"]
+            subject = state["subject"]
+            if kind == "give" and state["recipient"] is None and j + 1 < len(tokens) and tokens[j].lower() == "to":
+                state["recipient"] = _resolve(tokens[j + 1], ledger.people, exclude=subject)
+                if state["recipient"] is None:
+                    return False
+                j += 2
+            ledger.add(subject, lemma, count if kind == "gain" else -count, noun, content)
+            ledger.change(subject, lemma, content or noun, count)
+            if kind == "give" and state["recipient"] is not None:
+                ledger.add(state["recipient"], "have", count, noun, content, note=f" from {'me' if subject == 'I' else subject}")
+            state["noun"] = noun
+            used.update(verb_at)
+            used.update(range(i, j))
+            i = j
+            continue
+        i += 1
+    # Fail closed: "not", "but", "yesterday", "used to", "my brother", "boxes of 6" are all left unread
+    return all(k in used or tokens[k].lower() in FILLER for k in range(len(tokens)))
+
+
+def solve_word_problem(text):
+    """Returns (value, expression) for simple add/remove counting problems, else None.
+
+    Only answers how many of the asked thing the asked person has (or ate,
+    bought, gave...). Any word the patterns do not account for (a negation,
+    "but", "yesterday", "my brother", "boxes of 6"), or a person or thing that
+    cannot be pinned down, makes it give up."""
+    text = re.sub(r"\ba dozen\b", "12", text, flags=re.I)
+    sentences = [s.strip() for s in re.split(r"[.?!]\s*", text) if s.strip()]
+    question = next((s for s in reversed(sentences) if re.search(r"\bhow\s+(?:many|much)\b", s, re.I)), None)
+    if question is None or UNSUPPORTED.search(text):
+        return None
+
+    ledger, multipliers = _Ledger(), {}
+    state = {"subject": None, "verb": None, "recipient": None, "noun": None}
+    for sentence in sentences:
+        if sentence is question:
+            continue
+        each = EACH.search(sentence)
+        if each:
+            multipliers[_singular(each.group("container"))] = _number(each.group("count"))
+            sentence = sentence[:each.start()] + sentence[each.end():]
+        state["verb"] = state["recipient"] = None
+        if not _read_statement(sentence, ledger, state):
+            return None
+    if not ledger.terms:
+        return None
+
+    # Containers count as their contents ("2 packs of blueberries" x "each pack contains 25 berries")
+    for person, containers in ledger.containers.items():
+        for (container, content), count in containers.items():
+            if container not in multipliers:
+                return None
+            held = ledger.holdings.setdefault(person, {})
+            held[content] = held.get(content, 0) + count * multipliers[container]
+            ledger.terms.append((person, content, "have", f"(x{format_number(multipliers[container])} per {container})"))
+
+    # Who is asked about, about what, and whether it is what they have or what a verb moved
+    asked = QUESTION.search(question)
+    words = re.findall(r"[A-Za-z]+", asked.group("phrase"))
+    # One thing only: "total pieces of fruit" is fine, "apples and oranges" is not
+    if any(_singular(w) not in GENERIC_NOUNS and w.lower() not in QUESTION_FILLER for w in words[:-1]):
+        return None
+    if words and not _is_noun(words[-1]):
+        return None
+    noun = _singular(words[-1]) if words else "total"
+    rest = re.findall(r"[A-Za-z]+", asked.group("rest") or "")
+    if rest and _is_person(rest[0]):
+        person = _resolve(rest[0], ledger.people)
+        verb, extra = (rest[1].lower() if len(rest) > 1 else "have"), rest[2:]
+    elif len(ledger.holdings) == 1:
+        person, verb, extra = next(iter(ledger.holdings)), "have", rest  # "How many apples are left?"
+    else:
+        return None
+    if person is None or verb not in VERBS or any(w.lower() not in QUESTION_FILLER for w in extra):
+        return None
+    lemma = VERBS[verb][1]
+
+    terms = [(n, t) for p, n, v, t in ledger.terms if p == person and (lemma == "have" or v == lemma)]
+    if lemma == "have":
+        counts = ledger.holdings.get(person, {})
+    else:
+        # "How many apples did I eat?" asks for the amount eaten, not what is left
+        counts = {n: c for (p, v, n), c in ledger.changes.items() if p == person and v == lemma}
+        terms = [(n, "+ " + t.lstrip("+- ")) for n, t in terms]
+    if noun in GENERIC_NOUNS:
+        value = sum(counts.values())
+    elif noun in counts:
+        value = counts[noun]
+        terms = [(n, t) for n, t in terms if n == noun]
+    else:
+        return None
+    if value < 0 or not terms:
+        return None
+    return value, " ".join(t for _, t in terms).lstrip("+ ")
+
+
+def solve(text):
+    """Returns (answer, expression) without an LLM, or None if the text is not understood."""
+    expression = to_expression(text)
+    if expression is not None:
+        try:
+            return format_number(safe_eval(expression)), expression
+        except ValueError:  # FastMathError, or a number too long to print
+            pass
+    solved = solve_word_problem(text)
+    if solved is not None:
+        return format_number(solved[0]), solved[1]
+    return None
+
+
+def calculator(math_chain, stats=None):
+    """Calculator tool function: evaluates locally, falls back to LLMMathChain."""
+    def run(query):
+        solved = solve(query)
+        if stats is not None:
+            stats.record_tool(solved is not None)
+        if solved is not None:
+            return f"Answer: {solved[0]}"
+        return math_chain.run(query)
+    return run
+
+
+class FastMathStats:
+    """Share of questions answered without an LLM call and the latency of each path."""
+
+    def __init__(self):
+        self.fast = 0
+        self.llm = 0
+        self.fast_seconds = 0.0
+        self.llm_seconds = 0.0
+        self.tool_fast = 0
+        self.tool_llm = 0
+        self._lock = threading.Lock()
+
+    def record(self, fast, seconds):
+        with self._lock:
+            if fast:
+                self.fast += 1
+                self.fast_seconds += seconds
+            else:
+                self.llm += 1
+                self.llm_seconds += seconds
+
+    def record_tool(self, fast):
+        with self._lock:
+            if fast:
+                self.tool_fast += 1
+            else:
+                self.tool_llm += 1
+
+    def summary(self):
+        questions = self.fast + self.llm
+        return {
+            "questions": questions,
+            "answered_without_llm": round(self.fast / questions, 2) if questions else 0.0,
+            "fast_path_ms": round(self.fast_seconds / self.fast * 1000, 2) if self.fast else None,
+            "llm_path_ms": round(self.llm_seconds / self.llm * 1000, 1) if self.llm else None,
+            "calculator_calls_without_llm": f"{self.tool_fast}/{self.tool_fast + self.tool_llm}",
+        }
+
+
+default_stats = FastMathStats()
@@ -0,0 +1,138 @@
+# Bounded agent input: the current question plus a token-budgeted window of relevant earlier turns
+import re
+import sys
+from pathlib import Path
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.tokens import approx_tokens
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "is", "are", "was", "were", "be", "i", "you",
+    "me", "my", "we", "what", "how", "many", "much", "do", "does", "did", "can", "with", "at", "by", "from",
+    "have", "has", "had", "if", "then", "so", "as", "please", "find", "answer", "question",
+}
+FOLLOW_UP_WORDS = {"it", "its", "that", "this", "those", "these", "previous", "result", "answer", "above", "same", "again", "instead"}
+
+
+def _words(text):
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def _turns(messages):
+    # (user, assistant) pairs; the greeting and unanswered questions are skipped
+    turns = []
+    for previous, message in zip(messages, messages[1:]):
+        if previous["role"] == "user" and message["role"] == "assistant":
+            turns.append((previous["content"], message["content"]))
+    return turns
+
+
+class HistoryWindow:
+    """Builds the agent input from the current question and at most `max_tokens`
+    of earlier turns. Turns sharing content words with the question are chosen
+    first (most relevant, then most recent); the previous turn is always
+    included when the question refers back to it ("double that result"),
+    shortened to fit the budget if it is too long on its own."""
+
+    def __init__(self, max_tokens=600, max_turns=4, token_counter=approx_tokens):
+        self.max_tokens = max_tokens
+        self.max_turns = max_turns
+        self.count_tokens = token_counter
+
+    def _shorten(self, text, budget, keep_end=False):
+        # Longest head (or tail) of `text`, marked with "...", that fits in `budget` tokens
+        if self.count_tokens(text) <= budget:
+            return text
+        low, high = 0, len(text)
+        while low < high:
+            size = (low + high + 1) // 2
+            part = "..." + text[-size:] if keep_end else text[:size] + "..."
+            if self.count_tokens(part) <= budget:
+                low = size
+            else:
+                high = size - 1
+        if low == 0:
+            return ""
+        return "..." + text[-low:] if keep_end else text[:low] + "..."
+
+    def _fit(self, user, assistant, budget):
+        # The question's start and the answer's end (where the result is) share the budget
+        user = self._shorten(user, max(budget // 2, budget - self.count_tokens(assistant)))
+        assistant = self._shorten(assistant, budget - self.count_tokens(user), keep_end=True)
+        return user, assistant
+
+    def select(self, messages, question):
+        turns = _turns(messages)
+        question_words = _words(question)
+        content_words = question_words - STOPWORDS
+        follow_up = len(turns) - 1 if turns and question_words & FOLLOW_UP_WORDS else None
+        scored = []
+        for index, (user, assistant) in enumerate(turns):
+            overlap = len(content_words & (_words(user) | _words(assistant)))
+            if index == follow_up:
+                overlap += 100
+            if overlap:
+                scored.append((overlap, index))
+
+        chosen, used = {}, 0
+        for _, index in sorted(scored, reverse=True):
+            if len(chosen) == self.max_turns:
+                break
+            user, assistant = turns[index]
+            tokens = self.count_tokens(user) + self.count_tokens(assistant)
+            if used + tokens > self.max_tokens:
+                if index != follow_up:
+                    continue
+                # "Double that" is meaningless without the previous turn: cut it down rather than drop it
+                user, assistant = self._fit(user, assistant, self.max_tokens - used)
+                if not assistant:
+                    continue
+                tokens = self.count_tokens(user) + self.count_tokens(assistant)
+            chosen[index] = (user, assistant)
+            used += tokens
+        return [chosen[i] for i in sorted(chosen)], len(turns)
+
+    def build_input(self, messages, question):
+        """Returns (agent input, accounting). `messages` are the earlier chat messages, without `question`."""
+        turns, available = self.select(messages, question)
+        history = "\n".join(f"User: {user}\nAssistant: {assistant}" for user, assistant in turns)
+        agent_input = f"Relevant earlier conversation:\n{history}\n\nCurrent question: {question}" if turns else question
+        accounting = {
+            "question_tokens": self.count_tokens(question),
+            "history_tokens": self.count_tokens(history) if turns else 0,
+            "turns_included": len(turns),
+            "turns_available": available,
+        }
+        return agent_input, accounting
+
+
+class TokenUsageCounter(BaseCallbackHandler):
+    """Sums the provider-reported token usage of every LLM call in one agent run."""
+
+    def __init__(self):
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def on_llm_end(self, response, **kwargs):
+        self.llm_calls += 1
+        usage = (response.llm_output or {}).get("token_usage")
+        if usage:
+            self.prompt_tokens += usage.get("prompt_tokens", 0) or 0
+            self.completion_tokens += usage.get("completion_tokens", 0) or 0
+            return
+        # Chat models also attach usage to each generated message
+        for generations in response.generations:
+            for generation in generations:
+                metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                self.prompt_tokens += metadata.get("input_tokens", 0)
+                self.completion_tokens += metadata.get("output_tokens", 0)
+
+    def summary(self):
+        return {
+            "llm_calls": self.llm_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
@@ -0,0 +1,19 @@
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("langchain_community")
+pytest.importorskip("langchain_groq")
+pytest.importorskip("numexpr")  # LLMMathChain refuses to build without it
+from assistant_agent import TOOL_NAMES, build_assistant_agent
+
+API_KEY = "gsk-test"  # nothing is sent
+
+
+@pytest.mark.parametrize("tool_names", [TOOL_NAMES, ("Calculator",), ("Reasoning tool", "Wikipedia")])
+def test_agent_uses_exactly_the_requested_tools(tool_names):
+    assert [tool.name for tool in build_assistant_agent(API_KEY, tool_names=tool_names).tools] == list(tool_names)
+
+
+def test_calculator_is_the_local_fast_path():
+    calculator = {tool.name: tool for tool in build_assistant_agent(API_KEY).tools}["Calculator"]
+    assert calculator.func("12 * (3 + 4)") == "Answer: 84"
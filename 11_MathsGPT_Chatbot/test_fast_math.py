@@ -0,0 +1,75 @@
+import pytest
+
+from fast_math import solve, solve_word_problem
+
+
+def answer(text):
+    solved = solve_word_problem(text)
+    return solved[0] if solved else None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("I have 5 bananas and 7 grapes. I eat 2 bananas and give away 3 grapes. Then I buy a dozen apples and "
+     "2 packs of blueberries. Each pack of blueberries contains 25 berries. "
+     "How many total pieces of fruit do I have at the end?", 69),
+    ("I have 10 apples. I eat 3 apples. How many apples are left?", 7),
+    ("I have 5 apples. I eat 2 apples. How many apples did I eat?", 2),
+    ("Tom has 3 apples. Sara has 4 apples. How many apples does Tom have?", 3),
+    ("John has 5 apples. Mary gives him 3 apples. How many apples does John have?", 8),
+    ("I have 5 apples. I eat 2 of them. How many apples do I have?", 3),
+    ("I have 5 apples and 3 oranges. How many apples do I have in total?", 5),
+    ("I have 5 apples and 3 oranges. How many apples are there in total?", 5),
+    ("I have 5 apples and 3 oranges. How many fruits do I have in total?", 8),
+    ("I have 5 apples. I give 2 apples to Tom. How many apples does Tom have?", 2),
+    ("I have 5 apples. I give 2 apples to Tom. How many apples do I have?", 3),
+    ("Sam bought 4 pens. He lost 1 pen. How many pens does he have now?", 3),
+])
+def test_word_problems(text, expected):
+    assert answer(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Tom has 3 apples. Sara has 4 apples. How many apples are left?",
+    "Tom has 3 apples. Sara has 4 apples. How many apples does he have?",
+    "Tom and Sara have 5 apples. How many apples does Tom have?",
+    "I have 5 apples. I eat 2 apples. How many apples did Tom eat?",
+    "I have 5 apples. How many pears do I have?",
+    "I have 5 apples. How many more apples does Tom have than me?",
+    "I have 5 apples. I eat half of them. How many apples do I have?",
+    "I have 5 apples and 2 dozen eggs. How many eggs do I have?",
+    "I have 5 apples. My brother has 3 apples. How many apples do I have?",
+    "I have 5 apples. How many apples does my brother have?",
+    "I have 2 boxes of 6 eggs. How many eggs do I have?",
+    "I have 5 apples. I do not eat 2 apples. How many apples do I have?",
+    "I have 5 apples. I lost 2 apples but found them again. How many apples do I have?",
+    "I have 5 apples. I had 3 apples yesterday. How many apples do I have?",
+    "I have 5 apples. I used to have 9 apples. How many apples do I have?",
+    "I have 5 apples and 3 oranges. How many apples and oranges do I have?",
+])
+def test_unclear_word_problems_are_left_to_the_llm(text):
+    assert solve_word_problem(text) is None
+
+
+def test_solve_shows_the_working():
+    assert solve("John has 5 apples. Mary gives him 3 apples. How many apples does John have?") == (
+        "8", "5 apples + 3 apples from Mary"
+    )
+    assert solve("What is 5 plus 2 times 3?") == ("11", "5 + 2 * 3")
+
+
+@pytest.mark.parametrize("text", [
+    "What is (10**100)**50?",
+    "What is ((2**100)**100)**100?",
+    "What is 1e308*10?",
+    "What is exp(1000)?",
+    "What is (-8)**0.5?",
+    "What is " + "*".join(["9**99"] * 40) + "?",
+])
+def test_huge_non_finite_or_complex_results_fall_back(text):
+    assert solve(text) is None
+
+
+def test_arithmetic_within_limits():
+    assert solve("What is 2**100?") == ("1267650600228229401496703205376", "2**100")
+    assert solve("Calculate sqrt(16) + 2.5") == ("6.5", "sqrt(16) + 2.5")
+    assert solve("What is 7 divided by 2?") == ("3.5", "7 / 2")
@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("langchain_core")
+from history_window import HistoryWindow, TokenUsageCounter
+
+
+def chat(*turns):
+    messages = [{"role": "assistant", "content": "Hi, I'm a Math chatbot."}]
+    for user, assistant in turns:
+        messages += [{"role": "user", "content": user}, {"role": "assistant", "content": assistant}]
+    return messages
+
+
+MESSAGES = chat(
+    ("What is the area of a circle with radius 3?", "The area is 28.27."),
+    ("Who proved Fermat's last theorem?", "Andrew Wiles."),
+    ("How many apples are in 4 boxes of 6 apples?", "24 apples."),
+)
+
+
+def test_first_question_is_sent_alone():
+    agent_input, accounting = HistoryWindow().build_input(chat(), "What is 2 + 2?")
+    assert agent_input == "What is 2 + 2?"
+    assert accounting["history_tokens"] == 0 and accounting["turns_available"] == 0
+
+
+def test_only_relevant_turns_are_included():
+    agent_input, accounting = HistoryWindow().build_input(MESSAGES, "And the circumference of a circle with radius 3?")
+    assert "area of a circle" in agent_input
+    assert "Fermat" not in agent_input
+    assert agent_input.endswith("Current question: And the circumference of a circle with radius 3?")
+    assert accounting["turns_included"] == 1 and accounting["turns_available"] == 3
+
+
+def test_follow_up_includes_the_previous_turn():
+    agent_input, _ = HistoryWindow().build_input(MESSAGES, "Double that result")
+    assert "24 apples." in agent_input
+
+
+def test_unrelated_question_sends_no_history():
+    agent_input, accounting = HistoryWindow().build_input(MESSAGES, "Integrate x squared")
+    assert agent_input == "Integrate x squared"
+    assert accounting["turns_included"] == 0
+
+
+def test_history_stays_within_the_token_budget():
+    long_turns = chat(*[(f"Circle question {i} " + "radius " * 50, "Answer " * 50) for i in range(10)])
+    window = HistoryWindow(max_tokens=200, max_turns=4)
+    _, accounting = window.build_input(long_turns, "Another circle radius question")
+    assert 0 < accounting["history_tokens"] <= 200 + 10
+
+
+def test_token_usage_from_llm_output_and_message_metadata():
+    counter = TokenUsageCounter()
+    counter.on_llm_end(SimpleNamespace(llm_output={"token_usage": {"prompt_tokens": 100, "completion_tokens": 20}},
+                                       generations=[]))
+    message = SimpleNamespace(usage_metadata={"input_tokens": 50, "output_tokens": 5})
+    counter.on_llm_end(SimpleNamespace(llm_output=None, generations=[[SimpleNamespace(message=message)]]))
+    assert counter.summary() == {"llm_calls": 2, "prompt_tokens": 150, "completion_tokens": 25}
+
+
+def test_follow_up_keeps_a_previous_turn_too_long_for_the_budget():
+    working = "Step: multiply the number of boxes by the apples per box. " * 40
+    messages = chat(("How many apples are in 4 boxes of 6 apples? " * 10, working + "The answer is 24 apples."))
+    window = HistoryWindow(max_tokens=100)
+    agent_input, accounting = window.build_input(messages, "Double that result")
+    assert accounting["turns_included"] == 1
+    assert accounting["history_tokens"] <= 100 + 10
+    assert "How many apples are in 4 boxes" in agent_input
+    assert "The answer is 24 apples." in agent_input  # the end of the answer, where the result is, survives
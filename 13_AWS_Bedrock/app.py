@@ -12,8 +12,12 @@ from langchain.llms.bedrock import Bedrock
 ## Data Ingestion
 
 import numpy as np
+from pathlib import Path
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFDirectoryLoader
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.pdf_ingestion import ParallelPyPDFDirectoryLoader
+from common.embedding_cache import CachedEmbeddings
 
 # Vector Embedding And Vector Store
 
@@ -25,12 +29,13 @@ from langchain.chains import RetrievalQA
 
 ## Bedrock Clients
 bedrock=boto3.client(service_name="bedrock-runtime")
-bedrock_embeddings=BedrockEmbeddings(model_id="amazon.titan-embed-text-v1",client=bedrock)
+bedrock_embeddings=CachedEmbeddings(BedrockEmbeddings(model_id="amazon.titan-embed-text-v1",client=bedrock))
 
 
 ## Data ingestion
 def data_ingestion():
-    loader=PyPDFDirectoryLoader("data")
+    # Pages are parsed across a process pool (PDF_WORKERS, defaults to all cores)
+    loader=ParallelPyPDFDirectoryLoader("data")
     documents=loader.load()
 
     # - in our testing Character split works better with this PDF data set
@@ -0,0 +1,2 @@
+# Helpers shared by the RAG apps in this repository.
+# Apps add the repository root to sys.path and import e.g. `from common.pdf_ingestion import ...`
@@ -0,0 +1,42 @@
+# Pages per second of parallel PDF extraction on the bundled research papers
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.pdf_ingestion import iter_pdf_documents, list_pdfs
+
+DEFAULT_DIR = Path(__file__).resolve().parents[1] / "07_RAG_pdf_QA_chatbot" / "research_papers"
+
+
+def measure(paths, workers, repeat):
+    pages = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        pages += sum(1 for _ in iter_pdf_documents(paths, workers=workers))
+    return pages / (time.perf_counter() - start)
+
+
+def main(args):
+    # Repeating the file list simulates a bigger corpus without shipping more PDFs
+    paths = list_pdfs(args.directory) * args.copies
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1} | set(args.workers))
+    print(f"{len(paths)} files from {args.directory}")
+    print(f"{'workers':>8}{'pages/s':>12}")
+    for workers in worker_counts:
+        print(f"{workers:>8}{measure(paths, workers, args.repeat):>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark parallel PDF page extraction")
+    parser.add_argument("--directory", default=str(DEFAULT_DIR))
+    parser.add_argument("--copies", type=int, default=4, help="how many times to repeat the file list")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--workers", type=int, nargs="*", default=[])
+    main(parser.parse_args())
+
+# To run (from the repository root):
+# python common/benchmark_pdf_ingestion.py --copies 4
+# workers=1 is the single-core baseline that PyPDFDirectoryLoader gives today.
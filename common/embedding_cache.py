@@ -0,0 +1,132 @@
+# Chunk-level embedding cache shared by the RAG apps
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parents[1] / ".embedding_cache" / "embeddings.db"
+SQLITE_MAX_PARAMS = 500
+
+
+def model_identifier(embeddings):
+    # e.g. "HuggingFaceEmbeddings:all-MiniLM-L6-v2"
+    for attr in ("model", "model_name", "model_id"):
+        value = getattr(embeddings, attr, None)
+        if isinstance(value, str):
+            return f"{type(embeddings).__name__}:{value}"
+    return type(embeddings).__name__
+
+
+class CachedEmbeddings(Embeddings):
+    """Wraps any Embeddings and stores every vector on disk as float32, keyed by
+    (model id, query or document, sha256 of the text). Queries and documents are
+    kept apart because asymmetric models (e.g. NVIDIA's query/passage modes)
+    embed the same text differently.
+
+    `embed_documents` looks the whole batch up in one pass, sends only the misses
+    to the wrapped model, and returns vectors in input order. The store is bounded
+    to `max_entries` and evicts the least recently used vectors."""
+
+    def __init__(self, underlying: Embeddings, model_id: Optional[str] = None,
+                 path=None, max_entries=1_000_000):
+        self.underlying = underlying
+        self.model_id = model_id or model_identifier(underlying)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        path = Path(path or os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, vector BLOB, last_used REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_vectors_last_used ON vectors(last_used)")
+        self._db.commit()
+        self._count = self._db.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    def _key(self, text, kind):
+        return hashlib.sha256(f"{self.model_id}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys):
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        for i in range(0, len(unique), SQLITE_MAX_PARAMS):
+            batch = unique[i:i + SQLITE_MAX_PARAMS]
+            rows = self._db.execute(
+                f"SELECT key, vector FROM vectors WHERE key IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+            found.update((key, np.frombuffer(blob, dtype=np.float32)) for key, blob in rows)
+        if found:
+            now = time.time()
+            self._db.executemany("UPDATE vectors SET last_used = ? WHERE key = ?", [(now, k) for k in found])
+        return found
+
+    def _store(self, items):
+        now = time.time()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO vectors VALUES (?, ?, ?)",
+            [(key, vector.tobytes(), now) for key, vector in items],
+        )
+        self._count += len(items)
+        if self._count > self.max_entries:
+            # The running count is an upper bound (replaced rows are counted twice), so check for real
+            self._count = self._db.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+            overflow = self._count - self.max_entries
+            if overflow > 0:
+                self._db.execute(
+                    "DELETE FROM vectors WHERE key IN (SELECT key FROM vectors ORDER BY last_used LIMIT ?)",
+                    (overflow,),
+                )
+                self._count -= overflow
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text, "doc") for text in texts]
+        missing = {}
+        with self._lock:
+            found = self._lookup(keys)
+            self._db.commit()
+            for key, text in zip(keys, texts):
+                if key not in found and key not in missing:
+                    missing[key] = text
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            computed = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(missing, vectors)}
+            with self._lock:
+                self._store(list(computed.items()))
+                self._db.commit()
+            found.update(computed)
+
+        return [found[key].tolist() for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text, "query")
+        with self._lock:
+            found = self._lookup([key])
+            self._db.commit()
+            if key in found:
+                self.hits += 1
+                return found[key].tolist()
+            self.misses += 1
+
+        vector = np.asarray(self.underlying.embed_query(text), dtype=np.float32)
+        with self._lock:
+            self._store([(key, vector)])
+            self._db.commit()
+        return vector.tolist()
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {"hits": hits, "misses": misses, "hit_rate": hits / lookups if lookups else 0.0}
@@ -0,0 +1,212 @@
+# Per-stage wall-clock latency instrumentation for retrieval chains
+import contextvars
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# The StageTimer of the request being served; langchain copies the context into
+# its worker threads, so TimedEmbeddings can find it from inside the retriever
+_current_timer = contextvars.ContextVar("current_stage_timer", default=None)
+
+
+class RollingHistogram:
+    """Keeps the last `window` observations and answers quantile queries on them."""
+
+    def __init__(self, window=1000):
+        self.values = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.values.append(value)
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q):
+        if not self.values:
+            return 0.0
+        ordered = sorted(self.values)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LatencyRecorder:
+    """Process-wide store of stage latencies (seconds) and token counts."""
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.stages: Dict[str, RollingHistogram] = {}
+        self.tokens: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            self.stages.setdefault(stage, RollingHistogram(self.window)).observe(seconds)
+
+    def add_tokens(self, kind, count):
+        with self._lock:
+            self.tokens[kind] = self.tokens.get(kind, 0) + count
+
+    def snapshot(self):
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": hist.count,
+                    "mean": hist.total / hist.count if hist.count else 0.0,
+                    **{f"p{int(q * 100)}": hist.quantile(q) for q in QUANTILES},
+                }
+                for stage, hist in self.stages.items()
+            }
+            return {"stages_seconds": stages, "tokens": dict(self.tokens)}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix="rag"):
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_latency_seconds Wall-clock latency per retrieval chain stage",
+            f"# TYPE {prefix}_stage_latency_seconds summary",
+        ]
+        with self._lock:
+            for stage, hist in self.stages.items():
+                for q in QUANTILES:
+                    lines.append(f'{prefix}_stage_latency_seconds{{stage="{stage}",quantile="{q}"}} {hist.quantile(q):.6f}')
+                lines.append(f'{prefix}_stage_latency_seconds_sum{{stage="{stage}"}} {hist.total:.6f}')
+                lines.append(f'{prefix}_stage_latency_seconds_count{{stage="{stage}"}} {hist.count}')
+        lines.append(f"# HELP {prefix}_tokens_total LLM tokens by kind")
+        lines.append(f"# TYPE {prefix}_tokens_total counter")
+        for kind, count in snapshot["tokens"].items():
+            lines.append(f'{prefix}_tokens_total{{kind="{kind}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+default_recorder = LatencyRecorder()
+
+
+class StageTimer(BaseCallbackHandler):
+    """Callback handler that times one request, stage by stage:
+
+    query_embedding, vector_search, prompt_assembly, llm_ttft, llm_total, total.
+
+    `llm_ttft` is only recorded when the model streams tokens."""
+
+    def __init__(self, recorder: LatencyRecorder = default_recorder):
+        self.recorder = recorder
+        self.started = time.perf_counter()
+        self.embedding_seconds = 0.0
+        self.timings: Dict[str, float] = {}
+        self._starts: Dict[UUID, float] = {}
+        self._prompt_runs = set()
+        self._first_token_seen = set()
+
+    def _record(self, stage, seconds):
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+        self.recorder.observe(stage, seconds)
+
+    def _elapsed(self, run_id):
+        start = self._starts.pop(run_id, None)
+        return None if start is None else time.perf_counter() - start
+
+    def record_embedding(self, seconds):
+        self.embedding_seconds += seconds
+        self._record("query_embedding", seconds)
+
+    # Retriever: query embedding + vector search
+    def on_retriever_start(self, serialized, query, *, run_id: UUID, **kwargs: Any) -> None:
+        self.embedding_seconds = 0.0
+        self._starts[run_id] = time.perf_counter()
+
+    def on_retriever_end(self, documents, *, run_id: UUID, **kwargs: Any) -> None:
+        elapsed = self._elapsed(run_id)
+        if elapsed is not None:
+            self._record("vector_search", max(0.0, elapsed - self.embedding_seconds))
+
+    # Prompt templates report themselves as chains with run_type="prompt"
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, **kwargs: Any) -> None:
+        if kwargs.get("run_type") == "prompt":
+            self._prompt_runs.add(run_id)
+            self._starts[run_id] = time.perf_counter()
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any) -> None:
+        if run_id in self._prompt_runs:
+            self._prompt_runs.discard(run_id)
+            elapsed = self._elapsed(run_id)
+            if elapsed is not None:
+                self._record("prompt_assembly", elapsed)
+
+    # LLM: time to first token, total time and token usage
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        self._starts[run_id] = time.perf_counter()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._starts[run_id] = time.perf_counter()
+
+    def on_llm_new_token(self, token, *, run_id: UUID, **kwargs: Any) -> None:
+        if run_id not in self._first_token_seen and run_id in self._starts:
+            self._first_token_seen.add(run_id)
+            self._record("llm_ttft", time.perf_counter() - self._starts[run_id])
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        self._first_token_seen.discard(run_id)
+        elapsed = self._elapsed(run_id)
+        if elapsed is not None:
+            self._record("llm_total", elapsed)
+        for kind, count in _token_usage(response).items():
+            self.timings[f"{kind}_tokens"] = self.timings.get(f"{kind}_tokens", 0) + count
+            self.recorder.add_tokens(kind, count)
+
+    def finish(self):
+        self._record("total", time.perf_counter() - self.started)
+        return self.timings
+
+
+def _token_usage(response):
+    # Providers report usage either in llm_output or on the message itself
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return {"prompt": usage.get("prompt_tokens", 0), "completion": usage.get("completion_tokens", 0)}
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if metadata:
+                return {"prompt": metadata.get("input_tokens", 0), "completion": metadata.get("output_tokens", 0)}
+    return {}
+
+
+class TimedEmbeddings(Embeddings):
+    """Embeddings wrapper that reports embed_query time to the active StageTimer."""
+
+    def __init__(self, underlying: Embeddings):
+        self.underlying = underlying
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.underlying.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        start = time.perf_counter()
+        vector = self.underlying.embed_query(text)
+        timer = _current_timer.get()
+        if timer is not None:
+            timer.record_embedding(time.perf_counter() - start)
+        return vector
+
+
+def timed_invoke(chain, input, recorder: LatencyRecorder = default_recorder, config: Optional[dict] = None):
+    """Invokes `chain` with a StageTimer attached and returns (response, timings)."""
+    timer = StageTimer(recorder)
+    config = dict(config or {})
+    config["callbacks"] = list(config.get("callbacks") or []) + [timer]
+    token = _current_timer.set(timer)
+    try:
+        response = chain.invoke(input, config=config)
+    finally:
+        _current_timer.reset(token)
+    return response, timer.finish()
@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("langchain_core")
+from langchain_core.embeddings import Embeddings
+
+from common.embedding_cache import CachedEmbeddings
+
+
+class AsymmetricEmbeddings(Embeddings):
+    """Queries and passages get different vectors, like NVIDIA's embedding models."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        return [float(len(text)), -1.0]
+
+
+def test_queries_and_documents_are_cached_separately(tmp_path):
+    underlying = AsymmetricEmbeddings()
+    cache = CachedEmbeddings(underlying, model_id="fake", path=tmp_path / "e.db")
+
+    assert cache.embed_documents(["hello"]) == [[5.0, 1.0]]
+    assert cache.embed_query("hello") == [5.0, -1.0]  # not the cached passage vector
+    assert cache.embed_query("hello") == [5.0, -1.0]
+    assert cache.embed_documents(["hello", "hello"]) == [[5.0, 1.0], [5.0, 1.0]]
+    assert underlying.calls == 2
+    assert cache.stats()["hits"] == 3
+
+
+def test_only_misses_reach_the_model_and_order_is_kept(tmp_path):
+    cache = CachedEmbeddings(AsymmetricEmbeddings(), model_id="fake", path=tmp_path / "e.db")
+    cache.embed_documents(["a", "bbb"])
+    assert cache.embed_documents(["cc", "bbb", "a"]) == [[2.0, 1.0], [3.0, 1.0], [1.0, 1.0]]
+    assert cache.stats() == {"hits": 2, "misses": 3, "hit_rate": 0.4}
+
+
+def test_counters_are_consistent_across_threads(tmp_path):
+    cache = CachedEmbeddings(AsymmetricEmbeddings(), model_id="fake", path=tmp_path / "e.db")
+    cache.embed_query("warm")
+    threads = [threading.Thread(target=lambda: [cache.embed_query("warm") for _ in range(50)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.stats()["hits"] == 400
@@ -0,0 +1,106 @@
+import json
+import time
+
+import pytest
+
+pytest.importorskip("langchain_core")
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables import RunnablePassthrough
+
+from common.latency import LatencyRecorder, RollingHistogram, TimedEmbeddings, timed_invoke
+
+EMBED_SECONDS, SEARCH_SECONDS = 0.2, 0.1
+
+
+def test_histogram_quantiles():
+    hist = RollingHistogram()
+    assert hist.quantile(0.5) == 0.0
+    for value in range(1, 101):
+        hist.observe(value)
+    assert [hist.quantile(q) for q in (0.5, 0.95, 0.99)] == [51, 96, 100]
+    assert hist.quantile(1.0) == 100
+
+
+def test_histogram_keeps_only_the_window_for_quantiles():
+    hist = RollingHistogram(window=10)
+    for value in range(1, 21):
+        hist.observe(value)
+    assert sorted(hist.values) == list(range(11, 21))
+    assert hist.quantile(0.0) == 11
+    assert (hist.count, hist.total) == (20, 210)  # count and sum cover every observation
+
+
+def test_exports():
+    recorder = LatencyRecorder()
+    for seconds in (0.1, 0.2, 0.3):
+        recorder.observe("llm_total", seconds)
+    recorder.add_tokens("prompt", 12)
+    recorder.add_tokens("prompt", 8)
+
+    snapshot = json.loads(recorder.to_json())
+    assert snapshot["tokens"] == {"prompt": 20}
+    stage = snapshot["stages_seconds"]["llm_total"]
+    assert stage["count"] == 3 and stage["p50"] == 0.2 and stage["p99"] == 0.3
+    assert stage["mean"] == pytest.approx(0.2)
+
+    assert recorder.to_prometheus(prefix="test").splitlines() == [
+        "# HELP test_stage_latency_seconds Wall-clock latency per retrieval chain stage",
+        "# TYPE test_stage_latency_seconds summary",
+        'test_stage_latency_seconds{stage="llm_total",quantile="0.5"} 0.200000',
+        'test_stage_latency_seconds{stage="llm_total",quantile="0.95"} 0.300000',
+        'test_stage_latency_seconds{stage="llm_total",quantile="0.99"} 0.300000',
+        'test_stage_latency_seconds_sum{stage="llm_total"} 0.600000',
+        'test_stage_latency_seconds_count{stage="llm_total"} 3',
+        "# HELP test_tokens_total LLM tokens by kind",
+        "# TYPE test_tokens_total counter",
+        'test_tokens_total{kind="prompt"} 20',
+    ]
+
+
+class SlowEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [[1.0] for _ in texts]
+
+    def embed_query(self, text):
+        time.sleep(EMBED_SECONDS)
+        return [1.0]
+
+
+class SlowRetriever(BaseRetriever):
+    embeddings: Embeddings
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun):
+        self.embeddings.embed_query(query)
+        time.sleep(SEARCH_SECONDS)
+        return [Document(page_content="Paris is the capital of France.")]
+
+
+def test_stage_timer_attributes_time_to_each_stage():
+    retriever = SlowRetriever(embeddings=TimedEmbeddings(SlowEmbeddings()))
+    llm = GenericFakeChatModel(messages=iter([
+        AIMessage(content="Paris.", usage_metadata={"input_tokens": 30, "output_tokens": 2, "total_tokens": 32}),
+    ]))
+    prompt = ChatPromptTemplate.from_template("Context: {context}\nQuestion: {question}")
+    chain = {"context": retriever, "question": RunnablePassthrough()} | prompt | llm | StrOutputParser()
+
+    recorder = LatencyRecorder()
+    answer, timings = timed_invoke(chain, "What is the capital of France?", recorder)
+
+    assert answer == "Paris."
+    assert timings["query_embedding"] >= EMBED_SECONDS
+    # The embedding happens inside the retriever but is not counted as search time
+    assert SEARCH_SECONDS <= timings["vector_search"] < SEARCH_SECONDS + EMBED_SECONDS
+    assert "prompt_assembly" in timings and "llm_total" in timings
+    assert (timings["prompt_tokens"], timings["completion_tokens"]) == (30, 2)
+    assert timings["total"] >= EMBED_SECONDS + SEARCH_SECONDS
+    assert set(recorder.snapshot()["stages_seconds"]) == {
+        "query_embedding", "vector_search", "prompt_assembly", "llm_total", "total"
+    }
+    assert recorder.snapshot()["tokens"] == {"prompt": 30, "completion": 2}
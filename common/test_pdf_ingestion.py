@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("pypdf")
+pytest.importorskip("langchain_community")
+from langchain_community.document_loaders import PyPDFLoader
+
+from common.pdf_ingestion import ParallelPyPDFDirectoryLoader, _bounded_map, iter_pdf_documents, list_pdfs
+
+
+def write_pdf(path, pages):
+    """Writes a minimal PDF with one line of Helvetica text per page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+@pytest.fixture
+def pdf_dir(tmp_path):
+    for index, page_count in enumerate([3, 1, 5, 2, 4, 1]):
+        write_pdf(tmp_path / f"doc{index}.pdf", [f"doc {index} page {page}" for page in range(page_count)])
+    return tmp_path
+
+
+def serial(paths):
+    return [doc for path in paths for doc in PyPDFLoader(str(path)).load()]
+
+
+def keys(doc):
+    return doc.page_content, {key: doc.metadata[key] for key in ("source", "page", "total_pages", "page_label")}
+
+
+@pytest.mark.parametrize("workers, window", [(1, None), (2, None), (3, 1)])
+def test_pages_and_metadata_match_serial_pypdfloader(pdf_dir, workers, window):
+    paths = list_pdfs(pdf_dir)
+    expected = serial(paths)
+    assert expected[0].page_content == "doc 0 page 0"
+    documents = list(iter_pdf_documents(paths, workers=workers, window=window))
+    assert [keys(doc) for doc in documents] == [keys(doc) for doc in expected]
+    assert len(documents) == 16
+
+
+def test_directory_loader_reads_every_pdf_in_order(pdf_dir):
+    (pdf_dir / ".hidden.pdf").write_bytes(b"not a pdf")
+    documents = ParallelPyPDFDirectoryLoader(pdf_dir, workers=2).load()
+    assert [doc.page_content for doc in documents][:4] == ["doc 0 page 0", "doc 0 page 1", "doc 0 page 2", "doc 1 page 0"]
+    assert len(documents) == 16
+
+
+def test_submissions_stay_within_the_window():
+    pulled = []
+
+    def items():
+        for item in range(20):
+            pulled.append(item)
+            yield item
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = _bounded_map(executor, lambda item: item * 10, items(), window=4)
+        assert next(results) == 0
+        assert len(pulled) == 4  # nothing beyond the window was submitted yet
+        assert list(results) == [item * 10 for item in range(1, 20)]
@@ -0,0 +1,11 @@
+# Rough token counts for budgeting prompts without loading a tokenizer
+
+
+def approx_tokens(text):
+    # ~4 characters per token
+    return len(text) // 4 + 1
+
+
+def approx_message_tokens(messages):
+    # Message contents plus a few tokens of per-message overhead
+    return sum(approx_tokens(str(m.content)) + 3 for m in messages)